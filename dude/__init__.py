@@ -15,8 +15,12 @@ from .context import (  # noqa: F401
     shutdown,
     start_requests,
     startup,
+    url_priority,
 )
+from .retry import DEFAULT_RETRY_STATUSES
 from .scraper import Scraper  # noqa: F401
+from .seeds import URLFile
+from .sitemap import Sitemap
 
 EXTRA_EXPORTS = []
 try:
@@ -28,6 +32,8 @@ except ImportError:  # pragma: no cover
 
 __all__ = [
     "Scraper",
+    "URLFile",
+    "Sitemap",
     "group",
     "run",
     "save",
@@ -39,6 +45,7 @@ __all__ = [
     "start_requests",
     "get_current_url",
     "follow_url",
+    "url_priority",
 ] + EXTRA_EXPORTS
 
 
@@ -49,6 +56,8 @@ logger = logging.getLogger(__name__)
 def cli() -> None:  # pragma: no cover
     import argparse
     import importlib.util
+    import itertools
+    from datetime import datetime
 
     parser = argparse.ArgumentParser(description="dude uncomplicated data extraction")
     parser.add_argument("-V", "--version", dest="version", action="store_true", required=False, help="show version")
@@ -73,6 +82,30 @@ def cli() -> None:  # pragma: no cover
         default=[],
         help='Website URL to scrape. Accepts one or more url (e.g. "dude scrape --url <url1> --url <url2> ...")',
     )
+    required.add_argument(
+        "--url-file",
+        metavar="PATH",
+        dest="url_files",
+        action="append",
+        type=str,
+        required=False,
+        default=[],
+        help='File with one website URL to scrape per line, optionally gzip-compressed, or "-" to read the standard '
+        "input. The URLs are streamed into the frontier, use --frontier sqlite to keep them out of memory. "
+        "Accepts one or more files.",
+    )
+    required.add_argument(
+        "--sitemap",
+        metavar="URL",
+        dest="sitemaps",
+        action="append",
+        type=str,
+        required=False,
+        default=[],
+        help="URL of a sitemap (optionally gzip-compressed) or sitemap index whose URLs are scraped, or URL of a "
+        'robots.txt to read the sitemaps listed in it (e.g. "dude scrape --sitemap <url>/robots.txt ..."). '
+        "Accepts one or more sitemaps.",
+    )
     # optional parameters
     optional = scrape.add_argument_group("optional arguments")
     parser_group = optional.add_mutually_exclusive_group()
@@ -190,6 +223,346 @@ def cli() -> None:  # pragma: no cover
         action="store_true",
         help="Flag to ignore robots.txt.",
     )
+    optional.add_argument(
+        "--robots-cache",
+        dest="robots_cache",
+        type=str,
+        help="JSON file to persist the fetched robots.txt between runs.",
+    )
+    optional.add_argument(
+        "--robots-cache-ttl",
+        dest="robots_cache_ttl",
+        default=86400,
+        type=float,
+        help="Number of seconds a fetched robots.txt stays valid (default=86400).",
+    )
+    optional.add_argument(
+        "--frontier",
+        dest="frontier",
+        default="memory",
+        choices=("memory", "sqlite"),
+        help='Storage of the URLs to crawl (default="memory"). Use "sqlite" for crawls with millions of URLs.',
+    )
+    optional.add_argument(
+        "--frontier-path",
+        dest="frontier_path",
+        type=str,
+        help='SQLite database file of the "sqlite" frontier. If not provided, a temporary file is used.',
+    )
+    optional.add_argument(
+        "--max-depth",
+        dest="max_depth",
+        type=int,
+        help="Maximum number of links to follow from the starting URLs. If not provided, there is no limit.",
+    )
+    optional.add_argument(
+        "--crawl-order",
+        dest="crawl_order",
+        default="bfs",
+        choices=("bfs", "dfs"),
+        help='Order of the followed URLs, "bfs" (breadth-first, default) or "dfs" (depth-first).',
+    )
+    optional.add_argument(
+        "--sitemap-since",
+        dest="sitemap_since",
+        metavar="DATE",
+        type=datetime.fromisoformat,
+        help='Only scrape the URLs of the sitemaps modified since this date (e.g. "2022-01-31"), according to their '
+        "lastmod. URLs without lastmod are always scraped.",
+    )
+    optional.add_argument(
+        "--round-robin",
+        dest="round_robin",
+        default=False,
+        action="store_true",
+        help="Give each host its own queue and take turns between the hosts.",
+    )
+    optional.add_argument(
+        "--host-weight",
+        dest="host_weights",
+        action="append",
+        metavar="HOST=WEIGHT",
+        help="Number of URLs crawled per turn of a host (default=1). Implies --round-robin. "
+        'Accepts one or more hosts (e.g. "dude scrape --host-weight a.com=3 --host-weight b.com=2 ...")',
+    )
+    optional.add_argument(
+        "--state-dir",
+        dest="state_dir",
+        type=str,
+        help="Directory where the crawl state is periodically saved so that an interrupted crawl can be resumed.",
+    )
+    optional.add_argument(
+        "--resume",
+        dest="resume",
+        type=str,
+        metavar="STATE_DIR",
+        help="Resume an interrupted crawl from the last checkpoint saved in the state directory.",
+    )
+    optional.add_argument(
+        "--checkpoint-interval",
+        dest="checkpoint_interval",
+        default=60,
+        type=float,
+        help="Minimum number of seconds between two checkpoints (default=60).",
+    )
+    optional.add_argument(
+        "--qps",
+        dest="qps",
+        type=float,
+        help="Maximum number of requests per second to all the hosts together.",
+    )
+    optional.add_argument(
+        "--host-qps",
+        dest="host_qps",
+        type=float,
+        help="Maximum number of requests per second to each host.",
+    )
+    optional.add_argument(
+        "--host-qps-override",
+        dest="host_qps_overrides",
+        action="append",
+        metavar="HOST=QPS",
+        help="Maximum number of requests per second to a host, overriding --host-qps. "
+        'Accepts one or more hosts (e.g. "dude scrape --host-qps-override a.com=0.5 --host-qps-override b.com=2 ...")',
+    )
+    optional.add_argument(
+        "--burst",
+        dest="burst",
+        default=1,
+        type=int,
+        help="Number of requests that can be sent at once before --qps and --host-qps apply (default=1).",
+    )
+    optional.add_argument(
+        "--max-retries",
+        dest="max_retries",
+        default=0,
+        type=int,
+        help="Maximum number of retries of a page after a network error, a timeout or a retryable status code "
+        "(default=0). Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--retry-backoff",
+        dest="retry_backoff",
+        default=1.0,
+        type=float,
+        help="Maximum delay in seconds before the first retry, doubled on each retry (default=1).",
+    )
+    optional.add_argument(
+        "--retry-backoff-max",
+        dest="retry_backoff_max",
+        default=60.0,
+        type=float,
+        help="Maximum delay in seconds between two retries, unless a longer Retry-After is received (default=60).",
+    )
+    optional.add_argument(
+        "--retry-status",
+        dest="retry_statuses",
+        action="append",
+        type=int,
+        metavar="STATUS",
+        help="HTTP status code to retry (default=408, 429, 500, 502, 503 and 504). "
+        'Accepts one or more status codes (e.g. "dude scrape --retry-status 503 --retry-status 504 ...")',
+    )
+    optional.add_argument(
+        "--circuit-breaker-threshold",
+        dest="circuit_breaker_threshold",
+        default=0,
+        type=int,
+        help="Number of consecutive network errors, timeouts or server errors after which the URLs of a host are "
+        "parked (default=0, disabled). Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--circuit-breaker-cool-down",
+        dest="circuit_breaker_cool_down",
+        default=60.0,
+        type=float,
+        help="Number of seconds before probing a host whose URLs are parked (default=60).",
+    )
+    optional.add_argument(
+        "--circuit-breaker-max-probes",
+        dest="circuit_breaker_max_probes",
+        default=3,
+        type=int,
+        help="Number of consecutive failed probes after which the URLs of a host are skipped (default=3).",
+    )
+    optional.add_argument(
+        "--processes",
+        dest="processes",
+        default=1,
+        type=int,
+        help="Number of processes crawling the hosts in parallel, each host is crawled by a single process "
+        "(default=1). The scraped data is merged and saved by the main process.",
+    )
+    optional.add_argument(
+        "--max-pages",
+        dest="max_pages",
+        type=int,
+        help="Maximum number of pages to crawl. If not provided, there is no limit.",
+    )
+    optional.add_argument(
+        "--max-items",
+        dest="max_items",
+        type=int,
+        help="Maximum number of items to scrape, the pages in progress may scrape a few more. "
+        "If not provided, there is no limit.",
+    )
+    optional.add_argument(
+        "--max-duration",
+        dest="max_duration",
+        type=float,
+        metavar="SECONDS",
+        help="Maximum number of seconds after which no new pages are crawled. If not provided, there is no limit.",
+    )
+    optional.add_argument(
+        "--http-cache",
+        dest="http_cache",
+        type=str,
+        metavar="PATH",
+        help="SQLite database file where the responses are cached and revalidated with their ETag and Last-Modified "
+        "headers. Only used by the BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--offline",
+        dest="offline",
+        default=False,
+        action="store_true",
+        help="Replay the responses from --http-cache without sending any request. Uncached pages are skipped.",
+    )
+    optional.add_argument(
+        "--concurrency",
+        dest="concurrency",
+        default=1,
+        type=int,
+        help="Maximum number of requests in flight in async mode (default=1). "
+        "Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--parser-processes",
+        dest="parser_processes",
+        default=0,
+        type=int,
+        help="Number of processes that parse and scrape the pages in sync mode (default=0, pages are parsed in the "
+        "main process). Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--workers",
+        dest="workers",
+        default=1,
+        type=int,
+        help="Number of threads that fetch and scrape the pages in sync mode (default=1). "
+        "Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--pipeline",
+        dest="pipeline",
+        default=False,
+        action="store_true",
+        help="Fetch, scrape and save the pages in separate stages connected by bounded queues in sync mode. "
+        "Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--pipeline-queue-size",
+        dest="pipeline_queue_size",
+        default=100,
+        type=int,
+        help="Maximum number of pages waiting in each queue of the pipeline (default=100).",
+    )
+    optional.add_argument(
+        "--no-adaptive-concurrency",
+        dest="adaptive_concurrency",
+        default=True,
+        action="store_false",
+        help="Always keep the maximum number of requests in flight per host when using --concurrency or --workers "
+        "instead of adapting it to the latency and errors of each host.",
+    )
+    optional.add_argument(
+        "--http2",
+        dest="http2",
+        default=False,
+        action="store_true",
+        help="Enable HTTP/2, so that the requests to a host are multiplexed on a single connection. "
+        "Requires `pip install httpx[http2]`. Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--max-connections",
+        dest="max_connections",
+        default=100,
+        type=int,
+        help="Maximum number of open connections (default=100). "
+        "Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--max-keepalive-connections",
+        dest="max_keepalive_connections",
+        default=20,
+        type=int,
+        help="Maximum number of idle connections kept alive (default=20). "
+        "Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--keepalive-expiry",
+        dest="keepalive_expiry",
+        default=5.0,
+        type=float,
+        help="Number of seconds an idle connection is kept alive (default=5). "
+        "Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--max-host-connections",
+        dest="max_host_connections",
+        type=int,
+        help="Maximum number of requests in flight, and thus of connections, per host when using --concurrency or "
+        "--workers. If not provided, there is no limit.",
+    )
+    optional.add_argument(
+        "--content-type",
+        dest="content_types",
+        action="append",
+        metavar="TYPE",
+        help='Content type of the pages to scrape, e.g. "text/html" or "text/*". Can be repeated. '
+        "Other responses are skipped before their body is downloaded. If not provided, all the pages are scraped. "
+        "Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--max-body-size",
+        dest="max_body_size",
+        type=int,
+        metavar="BYTES",
+        help="Maximum size of the pages to scrape. Larger responses are skipped as soon as they exceed it. "
+        "If not provided, there is no limit. Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--parse-bytes",
+        dest="parse_bytes",
+        default=False,
+        action="store_true",
+        help="Parse the pages from their body and declared encoding instead of decoding them to strings first. "
+        "Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--record",
+        dest="record",
+        type=str,
+        metavar="PATH",
+        help="SQLite database file where every HTTP exchange (request and response) is recorded. "
+        "Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--replay",
+        dest="replay",
+        type=str,
+        metavar="PATH",
+        help="SQLite database file recorded with --record, from which the responses are served without sending any "
+        "request. Only valid for BeautifulSoup4, lxml and Parsel backends.",
+    )
+    optional.add_argument(
+        "--replay-latency",
+        dest="replay_latency",
+        default=0.0,
+        type=float,
+        metavar="SECONDS",
+        help="Number of seconds to wait before each replayed response, to simulate the network (default=0).",
+    )
     arguments = parser.parse_args()
 
     if arguments.version:
@@ -202,6 +575,98 @@ def cli() -> None:  # pragma: no cover
     if (arguments.proxy_user or arguments.proxy_pass) and not arguments.proxy_server:
         parser.error("--proxy-user or --proxy-pass requires --proxy-server.")
 
+    if arguments.resume and arguments.state_dir and arguments.resume != arguments.state_dir:
+        parser.error("--resume and --state-dir should be the same directory.")
+
+    if arguments.max_depth is not None and arguments.max_depth < 0:
+        parser.error("--max-depth should not be negative.")
+
+    host_weights = {}
+    for host_weight in arguments.host_weights or ():
+        host, _, weight = host_weight.rpartition("=")
+        if not host or not weight.isdigit() or int(weight) < 1:
+            parser.error(f'--host-weight should be HOST=WEIGHT with a positive weight, got "{host_weight}".')
+        host_weights[host] = int(weight)
+
+    if arguments.qps is not None and arguments.qps <= 0:
+        parser.error("--qps should be positive.")
+
+    if arguments.host_qps is not None and arguments.host_qps <= 0:
+        parser.error("--host-qps should be positive.")
+
+    if arguments.burst < 1:
+        parser.error("--burst should be at least 1.")
+
+    host_qps_overrides = {}
+    for host_qps in arguments.host_qps_overrides or ():
+        host, _, qps = host_qps.rpartition("=")
+        try:
+            host_qps_overrides[host] = float(qps)
+        except ValueError:
+            parser.error(f'--host-qps-override should be HOST=QPS, got "{host_qps}".')
+        if not host or host_qps_overrides[host] <= 0:
+            parser.error(f'--host-qps-override should be HOST=QPS with a positive QPS, got "{host_qps}".')
+
+    if arguments.max_retries < 0:
+        parser.error("--max-retries should not be negative.")
+
+    if arguments.circuit_breaker_threshold < 0:
+        parser.error("--circuit-breaker-threshold should not be negative.")
+
+    if arguments.circuit_breaker_max_probes < 0:
+        parser.error("--circuit-breaker-max-probes should not be negative.")
+
+    if arguments.processes < 1:
+        parser.error("--processes should be at least 1.")
+
+    if arguments.processes > 1 and (arguments.state_dir or arguments.resume):
+        parser.error("--processes does not support --state-dir and --resume.")
+
+    if arguments.max_pages is not None and arguments.max_pages < 0:
+        parser.error("--max-pages should not be negative.")
+
+    if arguments.max_items is not None and arguments.max_items < 0:
+        parser.error("--max-items should not be negative.")
+
+    if arguments.max_duration is not None and arguments.max_duration < 0:
+        parser.error("--max-duration should not be negative.")
+
+    if arguments.offline and not arguments.http_cache:
+        parser.error("--offline requires --http-cache.")
+
+    if arguments.concurrency < 1:
+        parser.error("--concurrency should be at least 1.")
+
+    if arguments.workers < 1:
+        parser.error("--workers should be at least 1.")
+
+    if arguments.pipeline_queue_size < 1:
+        parser.error("--pipeline-queue-size should be at least 1.")
+
+    if arguments.parser_processes < 0:
+        parser.error("--parser-processes should not be negative.")
+
+    if arguments.max_connections < 1:
+        parser.error("--max-connections should be at least 1.")
+
+    if arguments.max_keepalive_connections < 0:
+        parser.error("--max-keepalive-connections should not be negative.")
+
+    if arguments.keepalive_expiry < 0:
+        parser.error("--keepalive-expiry should not be negative.")
+
+    if arguments.max_host_connections is not None and arguments.max_host_connections < 1:
+        parser.error("--max-host-connections should be at least 1.")
+
+    if arguments.max_body_size is not None and arguments.max_body_size < 1:
+        parser.error("--max-body-size should be at least 1.")
+
+    if arguments.record and arguments.replay:
+        parser.error("--record and --replay cannot be used together.")
+
+    if arguments.replay_latency < 0:
+        parser.error("--replay-latency should not be negative.")
+
     for path in arguments.paths:
         module_name = Path(path).stem
         spec = importlib.util.spec_from_file_location(module_name, path)
@@ -235,7 +700,12 @@ def cli() -> None:  # pragma: no cover
             proxy = f"http://{user_info}{arguments.proxy_server}"
 
     run(
-        urls=arguments.urls,
+        # the URL files and sitemaps are read when the crawl starts, by the main process when using --processes
+        urls=itertools.chain(
+            arguments.urls,
+            *(URLFile(path) for path in arguments.url_files),
+            Sitemap(arguments.sitemaps, since=arguments.sitemap_since) if arguments.sitemaps else (),
+        ),
         parser=parser_type,
         headless=not arguments.headed,
         browser_type=arguments.browser,
@@ -246,4 +716,49 @@ def cli() -> None:  # pragma: no cover
         follow_urls=arguments.follow_urls,
         save_per_page=arguments.save_per_page,
         ignore_robots_txt=arguments.ignore_robots_txt,
+        robots_cache=arguments.robots_cache,
+        robots_cache_ttl=arguments.robots_cache_ttl,
+        frontier=arguments.frontier,
+        frontier_path=arguments.frontier_path,
+        max_depth=arguments.max_depth,
+        crawl_order=arguments.crawl_order,
+        round_robin=arguments.round_robin,
+        host_weights=host_weights,
+        state_dir=arguments.resume or arguments.state_dir,
+        resume=arguments.resume is not None,
+        checkpoint_interval=arguments.checkpoint_interval,
+        qps=arguments.qps,
+        host_qps=arguments.host_qps,
+        burst=arguments.burst,
+        host_qps_overrides=host_qps_overrides,
+        max_retries=arguments.max_retries,
+        retry_backoff=arguments.retry_backoff,
+        retry_backoff_max=arguments.retry_backoff_max,
+        retry_statuses=arguments.retry_statuses or DEFAULT_RETRY_STATUSES,
+        circuit_breaker_threshold=arguments.circuit_breaker_threshold,
+        circuit_breaker_cool_down=arguments.circuit_breaker_cool_down,
+        circuit_breaker_max_probes=arguments.circuit_breaker_max_probes,
+        processes=arguments.processes,
+        max_pages=arguments.max_pages,
+        max_items=arguments.max_items,
+        max_duration=arguments.max_duration,
+        http_cache=arguments.http_cache,
+        offline=arguments.offline,
+        concurrency=arguments.concurrency,
+        parser_processes=arguments.parser_processes,
+        workers=arguments.workers,
+        pipeline=arguments.pipeline,
+        pipeline_queue_size=arguments.pipeline_queue_size,
+        adaptive_concurrency=arguments.adaptive_concurrency,
+        http2=arguments.http2,
+        max_connections=arguments.max_connections,
+        max_keepalive_connections=arguments.max_keepalive_connections,
+        keepalive_expiry=arguments.keepalive_expiry,
+        max_host_connections=arguments.max_host_connections,
+        content_types=arguments.content_types,
+        max_body_size=arguments.max_body_size,
+        parse_bytes=arguments.parse_bytes,
+        record=arguments.record,
+        replay=arguments.replay,
+        replay_latency=arguments.replay_latency,
     )
@@ -1,15 +1,21 @@
 import asyncio
 import collections
+import heapq
 import inspect
 import itertools
 import logging
+import os
+import threading
 import time
+import urllib.request
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
 from pathlib import Path
 from types import GeneratorType
 from typing import (
     Any,
     AsyncIterable,
+    AsyncIterator,
     Callable,
     Coroutine,
     DefaultDict,
@@ -18,24 +24,37 @@ from typing import (
     Iterable,
     Iterator,
     List,
+    NamedTuple,
     Optional,
-    Sequence,
     Set,
     Tuple,
     Union,
 )
-from urllib.error import URLError
+from urllib.error import HTTPError, URLError
 from urllib.parse import urljoin, urlparse
-from urllib.robotparser import RobotFileParser
 
 from braveblock import Adblocker
 
+from .budget import CrawlBudget
+from .checkpoint import Checkpoint
+from .circuit_breaker import CircuitBreaker
+from .frontier import SQLiteURLFrontier, URLFrontier
+from .http_cache import HTTPCache
+from .retry import DEFAULT_RETRY_STATUSES, RetryPolicy
+from .robots import RobotsCache, RobotsTxtParser
 from .rule import Rule, Selector, rule_filter
+from .scheduler import HostScheduler
 from .scraped_data import ScrapedData, scraped_data_grouper, scraped_data_sorter
+from .sharding import Shard
+from .stats import Stats
 from .storage import save_csv, save_json, save_yaml
 
 logger = logging.getLogger(__name__)
 
+# current URL of each scraper (by id) in each thread and asyncio task,
+# tasks get a copy of the context they were created in. The dict is replaced, never modified.
+_current_urls: ContextVar[Dict[int, str]] = ContextVar("current_urls", default={})
+
 
 class ScraperBase(ABC):
     """
@@ -45,7 +64,10 @@ class ScraperBase(ABC):
     """
 
     supports_sync = True
-    current_url = ""
+    # maximum number of URLs (or Requests) taken out of the frontier while their hosts wait, in total and per host,
+    # this keeps the frontier order (priority, depth, round-robin turns) and bounds the memory used by the scheduler
+    max_scheduled = 1000
+    max_scheduled_per_host = 10
 
     def __init__(
         self,
@@ -56,6 +78,8 @@ class ScraperBase(ABC):
         has_async: bool = False,
         requests: Optional[Deque] = None,  # only valid for BeautifulSoup4, lxml and Parsel backends
         scraper: Optional["ScraperAbstract"] = None,
+        url_priority_function: Optional[Callable] = None,
+        start_requests_functions: Optional[List[Callable]] = None,
     ) -> None:
         self.rules: List[Rule] = rules or []
         self.groups: Dict[Callable, Selector] = groups or {}
@@ -71,16 +95,40 @@ class ScraperBase(ABC):
         self.events: DefaultDict = events or collections.defaultdict(list)
         self.has_async = has_async
         self.scraper = scraper
+        self.url_priority_function = url_priority_function
+        # generator functions of custom Request objects, only called when the crawl starts
+        self.start_requests_functions: List[Callable] = (
+            start_requests_functions if start_requests_functions is not None else []
+        )
+        self._start_requests: Deque[Union[Iterator, AsyncIterator]] = collections.deque()
+        self._start_requests_pulled = 0  # number of Request objects pulled from the generators
+        self._start_requests_skipped = 0  # number of Request objects pulled before the checkpoint when resuming
+        self._frontier_lock = threading.RLock()  # the frontier is shared with the worker threads
+        self.stats = Stats()
         self.adblock = Adblocker()
-        self.urls: Deque = collections.deque()  # allows dynamically appending new URLs for crawling
+        self.urls = URLFrontier()  # allows dynamically appending new URLs for crawling
         self.requests: Deque = requests or collections.deque()  # allows dynamically appending new requests for crawling
         self.allowed_domains: Set[str] = set()
         self.ignore_robots_txt: bool = False
+        self.scheduler = HostScheduler()
+        self.robots_cache = RobotsCache()
+        self.checkpoint: Optional[Checkpoint] = None
+        self._in_progress: Dict[int, Any] = {}  # URLs and Requests that were scheduled but not yet fully scraped
+        self._in_progress_counter: Iterator[int] = itertools.count()
+        self.retry_policy: Optional[RetryPolicy] = None
+        self._retries: List[Tuple[float, int, Any]] = []  # heap of (retry time, sequence number, URL or Request)
+        self._retry_counts: Dict[str, int] = {}  # URL -> number of retries
+        self._retry_counter: Iterator[int] = itertools.count()
+        self.circuit_breaker: Optional[CircuitBreaker] = None
+        self._parked: Dict[str, Deque] = {}  # host -> URLs and Requests waiting for the circuit of the host to close
+        self.shard: Optional[Shard] = None  # hosts crawled by this process when crawling with multiple processes
+        self.budget = CrawlBudget()
+        self.http_cache: Optional[HTTPCache] = None
 
     @abstractmethod
     def run(
         self,
-        urls: Sequence[str],
+        urls: Iterable[str],
         pages: int,
         proxy: Optional[Any],
         output: Optional[str],
@@ -93,7 +141,7 @@ class ScraperBase(ABC):
         """
         Abstract method for executing the scraper.
 
-        :param urls: List of website URLs.
+        :param urls: Website URLs, e.g. a list or a `URLFile` that is read lazily.
         :param pages: Maximum number of pages to crawl before exiting (default=1). This is only used when a navigate handler is defined. # noqa
         :param proxy: Proxy settings.
         :param output: Output file. If not provided, prints in the terminal.
@@ -102,8 +150,74 @@ class ScraperBase(ABC):
         :param save_per_page: Flag to save data on every page extraction or not. If not, saves all the data at the end.
         :param ignore_robots_txt: Flag to ignore robots.txt.
         """
-        self.initialize_scraper(urls)
+        self.budget = CrawlBudget(
+            max_pages=kwargs.pop("max_pages", None),
+            max_items=kwargs.pop("max_items", None),
+            max_duration=kwargs.pop("max_duration", None),
+            count_items=self._count_items,
+            shared_pages=self.shard.pages if self.shard is not None else None,
+            shared_items=self.shard.items if self.shard is not None else None,
+        )
+        frontier = kwargs.pop("frontier", "memory")
+        frontier_path = kwargs.pop("frontier_path", None)
+        robots_cache = kwargs.pop("robots_cache", None)
+        state_dir = kwargs.pop("state_dir", None)
+        resume = kwargs.pop("resume", False)
+        checkpoint_interval = kwargs.pop("checkpoint_interval", 60)
+        state = None
+        if state_dir:
+            self.checkpoint = Checkpoint(state_dir, interval=checkpoint_interval)
+            if frontier == "sqlite" and frontier_path is None:
+                frontier_path = os.path.join(state_dir, "frontier.sqlite3")
+            if robots_cache is None:
+                robots_cache = os.path.join(state_dir, "robots.json")
+            if resume:
+                state = self.checkpoint.load()
+
+        self.initialize_scraper(
+            urls,
+            frontier=frontier,
+            frontier_path=frontier_path,
+            state=state,
+            max_depth=kwargs.pop("max_depth", None),
+            crawl_order=kwargs.pop("crawl_order", "bfs"),
+            round_robin=kwargs.pop("round_robin", False),
+            host_weights=kwargs.pop("host_weights", None),
+        )
         self.ignore_robots_txt = ignore_robots_txt
+        self.stats = Stats()
+        self.scheduler = HostScheduler(
+            qps=kwargs.pop("qps", None),
+            host_qps=kwargs.pop("host_qps", None),
+            burst=kwargs.pop("burst", 1),
+            host_qps_overrides=kwargs.pop("host_qps_overrides", None),
+        )
+        max_retries = kwargs.pop("max_retries", 0)
+        retry_policy = RetryPolicy(
+            max_retries=max_retries,
+            backoff=kwargs.pop("retry_backoff", 1.0),
+            backoff_max=kwargs.pop("retry_backoff_max", 60.0),
+            retry_statuses=kwargs.pop("retry_statuses", DEFAULT_RETRY_STATUSES),
+        )
+        self.retry_policy = retry_policy if max_retries > 0 else None
+        failure_threshold = kwargs.pop("circuit_breaker_threshold", 0)
+        circuit_breaker = CircuitBreaker(
+            failure_threshold=failure_threshold,
+            cool_down=kwargs.pop("circuit_breaker_cool_down", 60.0),
+            max_probes=kwargs.pop("circuit_breaker_max_probes", 3),
+            stats=self.stats,
+        )
+        self.circuit_breaker = circuit_breaker if failure_threshold > 0 else None
+        self.robots_cache = RobotsCache(ttl=kwargs.pop("robots_cache_ttl", 86400), path=robots_cache)
+        self.robots_cache.load()
+        http_cache = kwargs.pop("http_cache", None)
+        offline = kwargs.pop("offline", False)
+        self.http_cache = HTTPCache(http_cache, offline=offline, stats=self.stats) if http_cache else None
+        if offline:
+            if self.http_cache is None:
+                raise ValueError("Offline mode requires an HTTP cache.")
+            # robots.txt cannot be fetched, the cached pages were already allowed when they were stored
+            self.ignore_robots_txt = True
 
         logger.info("Using %s...", self.__class__.__name__)
 
@@ -122,7 +236,7 @@ class ScraperBase(ABC):
                     **kwargs,
                 )
             )
-            if not save_per_page:
+            if not save_per_page and self.shard is None:
                 loop.run_until_complete(self._save_async(format, output, save_per_page))  # type: ignore
         else:
             logger.info("Using sync mode...")
@@ -135,10 +249,18 @@ class ScraperBase(ABC):
                 save_per_page=save_per_page,
                 **kwargs,
             )
-            if not save_per_page:
+            if not save_per_page and self.shard is None:
                 self._save(format, output, save_per_page)  # type: ignore
 
-        self.event_shutdown()
+        if self.checkpoint is not None:
+            self.save_checkpoint()
+        self.robots_cache.save()
+        self.urls.close()
+        if self.http_cache is not None:
+            self.http_cache.close()
+        self.stats.log()
+        if self.shard is None:  # called by the main process when crawling with multiple processes
+            self.event_shutdown()
 
     def select(
         self,
@@ -339,56 +461,562 @@ class ScraperBase(ABC):
 
     def start_requests(self) -> Callable:
         """
-        Decorator to register custom Request objects.
+        Decorator to register a generator (or async generator) of custom Request objects.
+
+        The generator is only started when the crawl starts and the Request objects are pulled from it
+        when they are about to be sent, so that it can yield a large number of requests.
         """
-        from httpx import Request
 
         def wrapper(func: Callable) -> Callable:
-            requests = self.scraper.requests if self.scraper else self.requests
-            for request in func():
-                assert isinstance(request, Request)
-                requests.append(request)
+            if inspect.isasyncgenfunction(func):
+                self.has_async = True
+
+            functions = self.scraper.start_requests_functions if self.scraper else self.start_requests_functions
+            functions.append(func)
             return func
 
         return wrapper
 
+    @property
+    def current_url(self) -> str:
+        return _current_urls.get().get(id(self), "")
+
+    @current_url.setter
+    def current_url(self, url: str) -> None:
+        _current_urls.set({**_current_urls.get(), id(self): url})
+
     def get_current_url(self) -> str:
         return self.scraper.current_url if self.scraper else self.current_url
 
+    def url_priority(self) -> Callable:
+        """
+        Decorator to register a function that prioritizes the URLs to crawl.
+
+        The function receives a URL and its depth (number of links followed from the starting URLs)
+        and returns its priority, the URLs with the lowest value are crawled first.
+        """
+
+        def wrapper(func: Callable) -> Callable:
+            if self.scraper:
+                self.scraper.url_priority_function = func
+            else:
+                self.url_priority_function = func
+            return func
+
+        return wrapper
+
     def follow_url(self, url: str) -> None:
-        self.scraper.urls.append(url) if self.scraper else self.urls.append(url)
+        if self.scraper:
+            self.scraper.follow_url(url)
+        else:
+            with self._frontier_lock:
+                self._queue_url(url, self._get_depth(self.current_url) + 1)
+
+    def follow_links(self, page_url: str, links: Iterable[Optional[str]]) -> None:
+        """
+        Queues the links found in a page that are within the allowed domains.
+
+        :param page_url: URL of the page, used to resolve relative links.
+        :param links: Links (e.g. href values) found in the page.
+        """
+        absolute_links = [urljoin(page_url, link or "") for link in links]
+        with self._frontier_lock:
+            depth = self._get_depth(page_url)
+            self.urls.mark_seen(page_url, depth)
+            for absolute in absolute_links:
+                if urlparse(absolute).netloc in self.allowed_domains:
+                    self._queue_url(absolute, depth + 1)
+
+    def _queue_url(self, url: str, depth: int) -> None:
+        """
+        Queues a URL, or sends it to the process crawling its host when crawling with multiple processes.
+        """
+        if self._owns(url):
+            self.urls.append(url, depth=depth)
+        else:
+            assert self.shard is not None
+            self.shard.send(url, depth)
+
+    def _owns(self, url: str) -> bool:
+        """
+        Checks if the host of a URL is crawled by this process, always True unless crawling with multiple processes.
+        """
+        return self.shard is None or self.shard.owns(url)
+
+    def _get_depth(self, page_url: str) -> int:
+        """
+        Gets the depth of a page, falling back to the depth of the requested URL when the page was redirected.
+        """
+        depth = self.urls.depth(page_url)
+        if depth is None:
+            depth = self.urls.depth(self.current_url)
+        return depth or 0
 
     def iter_urls(self) -> Iterator[str]:
-        try:
-            while True:
-                url = self.urls.popleft()
-                if urlparse(url).netloc not in self.allowed_domains:
-                    logger.info("URL %s is not in allowed domains.", url)
-                    continue
-                can_fetch, crawl_delay = self.can_fetch_and_crawl_delay(url)
-                if not can_fetch:
-                    logger.info("Not allowed to crawl %s", url)
-                    continue
-                time.sleep(crawl_delay)
-                self.current_url = url
+        """
+        Iterates over the URLs to crawl, waiting for the hosts' crawl delays when needed.
+        """
+        while True:
+            url, wait = self._next_scheduled()
+            if url is not None:
+                key = self._start_item(url)
+                yield url
+                self._finish_item(key)
+            elif wait is not None:
+                time.sleep(wait)
+            else:
+                break
+
+    async def iter_urls_async(self) -> AsyncIterator[str]:
+        """
+        Iterates over the URLs to crawl, waiting for the hosts' crawl delays without blocking the event loop.
+        """
+        while True:
+            url, wait = await self._next_scheduled_async()
+            if url is not None:
+                key = self._start_item(url)
                 yield url
-        except IndexError:
-            pass
+                self._finish_item(key)
+            elif wait is not None:
+                await asyncio.sleep(wait)
+            else:
+                break
 
-    def can_fetch_and_crawl_delay(self, url: str) -> Tuple[bool, int]:
+    def _start_item(self, item: Any) -> int:
+        """
+        Marks a URL or Request as being crawled so that it is crawled again when resuming from a checkpoint.
+
+        :param item: URL or Request.
+        :return: Key to pass to `_finish_item()`.
+        """
+        key = next(self._in_progress_counter)
+        self._in_progress[key] = item
+        return key
+
+    def _finish_item(self, key: int) -> None:
+        """
+        Marks a URL or Request as crawled and saves a checkpoint when it is due.
+
+        :param key: Key returned by `_start_item()`.
+        """
+        self._in_progress.pop(key, None)
+        if self.checkpoint is not None and self.checkpoint.is_due():
+            self.save_checkpoint()
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Gets the picklable crawl state.
+
+        URLs and Requests that are still being crawled are saved as pending so that they are crawled again.
+        """
+        with self._frontier_lock:
+            return {
+                "frontier": self.urls.get_state(),
+                "pending": [
+                    *self._in_progress.values(),
+                    *(item.item if isinstance(item, _Probe) else item for item in self.scheduler),
+                    *(item for *_, item in sorted(self._retries)),
+                    *(item for items in self._parked.values() for item in items),
+                ],
+                "requests": list(self.requests),
+                "start_requests_pulled": self._start_requests_pulled,
+                "allowed_domains": self.allowed_domains,
+            }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restores the crawl state from a checkpoint.
+        """
+        self.urls.set_state(state["frontier"])
+        requests = []
+        for item in state["pending"]:
+            if isinstance(item, str):
+                self.urls.requeue(item)
+            else:
+                requests.append(item)
+        self.requests.clear()
+        self.requests.extend(requests)
+        self.requests.extend(state["requests"])
+        self._start_requests_skipped = state["start_requests_pulled"]
+        self.allowed_domains = set(state["allowed_domains"])
+
+    def save_checkpoint(self) -> None:
+        assert self.checkpoint is not None
+        self.checkpoint.save(self.get_state())
+        self.robots_cache.save()
+
+    def _next_scheduled(self, include_requests: bool = False) -> Tuple[Optional[Any], Optional[float]]:
+        """
+        Gets the next URL (or Request) whose host can be fetched now.
+
+        :param include_requests: Flag to include the custom Request objects.
+        :return: Tuple of the URL or Request and None,
+            None and the number of seconds to wait until the earliest host, retry or probe is ready,
+            or None and None if there is nothing left to crawl or the crawl budget is exhausted.
+        """
+        self._receive_urls()
+        if self.budget.is_exhausted():
+            return None, self._wait_for_shards(None)
+        while True:
+            retry_wait = self._schedule_retries()
+            item, wait = self._pop_scheduled()
+            if item is not None:
+                return self._take(item), None
+            probe_wait = self._schedule_probes()
+            if probe_wait == 0:
+                continue
+            if len(self.scheduler) >= self.max_scheduled:
+                return None, self._until_deadline(_earliest(wait, retry_wait, probe_wait))
+            pending = self._pop_pending(include_requests)
+            if pending is None:
+                return None, self._wait_for_shards(self._until_deadline(_earliest(wait, retry_wait, probe_wait)))
+            item, url = pending
+            self._schedule(item, url, *self.can_fetch_and_crawl_delay(url))
+
+    async def _next_scheduled_async(self, include_requests: bool = False) -> Tuple[Optional[Any], Optional[float]]:
+        """
+        Gets the next URL (or Request) whose host can be fetched now.
+
+        :param include_requests: Flag to include the custom Request objects.
+        :return: Tuple of the URL or Request and None,
+            None and the number of seconds to wait until the earliest host, retry or probe is ready,
+            or None and None if there is nothing left to crawl or the crawl budget is exhausted.
+        """
+        self._receive_urls()
+        if self.budget.is_exhausted():
+            return None, self._wait_for_shards(None)
+        while True:
+            retry_wait = self._schedule_retries()
+            item, wait = self._pop_scheduled()
+            if item is not None:
+                return self._take(item), None
+            probe_wait = self._schedule_probes()
+            if probe_wait == 0:
+                continue
+            if len(self.scheduler) >= self.max_scheduled:
+                return None, self._until_deadline(_earliest(wait, retry_wait, probe_wait))
+            pending = self._pop_pending(include_requests)
+            if pending is None and include_requests and not self.requests:
+                request = await self._pull_start_request_async()
+                if request is not None:
+                    self.requests.append(request)
+                    continue
+            if pending is None:
+                return None, self._wait_for_shards(self._until_deadline(_earliest(wait, retry_wait, probe_wait)))
+            item, url = pending
+            self._schedule(item, url, *await self.can_fetch_and_crawl_delay_async(url))
+
+    def _take(self, item: Any) -> Any:
+        """
+        Counts a URL (or Request) about to be crawled in the crawl budget and sets it as the current URL.
+        """
+        self.budget.add_page()
+        self.current_url = item if isinstance(item, str) else str(item.url)
+        return item
+
+    def _until_deadline(self, wait: Optional[float]) -> Optional[float]:
+        """
+        Shortens a wait so that it ends before the maximum duration of the crawl budget.
+        """
+        time_left = self.budget.time_left()
+        return wait if wait is None or time_left is None else min(wait, time_left)
+
+    def _count_items(self) -> int:
+        """
+        Gets the number of items scraped so far, for the crawl budget.
+        """
+        return 0
+
+    def _receive_urls(self) -> None:
+        """
+        Queues the URLs sent by the other processes when crawling with multiple processes.
+        """
+        if self.shard is None:
+            return
+        received = self.shard.receive()
+        with self._frontier_lock:
+            for url, depth in received:
+                self.urls.append(url, depth=depth)
+
+    def _wait_for_shards(self, wait: Optional[float]) -> Optional[float]:
+        """
+        Keeps polling for URLs sent by the other processes until all of them are idle when crawling with multiple
+        processes. This process is idle when there is nothing left to crawl and no pages being scraped.
+
+        :param wait: Number of seconds until the earliest host, retry or probe is ready.
+        :return: Number of seconds to wait, or None if the crawl is finished.
+        """
+        if wait is not None or self.shard is None or self._in_progress:
+            return wait
+        return None if self.shard.is_finished() else self.shard.poll_interval
+
+    def _retry_later(self, item: Any, url: str, status_code: Optional[int], retry_after: Optional[str] = None) -> bool:
+        """
+        Schedules a failed URL or Request to be crawled again after a backoff delay, if the retry policy allows it.
+        The request is queued again instead of waiting so that other URLs keep being crawled in the meantime.
+
+        :param item: URL or Request that failed.
+        :param url: URL of the item.
+        :param status_code: HTTP status code or None for network errors and timeouts.
+        :param retry_after: Value of the Retry-After header, if any.
+        :return: True if the item will be retried.
+        """
+        if self.retry_policy is None:
+            return False
+        with self._frontier_lock:
+            retries = self._retry_counts.get(url, 0)
+            if not self.retry_policy.should_retry(retries, status_code):
+                if retries:
+                    self.stats.increment("retries_exhausted")
+                    logger.warning("Giving up on %s after %d retries.", url, retries)
+                return False
+            delay = self.retry_policy.delay(retries, retry_after)
+            self._retry_counts[url] = retries + 1
+            heapq.heappush(self._retries, (time.monotonic() + delay, next(self._retry_counter), item))
+        self.stats.increment("retries")
+        logger.info(
+            "Retrying %s in %.1f seconds (%s, retry %d of %d).",
+            url,
+            delay,
+            status_code or "network error",
+            retries + 1,
+            self.retry_policy.max_retries,
+        )
+        return True
+
+    def _forget_retries(self, url: str) -> None:
+        """
+        Forgets the number of retries of a URL once it is not retried anymore,
+        i.e. its last fetch succeeded or failed without being retried, or it was skipped.
+        """
+        with self._frontier_lock:
+            self._retry_counts.pop(url, None)
+
+    def _schedule_retries(self) -> Optional[float]:
+        """
+        Queues the failed URLs and Requests whose backoff delays are over.
+
+        :return: Number of seconds until the next retry or None if there are no more retries.
+        """
+        with self._frontier_lock:
+            now = time.monotonic()
+            while self._retries and self._retries[0][0] <= now:
+                *_, item = heapq.heappop(self._retries)
+                url = item if isinstance(item, str) else str(item.url)
+                self.scheduler.push(urlparse(url).netloc, item)
+            return self._retries[0][0] - now if self._retries else None
+
+    def _pop_scheduled(self) -> Tuple[Optional[Any], Optional[float]]:
+        """
+        Pops the next URL (or Request) from the scheduler, parking the ones of hosts whose circuits are not closed.
+        """
+        while True:
+            item, wait = self.scheduler.pop()
+            if isinstance(item, _Probe):
+                return item.item, wait
+            if item is None or self.circuit_breaker is None:
+                return item, wait
+            url = item if isinstance(item, str) else str(item.url)
+            host = urlparse(url).netloc
+            if self.circuit_breaker.is_given_up(host):
+                self._forget_retries(url)
+                self.stats.increment("circuit_breaker.skipped")
+            elif self.circuit_breaker.is_closed(host):
+                return item, wait
+            else:
+                self._parked.setdefault(host, collections.deque()).append(item)
+
+    def _schedule_probes(self) -> Optional[float]:
+        """
+        Queues again the parked URLs (or Requests) of hosts whose circuits closed
+        and queues a parked URL to probe each host whose cool-down is over.
+        Probes go through the scheduler like the other URLs, so that they respect the crawl delays and rate limits.
+
+        :return: 0 if URLs were queued, otherwise the number of seconds until the next probe
+            or None if there are no hosts to probe.
+        """
+        if self.circuit_breaker is None:
+            return None
+        wait = None
+        for host in list(self._parked):
+            items = self._parked[host]
+            if self.circuit_breaker.is_closed(host):
+                for item in self._parked.pop(host):
+                    self.scheduler.push(host, item)
+                wait = 0.0
+            elif self.circuit_breaker.is_given_up(host):
+                del self._parked[host]
+                for item in items:
+                    self._forget_retries(item if isinstance(item, str) else str(item.url))
+                self.stats.increment("circuit_breaker.skipped", len(items))
+                logger.warning("Skipped %d URLs of %s.", len(items), host)
+            elif self.circuit_breaker.try_probe(host):
+                self.scheduler.push(host, _Probe(items.popleft()))
+                if not items:
+                    del self._parked[host]
+                wait = 0.0
+            else:
+                wait = _earliest(wait, self.circuit_breaker.retry_in(host))
+        return wait
+
+    def _pop_pending(self, include_requests: bool = False) -> Optional[Tuple[Any, str]]:
+        """
+        Pops the next pending URL (or Request) that is in the allowed domains,
+        unless its host already has `max_scheduled_per_host` URLs waiting in the scheduler.
+        Request objects are only pulled from the @start_requests generators when the previous one was scheduled.
+
+        :param include_requests: Flag to include the custom Request objects.
+        :return: Tuple of the URL or Request and its URL, or None if there is nothing left or no room for it.
+        """
+        with self._frontier_lock:
+            while True:
+                url = self.urls.popleft_if(self._can_pop)
+                if url is None:
+                    break
+                if urlparse(url).netloc in self.allowed_domains:
+                    return url, url
+                logger.info("URL %s is not in allowed domains.", url)
+        while include_requests:
+            if not self.requests:
+                request = self._pull_start_request()
+                if request is None:
+                    break
+                self.requests.append(request)
+            url = str(self.requests[0].url)
+            if not self._owns(url):
+                self.requests.popleft()
+            elif not self._has_room(url):
+                break  # the Request is kept until there is room for it
+            else:
+                return self.requests.popleft(), url
+        return None
+
+    def _can_pop(self, url: str) -> bool:
+        """
+        Checks if a URL can be taken out of the frontier. URLs outside of the allowed domains are taken out to be
+        dropped.
+        """
+        return urlparse(url).netloc not in self.allowed_domains or self._has_room(url)
+
+    def _has_room(self, url: str) -> bool:
+        """
+        Checks if the host of a URL has less than `max_scheduled_per_host` URLs waiting in the scheduler.
+        """
+        return self.scheduler.count(urlparse(url).netloc) < self.max_scheduled_per_host
+
+    def _pull_start_request(self) -> Optional[Any]:
+        """
+        Pulls the next Request object from the @start_requests generators.
+
+        :return: Request object or None if the generators are exhausted or the next one is an async generator.
+        """
+        while self._start_requests:
+            generator = self._start_requests[0]
+            if not isinstance(generator, Iterator):
+                return None
+            try:
+                request = next(generator)
+            except StopIteration:
+                self._start_requests.popleft()
+                continue
+            if self._count_start_request(request):
+                return request
+        return None
+
+    async def _pull_start_request_async(self) -> Optional[Any]:
+        """
+        Pulls the next Request object from the @start_requests generators, including async generators.
+
+        :return: Request object or None if the generators are exhausted.
+        """
+        while self._start_requests:
+            generator = self._start_requests[0]
+            try:
+                if isinstance(generator, Iterator):
+                    request = next(generator)
+                else:
+                    request = await generator.__anext__()
+            except (StopIteration, StopAsyncIteration):
+                self._start_requests.popleft()
+                continue
+            if self._count_start_request(request):
+                return request
+        return None
+
+    def _count_start_request(self, request: Any) -> bool:
+        """
+        Counts a Request object pulled from the @start_requests generators.
+
+        :return: False if the Request object was already pulled before the checkpoint the crawl was resumed from
+            or if its host is crawled by another process.
+        """
+        from httpx import Request
+
+        assert isinstance(request, Request)
+        self._start_requests_pulled += 1
+        return self._start_requests_pulled > self._start_requests_skipped and self._owns(str(request.url))
+
+    def _schedule(self, item: Any, url: str, can_fetch: bool, crawl_delay: float) -> None:
+        if not can_fetch:
+            logger.info("Not allowed to crawl %s", url)
+            return
+        host = urlparse(url).netloc
+        self.scheduler.set_delay(host, crawl_delay)
+        self.scheduler.push(host, item)
+
+    def can_fetch_and_crawl_delay(self, url: str) -> Tuple[bool, float]:
         if self.ignore_robots_txt:
             return True, 0
-        user_agent = "dude"  # TODO: https://github.com/roniemartinez/dude/issues/63
-        # TODO: Store content so as to prevent re-fetching
         robots_url = urljoin(url, "/robots.txt")
-        parser = RobotFileParser(url=robots_url)
-        try:
-            parser.read()
-        except URLError:
-            parser.parse([""])
-        crawl_delay = parser.crawl_delay(user_agent) or 0
+        parser = self.robots_cache.get(robots_url)
+        if parser is None:
+            parser = self.robots_cache.set(robots_url, *self._fetch_robots_txt(robots_url))
+        return self._check_robots_txt(parser, url)
+
+    async def can_fetch_and_crawl_delay_async(self, url: str) -> Tuple[bool, float]:
+        if self.ignore_robots_txt:
+            return True, 0
+        robots_url = urljoin(url, "/robots.txt")
+        parser = self.robots_cache.get(robots_url)
+        if parser is None:
+            parser = self.robots_cache.set(robots_url, *await self._fetch_robots_txt_async(robots_url))
+        return self._check_robots_txt(parser, url)
+
+    @staticmethod
+    def _check_robots_txt(parser: RobotsTxtParser, url: str) -> Tuple[bool, float]:
+        user_agent = "dude"  # TODO: https://github.com/roniemartinez/dude/issues/63
+        crawl_delay = parser.crawl_delay(user_agent) or 0.0
+        request_rate = parser.request_rate(user_agent)
+        if request_rate and request_rate.requests:
+            crawl_delay = max(crawl_delay, request_rate.seconds / request_rate.requests)
         can_fetch = parser.can_fetch(user_agent, url)
-        return can_fetch, int(crawl_delay)
+        return can_fetch, crawl_delay
+
+    def _fetch_robots_txt(self, robots_url: str) -> Tuple[Optional[int], str]:
+        """
+        Fetches robots.txt.
+
+        :param robots_url: robots.txt URL.
+        :return: Tuple of the HTTP status code (None if it could not be fetched) and the content.
+        """
+        try:
+            f = urllib.request.urlopen(robots_url)
+            return 200, f.read().decode("utf-8")
+        except HTTPError as e:
+            return e.code, ""
+        except (URLError, OSError, UnicodeDecodeError) as e:
+            logger.warning("Failed to fetch %s: %s", robots_url, e)
+            return None, ""
+
+    async def _fetch_robots_txt_async(self, robots_url: str) -> Tuple[Optional[int], str]:
+        """
+        Fetches robots.txt without blocking the event loop.
+
+        :param robots_url: robots.txt URL.
+        :return: Tuple of the HTTP status code (None if it could not be fetched) and the content.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._fetch_robots_txt, robots_url)
 
     def _update_rule_groups(self) -> Iterable[Rule]:
         for rule in self.rules:
@@ -399,11 +1027,57 @@ class ScraperBase(ABC):
             else:
                 yield rule._replace(group=Selector(selector=":root"))
 
-    def initialize_scraper(self, urls: Sequence[str]) -> None:
+    def initialize_scraper(
+        self,
+        urls: Iterable[str],
+        frontier: str = "memory",
+        frontier_path: Optional[str] = None,
+        state: Optional[Dict[str, Any]] = None,
+        max_depth: Optional[int] = None,
+        crawl_order: str = "bfs",
+        round_robin: bool = False,
+        host_weights: Optional[Dict[str, int]] = None,
+    ) -> None:
         self.rules = [rule for rule in self._update_rule_groups()]
-        self.urls = collections.deque(urls)
-        self.allowed_domains = {urlparse(url).netloc for url in urls}
-        self.event_startup()
+        # the starting URLs of other hosts are read by the main process when crawling with multiple processes
+        self.allowed_domains = set(self.shard.hosts) if self.shard is not None else set()
+        seeds = self._read_seeds(urls)
+        if frontier == "sqlite":
+            self.urls = SQLiteURLFrontier(
+                seeds,
+                path=frontier_path,
+                resume=state is not None,
+                max_depth=max_depth,
+                order=crawl_order,
+                priority=self.url_priority_function,
+                round_robin=round_robin,
+                host_weights=host_weights,
+            )
+        else:
+            self.urls = URLFrontier(
+                seeds,
+                max_depth=max_depth,
+                order=crawl_order,
+                priority=self.url_priority_function,
+                round_robin=round_robin,
+                host_weights=host_weights,
+            )
+        if state is not None:
+            self.set_state(state)
+        self._start_requests = collections.deque(_iterate(func()) for func in self.start_requests_functions)
+        self._start_requests_pulled = 0
+        if self.shard is None:  # called by the main process when crawling with multiple processes
+            self.event_startup()
+
+    def _read_seeds(self, urls: Iterable[str]) -> Iterator[str]:
+        """
+        Collects the allowed domains while the starting URLs are queued, so that the URLs are only read once,
+        e.g. when they are streamed from a `URLFile`. Only the "sqlite" frontier keeps them out of memory.
+        """
+        for url in urls:
+            self.allowed_domains.add(urlparse(url).netloc)
+            if self._owns(url):
+                yield url
 
     def event_startup(self) -> None:
         """
@@ -430,6 +1104,28 @@ class ScraperBase(ABC):
                 func()
 
 
+def _iterate(requests: Union[Iterable, AsyncIterable]) -> Union[Iterator, AsyncIterator]:
+    """
+    Gets an iterator (or async iterator) of the value returned by a @start_requests function, e.g. a generator.
+    """
+    return requests.__aiter__() if isinstance(requests, AsyncIterable) else iter(requests)
+
+
+def _earliest(*waits: Optional[float]) -> Optional[float]:
+    """
+    Gets the shortest of the given waiting times, ignoring None.
+    """
+    return min((wait for wait in waits if wait is not None), default=None)
+
+
+class _Probe(NamedTuple):
+    """
+    URL (or Request) queued in the scheduler to probe a host whose circuit is half-open.
+    """
+
+    item: Any
+
+
 class ScraperAbstract(ScraperBase):
     def __init__(
         self,
@@ -439,9 +1135,23 @@ class ScraperAbstract(ScraperBase):
         events: Optional[DefaultDict] = None,
         has_async: bool = False,
         requests: Optional[Deque] = None,
+        url_priority_function: Optional[Callable] = None,
+        start_requests_functions: Optional[List[Callable]] = None,
     ) -> None:
-        super(ScraperAbstract, self).__init__(rules, groups, save_rules, events, has_async, requests)
+        super(ScraperAbstract, self).__init__(
+            rules,
+            groups,
+            save_rules,
+            events,
+            has_async,
+            requests,
+            url_priority_function=url_priority_function,
+            start_requests_functions=start_requests_functions,
+        )
         self.collected_data: List[ScrapedData] = []
+        self.saved_items = 0  # number of items already saved, e.g. when saving per page
+        # items of `collected_data` counted for the crawl budget: (saved items, counted records, counted items)
+        self._item_count: Tuple[int, int, int] = (0, 0, 0)
 
     @abstractmethod
     async def run_async(
@@ -598,6 +1308,27 @@ class ScraperAbstract(ScraperBase):
                 data=data,
             )
 
+    def _count_items(self) -> int:
+        """
+        Counts the items scraped so far, incrementally since the budget is checked before every page.
+        The records of the handler functions of the same group element make a single item, like in the output.
+        """
+        saved_items, records, items = self._item_count
+        if saved_items != self.saved_items:  # the collected data was saved and cleared
+            records, items = 0, 0
+        new_records = self.collected_data[records:]
+        items += len({scraped_data_grouper(scraped_data) for scraped_data in new_records})
+        self._item_count = self.saved_items, records + len(new_records), items
+        return self.saved_items + items
+
+    def get_state(self) -> Dict[str, Any]:
+        return {**super().get_state(), "collected_data": list(self.collected_data), "saved_items": self.saved_items}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        super().set_state(state)
+        self.collected_data = list(state["collected_data"])
+        self.saved_items = state["saved_items"]
+
     def get_scraping_rules(self, url: str) -> Iterable[Rule]:
         return filter(rule_filter(url), self.rules)
 
@@ -608,8 +1339,18 @@ class ScraperAbstract(ScraperBase):
         return sorted(filter(rule_filter(url, navigate=True), self.rules), key=lambda r: r.priority)
 
     def get_flattened_data(self) -> List[Dict]:
+        # group IDs are object IDs that can be reused across pages,
+        # rank the groups by first appearance so that the output follows the crawl order
+        group_ranks: Dict[Tuple[str, int], int] = {}
+        for scraped_data in self.collected_data:
+            group_ranks.setdefault((scraped_data.page_url, scraped_data.group_id), len(group_ranks))
+
+        def sorter(scraped_data: ScrapedData) -> Tuple[int, int, int, int]:
+            rank = group_ranks[scraped_data.page_url, scraped_data.group_id]
+            return scraped_data_sorter(scraped_data._replace(group_id=rank))
+
         items = []
-        for _, g in itertools.groupby(sorted(self.collected_data, key=scraped_data_sorter), key=scraped_data_grouper):
+        for _, g in itertools.groupby(sorted(self.collected_data, key=sorter), key=scraped_data_grouper):
             item: Dict = {}
             for d in g:
                 for k, v in d._asdict().items():
@@ -636,6 +1377,7 @@ class ScraperAbstract(ScraperBase):
                 return
             if handler(data, output):
                 self.collected_data.clear()
+                self.saved_items += len(data)
             else:
                 raise Exception("Failed to save output %s.", {"output": output, "format": format})
         except KeyError:
@@ -660,6 +1402,7 @@ class ScraperAbstract(ScraperBase):
                 is_successful = handler(data, output)
             if is_successful:
                 self.collected_data.clear()
+                self.saved_items += len(data)
             else:
                 raise Exception("Failed to save output %s.", {"output": output, "format": format})
         except KeyError:
@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlBudget:
+    """
+    Global limits of a crawl: number of pages, number of scraped items and duration.
+
+    Once a limit is reached, no new pages are crawled. The pages in progress are finished and the data is saved,
+    so the crawl ends as if there were no pages left.
+
+    When crawling with multiple processes, the pages and items of all the processes are counted together
+    in shared counters (`multiprocessing.Value`).
+    """
+
+    def __init__(
+        self,
+        max_pages: Optional[int] = None,
+        max_items: Optional[int] = None,
+        max_duration: Optional[float] = None,
+        count_items: Optional[Callable[[], int]] = None,
+        shared_pages: Any = None,
+        shared_items: Any = None,
+    ) -> None:
+        """
+        :param max_pages: Maximum number of pages (URLs and Requests) to crawl.
+        :param max_items: Maximum number of items to scrape. Pages in progress may scrape a few more.
+        :param max_duration: Maximum number of seconds before no new pages are crawled.
+        :param count_items: Function returning the number of items scraped so far.
+        :param shared_pages: Counter of the pages crawled by all the processes.
+        :param shared_items: Counter of the items scraped by all the processes.
+        """
+        self.max_pages = max_pages
+        self.max_items = max_items
+        self.max_duration = max_duration
+        self.count_items = count_items
+        self.shared_pages = shared_pages
+        self.shared_items = shared_items
+        self.pages = 0
+        self._items = 0  # number of items of this process added to the shared counter
+        self.exhausted: Optional[str] = None  # name of the limit that was reached
+        self._deadline = time.monotonic() + max_duration if max_duration is not None else None
+        self._lock = threading.Lock()
+
+    def add_page(self) -> None:
+        with self._lock:
+            self.pages += 1
+        if self.shared_pages is not None:
+            with self.shared_pages.get_lock():
+                self.shared_pages.value += 1
+
+    def is_exhausted(self, now: Optional[float] = None) -> bool:
+        """
+        Checks if a limit has been reached, logging it the first time.
+        """
+        if self.exhausted is not None:
+            return True
+        with self._lock:
+            if self.max_pages is not None and self._count_pages() >= self.max_pages:
+                self.exhausted = "max_pages"
+            elif self.max_items is not None and self.count_items is not None and self._count_items() >= self.max_items:
+                self.exhausted = "max_items"
+            elif self._deadline is not None and (time.monotonic() if now is None else now) >= self._deadline:
+                self.exhausted = "max_duration"
+            else:
+                return False
+        logger.info("Crawl budget %s reached. Finishing the pages in progress...", self.exhausted)
+        return True
+
+    def _count_pages(self) -> int:
+        return self.pages if self.shared_pages is None else self.shared_pages.value
+
+    def _count_items(self) -> int:
+        """
+        Counts the items scraped so far, adding the new items of this process to the shared counter.
+        """
+        assert self.count_items is not None
+        items = self.count_items()
+        if self.shared_items is None:
+            return items
+        with self.shared_items.get_lock():
+            self.shared_items.value += items - self._items
+            self._items = items
+            return self.shared_items.value
+
+    def time_left(self, now: Optional[float] = None) -> Optional[float]:
+        """
+        Gets the number of seconds until the deadline, or None if there is no deadline.
+        """
+        if self._deadline is None:
+            return None
+        return max(self._deadline - (time.monotonic() if now is None else now), 0.0)
@@ -0,0 +1,55 @@
+import logging
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """
+    Periodically saves the crawl state to a directory so that an interrupted crawl can be resumed.
+    """
+
+    file_name = "checkpoint.pickle"
+
+    def __init__(self, directory: str, interval: float = 60) -> None:
+        """
+        :param directory: State directory. Created if it does not exist.
+        :param interval: Minimum number of seconds between two checkpoints.
+        """
+        self.directory = directory
+        self.interval = interval
+        self.path = os.path.join(directory, self.file_name)
+        self._last_saved = time.monotonic()
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+    def is_due(self) -> bool:
+        return time.monotonic() - self._last_saved >= self.interval
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """
+        Atomically replaces the saved state.
+
+        :param state: Picklable crawl state.
+        """
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+        self._last_saved = time.monotonic()
+        logger.info("Checkpoint saved to %s.", self.path)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Loads the saved state, if any.
+        """
+        if not os.path.exists(self.path):
+            logger.warning("No checkpoint found in %s. Starting from the beginning.", self.directory)
+            return None
+        with open(self.path, "rb") as f:
+            state = pickle.load(f)
+        logger.info("Checkpoint loaded from %s.", self.path)
+        return state
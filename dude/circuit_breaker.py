@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from .stats import Stats
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class _Circuit:
+    __slots__ = ("state", "failures", "trips", "opened_at")
+
+    def __init__(self) -> None:
+        self.state = CLOSED
+        self.failures = 0  # consecutive failures
+        self.trips = 0  # consecutive trips without a successful probe
+        self.opened_at = 0.0
+
+
+class CircuitBreaker:
+    """
+    Stops crawling a host after consecutive failures (network errors, timeouts and server errors).
+
+    After `failure_threshold` consecutive failures, the circuit of the host opens and its URLs are parked.
+    Once `cool_down` seconds have passed, a single URL is sent to probe the host (half-open).
+    If the probe succeeds, the circuit closes and the parked URLs are crawled,
+    otherwise it opens again for another cool-down.
+    After `max_probes` consecutive failed probes, the host is given up and its URLs are skipped.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        cool_down: float = 60.0,
+        max_probes: int = 3,
+        stats: Optional[Stats] = None,
+    ) -> None:
+        """
+        :param failure_threshold: Number of consecutive failures that open the circuit of a host.
+        :param cool_down: Number of seconds before probing a host whose circuit is open.
+        :param max_probes: Number of consecutive failed probes before giving up a host.
+        :param stats: Optional stats where the number of trips is counted as "circuit_breaker.trips".
+        """
+        self.failure_threshold = failure_threshold
+        self.cool_down = cool_down
+        self.max_probes = max_probes
+        self.stats = stats
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def state(self, host: str) -> str:
+        with self._lock:
+            circuit = self._circuits.get(host)
+            return CLOSED if circuit is None else circuit.state
+
+    def is_closed(self, host: str) -> bool:
+        return self.state(host) == CLOSED
+
+    def is_given_up(self, host: str) -> bool:
+        with self._lock:
+            circuit = self._circuits.get(host)
+            return circuit is not None and circuit.state == OPEN and circuit.trips > self.max_probes
+
+    def try_probe(self, host: str, now: Optional[float] = None) -> bool:
+        """
+        Half-opens the circuit of a host if its cool-down is over, allowing a single request to probe the host.
+
+        :param host: Host name.
+        :param now: Current monotonic time. Defaults to `time.monotonic()`.
+        :return: True if a probe can be sent.
+        """
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None or circuit.state != OPEN or circuit.trips > self.max_probes:
+                return False
+            if (time.monotonic() if now is None else now) < circuit.opened_at + self.cool_down:
+                return False
+            circuit.state = HALF_OPEN
+            return True
+
+    def retry_in(self, host: str, now: Optional[float] = None) -> Optional[float]:
+        """
+        Gets the number of seconds until a host can be probed, or None if its circuit is not open.
+        """
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None or circuit.state != OPEN:
+                return None
+            return max(circuit.opened_at + self.cool_down - (time.monotonic() if now is None else now), 0.0)
+
+    def record(self, host: str, failed: bool) -> None:
+        """
+        Records the outcome of a request to a host.
+
+        :param host: Host name.
+        :param failed: Flag for network errors, timeouts and server errors.
+        """
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None:
+                if not failed:
+                    return
+                circuit = self._circuits[host] = _Circuit()
+            if circuit.state == OPEN:
+                return  # requests that were in flight when the circuit opened
+            if not failed:
+                if circuit.state == HALF_OPEN:
+                    logger.info("Circuit of %s closed.", host)
+                del self._circuits[host]
+                return
+            circuit.failures += 1
+            if circuit.state == CLOSED and circuit.failures < self.failure_threshold:
+                return
+            circuit.state = OPEN
+            circuit.trips += 1
+            circuit.opened_at = time.monotonic()
+            trips = circuit.trips
+        if self.stats is not None:
+            self.stats.increment("circuit_breaker.trips")
+        if trips > self.max_probes:
+            logger.warning("Giving up on %s after %d failed probes.", host, trips - 1)
+        else:
+            logger.warning("Circuit of %s opened, probing again in %.0f seconds.", host, self.cool_down)
@@ -0,0 +1,121 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from .stats import Stats
+
+
+class _HostState:
+    __slots__ = ("limit", "in_flight", "slow_start", "min_latency", "last_decrease")
+
+    def __init__(self, limit: float) -> None:
+        self.limit = limit
+        self.in_flight = 0
+        self.slow_start = True
+        self.min_latency: Optional[float] = None
+        self.last_decrease = 0.0
+
+
+class AdaptiveConcurrency:
+    """
+    Limits the number of requests in flight per host using additive increase, multiplicative decrease (AIMD).
+
+    The limit of a host starts at `initial_limit` and grows by one per successful request until the first failure
+    (slow start), then by one per `limit` successful requests. It only grows while the latency stays below
+    `latency_tolerance` times the lowest latency seen for the host.
+    Failures (timeouts, 429 Too Many Requests and server errors) multiply the limit by `decrease_factor`,
+    at most once for the requests that were already in flight when the limit was decreased.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        initial_limit: int = 1,
+        min_limit: int = 1,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        stats: Optional[Stats] = None,
+    ) -> None:
+        """
+        :param max_limit: Maximum number of requests in flight per host.
+        :param initial_limit: Number of requests in flight allowed for a new host.
+        :param min_limit: Minimum number of requests in flight per host.
+        :param decrease_factor: Factor applied to the limit of a host after a failure.
+        :param latency_tolerance: The limit only grows while the latency is below this factor times the lowest latency.
+        :param stats: Optional stats where the current limits are set as "concurrency.<host>".
+        """
+        self.max_limit = max_limit
+        self.initial_limit = min(initial_limit, max_limit)
+        self.min_limit = min_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.stats = stats
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    def limit(self, host: str) -> int:
+        with self._lock:
+            return int(self._get_host(host).limit)
+
+    def has_capacity(self, host: str) -> bool:
+        """
+        Checks if another request can be sent to a host.
+        """
+        with self._lock:
+            state = self._get_host(host)
+            return state.in_flight < int(state.limit)
+
+    def acquire(self, host: str) -> bool:
+        """
+        Counts a request sent to a host.
+
+        :return: True if more requests can be sent to the host.
+        """
+        with self._lock:
+            state = self._get_host(host)
+            state.in_flight += 1
+            return state.in_flight < int(state.limit)
+
+    def release(self, host: str) -> bool:
+        """
+        Counts a finished request of a host.
+
+        :return: True if more requests can be sent to the host.
+        """
+        with self._lock:
+            state = self._get_host(host)
+            state.in_flight = max(state.in_flight - 1, 0)
+            return state.in_flight < int(state.limit)
+
+    def record(self, host: str, started: float, latency: float, failed: bool) -> None:
+        """
+        Adjusts the limit of a host after a response (or a failure).
+
+        :param host: Host name.
+        :param started: Monotonic time when the request was sent.
+        :param latency: Number of seconds until the response was received.
+        :param failed: Flag for timeouts, 429 Too Many Requests and server errors.
+        """
+        with self._lock:
+            state = self._get_host(host)
+            if failed:
+                if started < state.last_decrease:
+                    return  # already decreased for the requests in flight at that time
+                state.limit = max(state.limit * self.decrease_factor, self.min_limit)
+                state.slow_start = False
+                state.last_decrease = time.monotonic()
+            else:
+                if state.min_latency is None or latency < state.min_latency:
+                    state.min_latency = latency
+                if latency > state.min_latency * self.latency_tolerance:
+                    return
+                increase = 1 if state.slow_start else 1 / state.limit
+                state.limit = min(state.limit + increase, self.max_limit)
+            if self.stats is not None:
+                self.stats.set(f"concurrency.{host}", int(state.limit))
+
+    def _get_host(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.initial_limit)
+        return state
@@ -16,3 +16,4 @@ post_setup = _scraper.post_setup
 start_requests = _scraper.start_requests
 get_current_url = _scraper.get_current_url
 follow_url = _scraper.follow_url
+url_priority = _scraper.url_priority
@@ -0,0 +1,471 @@
+import collections
+import heapq
+import os
+import sqlite3
+import tempfile
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalizes a URL so that equivalent URLs are identical.
+
+    The scheme and host are lowercased, default ports and fragments are removed, an empty path becomes "/" and the
+    query parameters are sorted.
+
+    :param url: Absolute URL.
+    :return: Canonical URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    try:
+        port = parts.port
+    except ValueError:  # invalid port, keep the netloc as is
+        netloc = parts.netloc.lower()
+    else:
+        host = parts.hostname or ""
+        if ":" in host:  # IPv6
+            host = f"[{host}]"
+        if port is not None and DEFAULT_PORTS.get(scheme) != port:
+            host = f"{host}:{port}"
+        userinfo = parts.netloc.rpartition("@")[0]
+        netloc = f"{userinfo}@{host}" if userinfo else host
+    path = parts.path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+class URLFrontier:
+    """
+    Queue of URLs to crawl.
+
+    URLs are crawled breadth-first (FIFO) by default or depth-first (LIFO).
+    An optional priority function can reorder them, URLs with the lowest priority value are crawled first.
+    URLs that were already queued before (compared by their canonical form) are ignored.
+
+    With `round_robin`, each host has its own queue and the hosts take turns, so that a host with many URLs does not
+    delay the other hosts. The order and priority then only apply to the URLs of the same host.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str] = (),
+        max_depth: Optional[int] = None,
+        order: str = "bfs",
+        priority: Optional[Callable[[str, int], float]] = None,
+        round_robin: bool = False,
+        host_weights: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """
+        :param urls: URLs to queue, with a depth of 0.
+        :param max_depth: Maximum depth of the queued URLs. URLs found deeper are ignored.
+        :param order: Order of the URLs with the same priority, "bfs" (breadth-first) or "dfs" (depth-first).
+        :param priority: Function that receives a URL and its depth and returns its priority.
+        :param round_robin: Flag to take turns between the hosts.
+        :param host_weights: Number of URLs popped per turn of each host (default=1). Implies `round_robin`.
+        """
+        if order not in ("bfs", "dfs"):
+            raise ValueError(f'Unsupported crawl order "{order}". Use "bfs" or "dfs".')
+        self.max_depth = max_depth
+        self.order = order
+        self.priority = priority
+        self.round_robin = round_robin or bool(host_weights)
+        self.host_weights = host_weights or {}
+        # heaps of (priority, position, depth, url) per host, positions are negated for depth-first crawls
+        # without round-robin, all the URLs are in the queue of the empty host
+        self._queues: Dict[str, List[Tuple[float, int, int, str]]] = {}
+        self._sizes: Dict[str, int] = {}  # host -> number of queued URLs
+        self._hosts: Deque[str] = collections.deque()  # hosts with queued URLs, the current turn is the first one
+        self._turn = 0  # number of URLs popped in the current turn
+        self._size = 0
+        self._seen: Dict[str, int] = {}  # canonical URL -> depth
+        self._counter = 0
+        self.extend(urls)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __contains__(self, url: str) -> bool:
+        """
+        Checks if a URL has been queued or marked as seen before.
+        """
+        return canonicalize_url(url) in self._seen
+
+    def append(self, url: str, depth: int = 0) -> bool:
+        """
+        Queues a URL if it has not been seen before and is not deeper than `max_depth`.
+
+        :param url: Absolute URL.
+        :param depth: Number of links followed from the starting URLs.
+        :return: True if the URL was queued.
+        """
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        key = canonicalize_url(url)
+        if key in self._seen:
+            return False
+        self._seen[key] = depth
+        self._push(url, depth)
+        return True
+
+    def extend(self, urls: Iterable[str], depth: int = 0) -> None:
+        for url in urls:
+            self.append(url, depth)
+
+    def popleft(self) -> str:
+        """
+        Pops the next URL to crawl.
+
+        :raises IndexError: If the queue is empty.
+        """
+        if not self._hosts:
+            raise IndexError("pop from an empty frontier")
+        host = self._hosts[0]
+        url = self._pop_host(host)
+        self._size -= 1
+        self._sizes[host] -= 1
+        self._turn += 1
+        if not self._sizes[host]:
+            self._hosts.popleft()
+            self._drop_host(host)
+            self._turn = 0
+        elif self._turn >= self.host_weights.get(host, 1):
+            self._hosts.rotate(-1)
+            self._turn = 0
+        return url
+
+    def popleft_if(self, accept: Callable[[str], bool]) -> Optional[str]:
+        """
+        Pops the next URL to crawl if it is accepted, leaving it in place otherwise.
+        With round-robin, a host whose next URL is not accepted loses its turn and the next hosts are tried,
+        without round-robin the URL blocks the ones after it.
+
+        :param accept: Function that receives the next URL and returns True to pop it.
+        :return: URL or None if the frontier is empty or no URL was accepted.
+        """
+        for _ in range(len(self._hosts)):
+            if accept(self._peek_host(self._hosts[0])):
+                return self.popleft()
+            self._hosts.rotate(-1)
+            self._turn = 0
+        return None
+
+    def depth(self, url: str) -> Optional[int]:
+        """
+        Gets the depth of a URL that has been queued or marked as seen before.
+        """
+        return self._seen.get(canonicalize_url(url))
+
+    def mark_seen(self, url: str, depth: int = 0) -> None:
+        """
+        Marks a URL as seen without queueing it, e.g. the final URL of a redirect.
+        """
+        self._seen.setdefault(canonicalize_url(url), depth)
+
+    def requeue(self, url: str) -> None:
+        """
+        Queues a URL again even if it has been seen before, e.g. a URL that was not crawled before a checkpoint.
+        """
+        depth = self._seen.setdefault(canonicalize_url(url), 0)
+        self._push(url, depth)
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Gets the picklable state of the frontier for checkpoints.
+        """
+        queue = [row for host in self._hosts for row in self._queues[host]]
+        return {"queue": queue, "seen": dict(self._seen), "counter": self._counter}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restores the state of the frontier from a checkpoint.
+        """
+        self._queues.clear()
+        self._sizes.clear()
+        self._hosts.clear()
+        self._turn = 0
+        self._size = 0
+        for row in state["queue"]:
+            self._push_row(row)
+        self._seen = dict(state["seen"])
+        self._counter = state["counter"]
+
+    def close(self) -> None:
+        """
+        Releases the resources used by the frontier.
+        """
+
+    def _next_key(self, url: str, depth: int) -> Tuple[float, int]:
+        """
+        Gets the sort key of a URL to be queued.
+        """
+        self._counter += 1
+        priority = self.priority(url, depth) if self.priority else 0
+        return priority, self._counter if self.order == "bfs" else -self._counter
+
+    def _host(self, url: str) -> str:
+        """
+        Gets the key of the queue of a URL, i.e. its host with round-robin or an empty string without.
+        """
+        return urlsplit(url).netloc if self.round_robin else ""
+
+    def _push(self, url: str, depth: int) -> None:
+        self._push_row((*self._next_key(url, depth), depth, url))
+
+    def _push_row(self, row: Tuple[float, int, int, str]) -> None:
+        host = self._count_host(row[3])
+        queue = self._queues.setdefault(host, [])
+        heapq.heappush(queue, row)
+
+    def _count_host(self, url: str) -> str:
+        """
+        Counts a queued URL, giving its host a turn if it had no queued URLs.
+
+        :return: Host of the URL.
+        """
+        host = self._host(url)
+        if host not in self._sizes:
+            self._sizes[host] = 0
+            self._hosts.append(host)
+        self._sizes[host] += 1
+        self._size += 1
+        return host
+
+    def _pop_host(self, host: str) -> str:
+        """
+        Pops the next URL of a host.
+        """
+        return heapq.heappop(self._queues[host])[3]
+
+    def _peek_host(self, host: str) -> str:
+        """
+        Gets the next URL of a host without popping it.
+        """
+        return self._queues[host][0][3]
+
+    def _drop_host(self, host: str) -> None:
+        """
+        Forgets a host whose URLs have all been popped.
+        """
+        del self._sizes[host]
+        self._queues.pop(host, None)
+
+
+class SQLiteURLFrontier(URLFrontier):
+    """
+    Queue of URLs to crawl stored in an SQLite database.
+
+    Only a small window of URLs to be popped next is kept in memory, a smaller one per host with round-robin.
+    The queue and the seen URLs are written in batches to keep the number of transactions low.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str] = (),
+        path: Optional[str] = None,
+        batch_size: int = 1000,
+        host_batch_size: int = 10,
+        resume: bool = False,
+        max_depth: Optional[int] = None,
+        order: str = "bfs",
+        priority: Optional[Callable[[str, int], float]] = None,
+        round_robin: bool = False,
+        host_weights: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """
+        :param urls: URLs to queue, with a depth of 0.
+        :param path: Database file. If not provided, a temporary file is used and deleted on close.
+        :param batch_size: Number of URLs written or loaded per transaction.
+        :param host_batch_size: Number of URLs of a host loaded per transaction with round-robin (at least its weight),
+            so that the URLs kept in memory do not grow with the number of hosts.
+        :param resume: Flag to keep the URLs of an existing database, see `set_state()`.
+        :param max_depth: Maximum depth of the queued URLs. URLs found deeper are ignored.
+        :param order: Order of the URLs with the same priority, "bfs" (breadth-first) or "dfs" (depth-first).
+        :param priority: Function that receives a URL and its depth and returns its priority.
+        :param round_robin: Flag to take turns between the hosts.
+        :param host_weights: Number of URLs popped per turn of each host (default=1). Implies `round_robin`.
+        """
+        self._temp_dir: Optional[tempfile.TemporaryDirectory] = None
+        if path is None:
+            self._temp_dir = tempfile.TemporaryDirectory(prefix="dude-")
+            path = os.path.join(self._temp_dir.name, "frontier.sqlite3")
+        self.path = path
+        self.batch_size = batch_size
+        self.host_batch_size = host_batch_size
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        if not resume:
+            self._connection.execute("DROP TABLE IF EXISTS seen")
+            self._connection.execute("DROP TABLE IF EXISTS queue")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY, depth INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS queue ("
+            "position INTEGER PRIMARY KEY, priority REAL NOT NULL, depth INTEGER NOT NULL, url TEXT NOT NULL, "
+            "host TEXT NOT NULL, popped INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS queue_order ON queue (host, priority, position)")
+        self._connection.commit()
+        self._pending: List[Tuple[float, int, int, str, str]] = []  # queued rows not yet written to the queue table
+        # popped rows are only deleted on checkpoints so that the database matches the last checkpoint
+        self._popped: List[int] = []  # positions of popped rows not yet marked as popped in the queue table
+        # the queue of each host is a heap of the rows to be popped next,
+        # it contains every unpopped row of the host with a key up to the host's bound
+        self._bounds: Dict[str, Tuple[float, int]] = {}
+        super().__init__(
+            max_depth=max_depth, order=order, priority=priority, round_robin=round_robin, host_weights=host_weights
+        )
+        self._count_rows()
+        self.extend(urls)
+
+    def __contains__(self, url: str) -> bool:
+        return self.depth(url) is not None
+
+    def append(self, url: str, depth: int = 0) -> bool:
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        cursor = self._connection.execute(
+            "INSERT OR IGNORE INTO seen (url, depth) VALUES (?, ?)", (canonicalize_url(url), depth)
+        )
+        if not cursor.rowcount:
+            return False
+        self._push(url, depth)
+        return True
+
+    def depth(self, url: str) -> Optional[int]:
+        cursor = self._connection.execute("SELECT depth FROM seen WHERE url = ?", (canonicalize_url(url),))
+        row = cursor.fetchone()
+        return None if row is None else row[0]
+
+    def mark_seen(self, url: str, depth: int = 0) -> None:
+        self._connection.execute(
+            "INSERT OR IGNORE INTO seen (url, depth) VALUES (?, ?)", (canonicalize_url(url), depth)
+        )
+
+    def requeue(self, url: str) -> None:
+        self.mark_seen(url)
+        self._push(url, self.depth(url) or 0)
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Writes the pending URLs and removes the popped URLs from the database.
+        The queue and seen URLs are not part of the state since they are already in the database.
+        """
+        self._flush()
+        self._connection.execute("DELETE FROM queue WHERE popped = 1")
+        self._connection.commit()
+        return {"counter": self._counter}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """
+        Queues again the URLs that were popped after the checkpoint.
+        """
+        self._flush()
+        self._connection.execute("UPDATE queue SET popped = 0")
+        self._connection.commit()
+        self._queues.clear()
+        self._bounds.clear()
+        self._sizes.clear()
+        self._hosts.clear()
+        self._turn = 0
+        self._size = 0
+        self._count_rows()
+        max_position = self._connection.execute("SELECT MAX(ABS(position)) FROM queue").fetchone()[0]
+        self._counter = max(state["counter"], max_position or 0)
+
+    def _count_rows(self) -> None:
+        """
+        Counts the unpopped rows of each host in the database.
+        """
+        cursor = self._connection.execute(
+            "SELECT host, COUNT(*) FROM queue WHERE popped = 0 GROUP BY host ORDER BY MIN(position)"
+        )
+        for host, count in cursor:
+            self._sizes[host] = count
+            self._hosts.append(host)
+            self._size += count
+
+    def _push_row(self, row: Tuple[float, int, int, str]) -> None:
+        host = self._count_host(row[3])
+        self._pending.append((*row, host))
+        bound = self._bounds.get(host)
+        if bound is not None and row[:2] <= bound:
+            # rows are loaded in order, a row sorted before the last loaded row would be skipped
+            heapq.heappush(self._queues.setdefault(host, []), row)
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+
+    def _pop_host(self, host: str) -> str:
+        if not self._queues.get(host):
+            self._load(host)
+        _, position, _, url = heapq.heappop(self._queues[host])
+        self._popped.append(position)
+        return url
+
+    def _peek_host(self, host: str) -> str:
+        if not self._queues.get(host):
+            self._load(host)
+        return self._queues[host][0][3]
+
+    def _drop_host(self, host: str) -> None:
+        super()._drop_host(host)
+        self._bounds.pop(host, None)
+
+    def _flush(self) -> None:
+        """
+        Writes the pending URLs and the popped positions to the queue table.
+        """
+        if self._pending:
+            self._connection.executemany(
+                "INSERT INTO queue (priority, position, depth, url, host) VALUES (?, ?, ?, ?, ?)", self._pending
+            )
+            self._pending.clear()
+        if self._popped:
+            self._connection.executemany(
+                "UPDATE queue SET popped = 1 WHERE position = ?", ((position,) for position in self._popped)
+            )
+            self._popped.clear()
+        self._connection.commit()
+
+    def _load(self, host: str) -> None:
+        """
+        Loads the next batch of URLs of a host to be popped.
+        """
+        self._flush()
+        limit = self.batch_size
+        if self.round_robin:
+            limit = min(limit, max(self.host_batch_size, self.host_weights.get(host, 1)))
+        bound = self._bounds.get(host)
+        if bound is None:
+            cursor = self._connection.execute(
+                "SELECT priority, position, depth, url FROM queue WHERE host = ? AND popped = 0 "
+                "ORDER BY priority, position LIMIT ?",
+                (host, limit),
+            )
+        else:
+            cursor = self._connection.execute(
+                "SELECT priority, position, depth, url FROM queue "
+                "WHERE host = ? AND popped = 0 AND (priority, position) > (?, ?) "
+                "ORDER BY priority, position LIMIT ?",
+                (host, *bound, limit),
+            )
+        rows = cursor.fetchall()
+        if rows:
+            queue = self._queues.setdefault(host, [])
+            queue.extend(rows)
+            heapq.heapify(queue)
+            self._bounds[host] = rows[-1][0], rows[-1][1]
+
+    def close(self) -> None:
+        self.get_state()
+        self._connection.close()
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
@@ -0,0 +1,133 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .frontier import canonicalize_url
+from .stats import Stats
+
+logger = logging.getLogger(__name__)
+
+# headers describing the transfer rather than the content, the cached content is stored decoded
+HOP_HEADERS = {"connection", "content-encoding", "content-length", "keep-alive", "transfer-encoding"}
+
+
+class CachedResponse(NamedTuple):
+    url: str  # final URL, after redirects
+    headers: List[Tuple[str, str]]
+    content: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+
+class HTTPCache:
+    """
+    Persistent cache of the successful responses of GET requests, stored in an SQLite database.
+
+    Cached responses are revalidated with their validators (ETag and Last-Modified), so that unchanged pages are
+    answered with 304 Not Modified instead of being downloaded again.
+    In offline mode, cached responses are replayed without sending any request and uncached pages are skipped.
+    """
+
+    def __init__(self, path: str, offline: bool = False, stats: Optional[Stats] = None) -> None:
+        """
+        :param path: Database file, created if it does not exist.
+        :param offline: Flag to replay the cached responses without sending any request.
+        :param stats: Optional stats where the cache hits, misses and stored responses are counted.
+        """
+        self.path = path
+        self.offline = offline
+        self.stats = stats
+        self._lock = threading.Lock()
+        # several processes may share the database when crawling with multiple processes
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, url TEXT NOT NULL, headers TEXT NOT NULL, content BLOB NOT NULL, "
+            "etag TEXT, last_modified TEXT, stored_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._connection.commit()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """
+        Gets the cached response of a URL, counting it as a hit or a miss.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url, headers, content, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                (canonicalize_url(url),),
+            ).fetchone()
+        self._increment("http_cache.misses" if row is None else "http_cache.hits")
+        if row is None:
+            return None
+        final_url, raw_headers, content, etag, last_modified, stored_at = row
+        headers = [(name, value) for name, value in json.loads(raw_headers)]
+        return CachedResponse(final_url, headers, content, etag, last_modified, stored_at)
+
+    def validators(self, cached: CachedResponse) -> Dict[str, str]:
+        """
+        Gets the headers of a conditional request revalidating a cached response.
+        """
+        headers = {}
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        return headers
+
+    def store(self, url: str, final_url: str, headers: Iterable[Tuple[str, str]], content: bytes) -> None:
+        """
+        Stores a response unless it forbids it with "Cache-Control: no-store".
+
+        :param url: Requested URL.
+        :param final_url: URL of the response, after redirects.
+        :param headers: Response headers.
+        :param content: Decoded response body.
+        """
+        headers = [(name.lower(), value) for name, value in headers if name.lower() not in HOP_HEADERS]
+        values = dict(headers)
+        if "no-store" in values.get("cache-control", "").lower():
+            return
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, url, headers, content, etag, last_modified, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    canonicalize_url(url),
+                    final_url,
+                    json.dumps(headers),
+                    content,
+                    values.get("etag"),
+                    values.get("last-modified"),
+                    time.time(),
+                ),
+            )
+            self._connection.commit()
+        self._increment("http_cache.stored")
+
+    def touch(self, url: str) -> None:
+        """
+        Marks a cached response as revalidated (304 Not Modified).
+        """
+        with self._lock:
+            self._connection.execute(
+                "UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), canonicalize_url(url))
+            )
+            self._connection.commit()
+        self._increment("http_cache.revalidated")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _increment(self, name: str) -> None:
+        if self.stats is not None:
+            self.stats.increment(name)
@@ -1,7 +1,6 @@
 import itertools
 import logging
-from typing import Any, AsyncIterable, Callable, Iterable, Optional, Sequence, Tuple
-from urllib.parse import urljoin
+from typing import Any, AsyncIterable, Callable, Iterable, List, Optional, Tuple
 
 import httpx
 from bs4 import BeautifulSoup
@@ -9,19 +8,20 @@ from httpx._types import ProxiesTypes
 
 from ..base import ScraperAbstract
 from ..rule import Selector, SelectorType, rule_grouper, rule_sorter
-from .utils import HTTPXMixin, async_http_get, http_get
+from ..scraped_data import ScrapedData
+from .utils import Content, HTTPXMixin, RawContent
 
 logger = logging.getLogger(__name__)
 
 
-class BeautifulSoupScraper(ScraperAbstract, HTTPXMixin):
+class BeautifulSoupScraper(HTTPXMixin, ScraperAbstract):
     """
     Scraper using BeautifulSoup4 parser and HTTPX for requests
     """
 
     def run(
         self,
-        urls: Sequence[str],
+        urls: Iterable[str],
         pages: int = 1,
         proxy: Optional[ProxiesTypes] = None,
         output: Optional[str] = None,
@@ -34,7 +34,7 @@ class BeautifulSoupScraper(ScraperAbstract, HTTPXMixin):
         """
         Executes BeautifulSoup4-based scraper.
 
-        :param urls: List of website URLs.
+        :param urls: Website URLs, e.g. a list or a `URLFile` that is read lazily.
         :param pages: Maximum number of pages to crawl before exiting (default=1). This is only used when a navigate handler is defined. # noqa
         :param proxy: Proxy settings. (see https://www.python-httpx.org/advanced/#http-proxying)  # noqa
         :param output: Output file. If not provided, prints in the terminal.
@@ -66,32 +66,11 @@ class BeautifulSoupScraper(ScraperAbstract, HTTPXMixin):
         **kwargs: Any,
     ) -> None:
         with httpx.Client(
-            proxies=proxy,
             event_hooks={"request": [self._block_httpx_request_if_needed]},
             follow_redirects=True,
+            **self._httpx_options(proxy, kwargs, is_async=False),
         ) as client:
-            for request in self.iter_requests():
-                logger.info("Requesting url %s - %s", request.method, request.url)
-                for i in range(1, pages + 1):
-                    content, url = http_get(client, request)
-                    if not content:
-                        break
-
-                    soup = BeautifulSoup(content, "html.parser")
-                    if follow_urls:
-                        for link in soup.find_all("a", href=True):
-                            absolute = urljoin(url, link["href"])
-                            if absolute.rstrip("/") != url.rstrip("/"):
-                                self.urls.append(absolute)
-
-                    self.setup(soup)
-
-                    self.collected_data.extend(self.extract_all(page_number=i, soup=soup, url=url))
-                    if save_per_page:
-                        self._save(format, output, save_per_page)
-
-                    if i == pages or not self.navigate():
-                        break
+            self._crawl(client, pages, output, format, follow_urls, save_per_page, **kwargs)
 
     async def run_async(
         self,
@@ -104,32 +83,30 @@ class BeautifulSoupScraper(ScraperAbstract, HTTPXMixin):
         **kwargs: Any,
     ) -> None:
         async with httpx.AsyncClient(
-            proxies=proxy, event_hooks={"request": [self._async_block_httpx_request_if_needed]}
+            event_hooks={"request": [self._async_block_httpx_request_if_needed]},
+            **self._httpx_options(proxy, kwargs, is_async=True),
         ) as client:
-            for request in self.iter_requests():
-                logger.info("Requesting url %s - %s", request.method, request.url)
-                for i in range(1, pages + 1):
-                    content, url = await async_http_get(client, request)
-                    if not content:
-                        break
-
-                    soup = BeautifulSoup(content, "html.parser")
-                    if follow_urls:
-                        for link in soup.find_all("a", href=True):
-                            absolute = urljoin(url, link["href"])
-                            if absolute.rstrip("/") != url.rstrip("/"):
-                                self.urls.append(absolute)
-
-                    await self.setup_async(soup)
-
-                    self.collected_data.extend(
-                        [data async for data in self.extract_all_async(page_number=i, soup=soup, url=url)]
-                    )
-                    if save_per_page:
-                        await self._save_async(format, output, save_per_page)
-
-                    if i == pages or not await self.navigate_async():
-                        break
+            await self._crawl_async(client, pages, output, format, follow_urls, save_per_page, **kwargs)
+
+    def _scrape_page(self, content: Content, url: str, page_number: int, follow_urls: bool) -> List[ScrapedData]:
+        soup = _parse(content)
+        if follow_urls:
+            self.follow_links(url, (link["href"] for link in soup.find_all("a", href=True)))
+
+        self.setup(soup)
+
+        return list(self.extract_all(page_number=page_number, soup=soup, url=url))
+
+    async def _scrape_page_async(
+        self, content: Content, url: str, page_number: int, follow_urls: bool
+    ) -> List[ScrapedData]:
+        soup = _parse(content)
+        if follow_urls:
+            self.follow_links(url, (link["href"] for link in soup.find_all("a", href=True)))
+
+        await self.setup_async(soup)
+
+        return [data async for data in self.extract_all_async(page_number=page_number, soup=soup, url=url)]
 
     def setup(self, soup: Optional[BeautifulSoup] = None) -> None:
         """
@@ -186,3 +163,9 @@ class BeautifulSoupScraper(ScraperAbstract, HTTPXMixin):
     async def collect_elements_async(self, **kwargs: Any) -> AsyncIterable[Tuple[str, int, int, int, Any, Callable]]:
         for item in self.collect_elements(**kwargs):
             yield item
+
+
+def _parse(content: Content) -> BeautifulSoup:
+    if isinstance(content, RawContent):
+        return BeautifulSoup(content.body, "html.parser", from_encoding=content.parser_encoding())
+    return BeautifulSoup(content, "html.parser")
@@ -1,27 +1,29 @@
 import itertools
 import logging
-from typing import Any, AsyncIterable, Callable, Iterable, Optional, Sequence, Tuple
-from urllib.parse import urljoin
+from typing import Any, AsyncIterable, Callable, Iterable, List, Optional, Tuple
 
 import httpx
+import lxml.etree
+import lxml.html
 from httpx._types import ProxiesTypes
 from parsel import Selector as ParselSelector
 
 from ..base import ScraperAbstract
 from ..rule import Selector, SelectorType, rule_grouper, rule_sorter
-from .utils import HTTPXMixin, async_http_get, http_get
+from ..scraped_data import ScrapedData
+from .utils import Content, HTTPXMixin, RawContent
 
 logger = logging.getLogger(__name__)
 
 
-class ParselScraper(ScraperAbstract, HTTPXMixin):
+class ParselScraper(HTTPXMixin, ScraperAbstract):
     """
     Scraper using Parsel parser backend and HTTPX for requests
     """
 
     def run(
         self,
-        urls: Sequence[str],
+        urls: Iterable[str],
         pages: int = 1,
         proxy: Optional[ProxiesTypes] = None,
         output: Optional[str] = None,
@@ -34,7 +36,7 @@ class ParselScraper(ScraperAbstract, HTTPXMixin):
         """
         Executes Parsel-based scraper.
 
-        :param urls: List of website URLs.
+        :param urls: Website URLs, e.g. a list or a `URLFile` that is read lazily.
         :param pages: Maximum number of pages to crawl before exiting (default=1). This is only used when a navigate handler is defined. # noqa
         :param proxy: Proxy settings. (see https://www.python-httpx.org/advanced/#http-proxying)  # noqa
         :param output: Output file. If not provided, prints in the terminal.
@@ -66,33 +68,11 @@ class ParselScraper(ScraperAbstract, HTTPXMixin):
         **kwargs: Any,
     ) -> None:
         with httpx.Client(
-            proxies=proxy,
             event_hooks={"request": [self._block_httpx_request_if_needed]},
             follow_redirects=True,
+            **self._httpx_options(proxy, kwargs, is_async=False),
         ) as client:
-            for request in self.iter_requests():
-                logger.info("Requesting url %s - %s", request.method, request.url)
-                for i in range(1, pages + 1):
-                    content, url = http_get(client, request)
-                    if not content:
-                        break
-
-                    selector = ParselSelector(content, base_url=url)
-                    if follow_urls:
-                        for link in selector.root.iterlinks():
-                            absolute = urljoin(url, link[2])
-                            if absolute.rstrip("/") != url.rstrip("/"):
-                                self.urls.append(absolute)
-
-                    self.setup(selector)
-
-                    self.collected_data.extend(self.extract_all(page_number=i, selector=selector, url=url))
-
-                    if save_per_page:
-                        self._save(format, output, save_per_page)
-
-                    if i == pages or not self.navigate():
-                        break
+            self._crawl(client, pages, output, format, follow_urls, save_per_page, **kwargs)
 
     async def run_async(
         self,
@@ -105,33 +85,30 @@ class ParselScraper(ScraperAbstract, HTTPXMixin):
         **kwargs: Any,
     ) -> None:
         async with httpx.AsyncClient(
-            proxies=proxy, event_hooks={"request": [self._async_block_httpx_request_if_needed]}
+            event_hooks={"request": [self._async_block_httpx_request_if_needed]},
+            **self._httpx_options(proxy, kwargs, is_async=True),
         ) as client:
-            for request in self.iter_requests():
-                logger.info("Requesting url %s - %s", request.method, request.url)
-                for i in range(1, pages + 1):
-                    content, url = await async_http_get(client, request)
-                    if not content:
-                        break
+            await self._crawl_async(client, pages, output, format, follow_urls, save_per_page, **kwargs)
+
+    def _scrape_page(self, content: Content, url: str, page_number: int, follow_urls: bool) -> List[ScrapedData]:
+        selector = _parse(content, url)
+        if follow_urls:
+            self.follow_links(url, (link[2] for link in selector.root.iterlinks()))
 
-                    selector = ParselSelector(content, base_url=url)
-                    if follow_urls:
-                        for link in selector.root.iterlinks():
-                            absolute = urljoin(url, link[2])
-                            if absolute.rstrip("/") != url.rstrip("/"):
-                                self.urls.append(absolute)
+        self.setup(selector)
 
-                    await self.setup_async(selector)
+        return list(self.extract_all(page_number=page_number, selector=selector, url=url))
 
-                    self.collected_data.extend(
-                        [data async for data in self.extract_all_async(page_number=i, selector=selector, url=url)]
-                    )
+    async def _scrape_page_async(
+        self, content: Content, url: str, page_number: int, follow_urls: bool
+    ) -> List[ScrapedData]:
+        selector = _parse(content, url)
+        if follow_urls:
+            self.follow_links(url, (link[2] for link in selector.root.iterlinks()))
 
-                    if save_per_page:
-                        await self._save_async(format, output, save_per_page)
+        await self.setup_async(selector)
 
-                    if i == pages or not await self.navigate_async():
-                        break
+        return [data async for data in self.extract_all_async(page_number=page_number, selector=selector, url=url)]
 
     def setup(self, selector: Optional[ParselSelector] = None) -> None:
         """
@@ -189,3 +166,14 @@ class ParselScraper(ScraperAbstract, HTTPXMixin):
     async def collect_elements_async(self, **kwargs: Any) -> AsyncIterable[Tuple[str, int, int, int, Any, Callable]]:
         for item in self.collect_elements(**kwargs):
             yield item
+
+
+def _parse(content: Content, url: str) -> ParselSelector:
+    if isinstance(content, RawContent):
+        # parsel encodes text to UTF-8 before parsing it, the body is parsed directly instead
+        parser = lxml.html.HTMLParser(recover=True, encoding=content.parser_encoding())
+        root = lxml.etree.fromstring(content.body, parser=parser, base_url=url)
+        if root is None:  # only whitespace
+            root = lxml.etree.fromstring(b"<html/>", parser=parser)
+        return ParselSelector(root=root, base_url=url)
+    return ParselSelector(content, base_url=url)
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+# status code, headers and raw body (still content-encoded) of a recorded response
+RecordedResponse = Tuple[int, List[Tuple[str, str]], bytes]
+
+
+class ExchangeArchive:
+    """
+    HTTP exchanges (request and response) stored in an SQLite database, with zlib-compressed bodies.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: Database file, created if it does not exist.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        # several processes may share the database when crawling with multiple processes
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS exchanges ("
+            "id INTEGER PRIMARY KEY, method TEXT NOT NULL, url TEXT NOT NULL, request_headers TEXT NOT NULL, "
+            "request_body BLOB NOT NULL, status INTEGER NOT NULL, headers TEXT NOT NULL, body BLOB NOT NULL, "
+            "elapsed REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS exchanges_request ON exchanges (method, url)")
+        self._connection.commit()
+
+    def add(
+        self, request: httpx.Request, status: int, headers: List[Tuple[str, str]], body: bytes, elapsed: float
+    ) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO exchanges (method, url, request_headers, request_body, status, headers, body, elapsed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    request.method,
+                    str(request.url),
+                    json.dumps(request.headers.multi_items()),
+                    zlib.compress(request.content),
+                    status,
+                    json.dumps(headers),
+                    zlib.compress(body),
+                    elapsed,
+                ),
+            )
+            self._connection.commit()
+
+    def get(self, request: httpx.Request) -> List[RecordedResponse]:
+        """
+        Gets the responses recorded for a request (same method, URL and body) in the order they were received.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT request_body, status, headers, body FROM exchanges WHERE method = ? AND url = ? ORDER BY id",
+                (request.method, str(request.url)),
+            ).fetchall()
+        return [
+            (status, [(name, value) for name, value in json.loads(headers)], zlib.decompress(body))
+            for request_body, status, headers, body in rows
+            if zlib.decompress(request_body) == request.content
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM exchanges").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class RecordingTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    HTTPX transport saving every exchange to an archive, to replay the crawl later with `ReplayTransport`.
+
+    Works as a sync or an async transport, depending on the wrapped transport.
+    Response bodies are fully read before they are returned.
+    """
+
+    def __init__(self, transport: Any, path: str) -> None:
+        """
+        :param transport: Transport sending the requests, e.g. `httpx.HTTPTransport` or `httpx.AsyncHTTPTransport`.
+        :param path: Archive file.
+        """
+        self.transport = transport
+        self.archive = ExchangeArchive(path)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        started = time.monotonic()
+        response = self.transport.handle_request(request)
+        # the raw stream is read directly since responses of some transports (e.g. MockTransport) are already read
+        stream = response.stream
+        assert isinstance(stream, httpx.SyncByteStream)
+        try:
+            body = b"".join(stream)
+        finally:
+            stream.close()
+        return self._record(request, response, body, time.monotonic() - started)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        started = time.monotonic()
+        response = await self.transport.handle_async_request(request)
+        stream = response.stream
+        assert isinstance(stream, httpx.AsyncByteStream)
+        try:
+            body = b"".join([chunk async for chunk in stream])
+        finally:
+            await stream.aclose()
+        return self._record(request, response, body, time.monotonic() - started)
+
+    def _record(self, request: httpx.Request, response: httpx.Response, body: bytes, elapsed: float) -> httpx.Response:
+        headers = response.headers.multi_items()
+        self.archive.add(request, response.status_code, headers, body, elapsed)
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            stream=httpx.ByteStream(body),
+            request=request,
+            extensions=response.extensions,
+        )
+
+    def close(self) -> None:
+        self.transport.close()
+        self.archive.close()
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+        self.archive.close()
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    HTTPX transport serving the exchanges recorded by `RecordingTransport`, without sending any request.
+
+    A request recorded several times (e.g. retries) gets the recorded responses in order, then the last one again.
+    Requests that were not recorded fail with a connection error.
+    """
+
+    def __init__(self, path: str, latency: float = 0.0) -> None:
+        """
+        :param path: Archive file.
+        :param latency: Number of seconds to wait before each response, to simulate the network.
+        """
+        self.archive = ExchangeArchive(path)
+        self.latency = latency
+        self._served: Dict[Tuple[str, str, bytes], int] = {}  # request -> number of responses served
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        if self.latency > 0:
+            time.sleep(self.latency)
+        return self._replay(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        return self._replay(request)
+
+    def _replay(self, request: httpx.Request) -> httpx.Response:
+        responses = self.archive.get(request)
+        if not responses:
+            raise httpx.ConnectError(f"{request.method} {request.url} was not recorded.", request=request)
+        key = (request.method, str(request.url), request.content)
+        with self._lock:
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+        status, headers, body = responses[min(served, len(responses) - 1)]
+        return httpx.Response(status, headers=headers, stream=httpx.ByteStream(body), request=request)
+
+    def close(self) -> None:
+        self.archive.close()
+
+    async def aclose(self) -> None:
+        self.archive.close()
@@ -1,8 +1,7 @@
 import asyncio
 import itertools
 import logging
-from typing import Any, AsyncIterable, Callable, Iterable, Optional, Sequence, Tuple, Union
-from urllib.parse import urljoin
+from typing import Any, AsyncIterable, Callable, Iterable, Optional, Tuple, Union
 
 from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.options import Options as ChromeOptions
@@ -32,7 +31,7 @@ class SeleniumScraper(ScraperAbstract):
 
     def run(
         self,
-        urls: Sequence[str],
+        urls: Iterable[str],
         pages: int = 1,
         proxy: Optional[Any] = None,
         output: Optional[str] = None,
@@ -47,7 +46,7 @@ class SeleniumScraper(ScraperAbstract):
         """
         Executes Selenium-based scraper.
 
-        :param urls: List of website URLs.
+        :param urls: Website URLs, e.g. a list or a `URLFile` that is read lazily.
         :param pages: Maximum number of pages to crawl before exiting (default=1). This is only used when a navigate handler is defined. # noqa
         :param proxy: Proxy settings.
         :param output: Output file. If not provided, prints in the terminal.
@@ -162,10 +161,8 @@ class SeleniumScraper(ScraperAbstract):
                 continue
             logger.info("Loaded page %s", driver.current_url)
             if follow_urls:
-                for link in driver.find_elements(by=By.CSS_SELECTOR, value="a"):
-                    absolute = urljoin(driver.current_url, link.get_attribute("href"))
-                    if absolute.rstrip("/") != driver.current_url.rstrip("/"):
-                        self.urls.append(absolute)
+                links = driver.find_elements(by=By.CSS_SELECTOR, value="a")
+                self.follow_links(driver.current_url, (link.get_attribute("href") for link in links))
 
             self.setup(driver=driver)
 
@@ -195,7 +192,7 @@ class SeleniumScraper(ScraperAbstract):
     ) -> None:
         driver = self._get_driver(browser_type, headless)
 
-        for url in self.iter_urls():
+        async for url in self.iter_urls_async():
             logger.info("Requesting url %s", url)
             try:
                 driver.get(url)
@@ -204,10 +201,8 @@ class SeleniumScraper(ScraperAbstract):
                 continue
             logger.info("Loaded page %s", driver.current_url)
             if follow_urls:
-                for link in driver.find_elements(by=By.CSS_SELECTOR, value="a"):
-                    absolute = urljoin(driver.current_url, link.get_attribute("href"))
-                    if absolute.rstrip("/") != driver.current_url.rstrip("/"):
-                        self.urls.append(absolute)
+                links = driver.find_elements(by=By.CSS_SELECTOR, value="a")
+                self.follow_links(driver.current_url, (link.get_attribute("href") for link in links))
 
             await self.setup_async(driver=driver)
 
@@ -1,34 +1,369 @@
+import asyncio
+import codecs
+import collections
+import concurrent.futures
 import logging
+import multiprocessing
+import queue
+import re
+import threading
 import time
-from typing import Iterable, Optional, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Collection, Deque, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
 
 import httpx
 from httpx import Request
+from httpx._types import ProxiesTypes
+
+from ..circuit_breaker import CircuitBreaker
+from ..concurrency import AdaptiveConcurrency
+from ..frontier import URLFrontier
+from ..http_cache import CachedResponse, HTTPCache
+from ..scraped_data import ScrapedData
+from .recording import RecordingTransport, ReplayTransport
 
 logger = logging.getLogger(__name__)
 
+# called with the failed request, its status code (None for network errors) and Retry-After header,
+# returns True if the request will be retried
+RetryCallback = Callable[[Request, Optional[int], Optional[str]], bool]
+
+
+# byte order marks and <meta> tags declaring the encoding, looked for at the start of the body like browsers do
+_BOMS = (codecs.BOM_UTF8, codecs.BOM_UTF16_BE, codecs.BOM_UTF16_LE)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset", re.IGNORECASE)
+_SNIFF_SIZE = 1024
+
+
+class RawContent(NamedTuple):
+    """
+    Body of a page with its declared encoding, so that it is parsed without being decoded to a string first.
+    """
+
+    body: bytes
+    encoding: Optional[str]  # charset of the Content-Type header, None if it is missing or unknown
+
+    def __bool__(self) -> bool:
+        return bool(self.body)
+
+    def parser_encoding(self) -> Optional[str]:
+        """
+        Gets the encoding passed to the parsers: the declared encoding, None to let the parser detect it from a BOM or
+        a `<meta charset>` tag, otherwise UTF-8 like `_content()`.
+        """
+        if self.encoding:
+            return self.encoding
+        if self.body.startswith(_BOMS) or _META_CHARSET.search(self.body[:_SNIFF_SIZE]):
+            return None
+        return "utf-8"
+
+
+# content of a page, decoded or raw
+Content = Union[str, RawContent]
+
+# scraper copied into a parser process when it was forked and the frontier it inherited from the main process
+_process_scraper: Any = None
+_inherited_frontier: Any = None
+
+
+class ResponseFilter(NamedTuple):
+    """
+    Content types and maximum size of the responses to read.
+
+    Responses are streamed so that they are rejected from their headers, or as soon as they are too large,
+    without downloading the rest of the body.
+    """
+
+    content_types: Optional[Collection[str]] = None  # e.g. "text/html" or "text/*", all types if not provided
+    max_body_size: Optional[int] = None  # bytes, after decompression
+
+    def accepts(self, response: httpx.Response) -> bool:
+        """
+        Checks the content type and the content length of a response before reading its body.
+        Responses without a content type are accepted.
+        """
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if (
+            content_type
+            and self.content_types is not None
+            and not _match_content_type(content_type, self.content_types)
+        ):
+            logger.info("Skipping %s, content type %s is not allowed.", response.url, content_type)
+            return False
+        content_length = response.headers.get("Content-Length", "")
+        if content_length.isdigit() and self.is_too_large(int(content_length), response):
+            return False
+        return True
+
+    def is_too_large(self, size: int, response: httpx.Response) -> bool:
+        if self.max_body_size is None or size <= self.max_body_size:
+            return False
+        logger.warning("Skipping %s, the response is larger than %d bytes.", response.url, self.max_body_size)
+        return True
+
+
+def _match_content_type(content_type: str, content_types: Collection[str]) -> bool:
+    return any(
+        content_type == allowed or (allowed.endswith("/*") and content_type.startswith(allowed[:-1]))
+        for allowed in content_types
+    )
+
 
-async def async_http_get(client: httpx.AsyncClient, request: Request) -> Tuple[Optional[str], str]:
+async def async_http_get(
+    client: httpx.AsyncClient,
+    request: Request,
+    throttle: Optional[AdaptiveConcurrency] = None,
+    retry: Optional[RetryCallback] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    cache: Optional[HTTPCache] = None,
+    response_filter: Optional[ResponseFilter] = None,
+    raw: bool = False,
+) -> Tuple[Optional[Content], str]:
+    """
+    Fetches a page.
+
+    :param client: HTTPX client.
+    :param request: Request to send.
+    :param throttle: Adaptive concurrency controller to report the outcome of the request to.
+    :param retry: Function called when the request fails with a retryable error, see `_retry_later()`.
+    :param circuit_breaker: Circuit breaker to report the outcome of the request to.
+    :param cache: HTTP cache to revalidate the response with, or to replay it from in offline mode.
+    :param response_filter: Content types and maximum size of the responses to read.
+    :param raw: Flag to return the body and its declared encoding instead of the decoded body.
+    :return: Tuple of the content (None if the request failed) and the final URL.
+    """
+    cached = _lookup(cache, request)
+    if cache is not None and cache.offline:
+        return _replay(cached, request, raw)
+    started = time.monotonic()
     try:
-        response = await client.send(request)
-        response.raise_for_status()
-        return response.text, str(response.url)
-    except (httpx.HTTPStatusError, httpx.RequestError) as e:
-        logger.warning(e)
+        response = await client.send(request, stream=True)
+        try:
+            _record(throttle, circuit_breaker, request, started, response.status_code)
+            if cache is not None and cached is not None and response.status_code == 304:
+                cache.touch(str(request.url))
+                return _replay(cached, request, raw)
+            response.raise_for_status()
+            content = await _read_body_async(response, response_filter)
+        finally:
+            await response.aclose()
+        if content is None:
+            return None, str(response.url)
+        if cache is not None and request.method == "GET":
+            cache.store(str(request.url), str(response.url), response.headers.multi_items(), content)
+        return _content(content, response.charset_encoding, raw), str(response.url)
+    except httpx.HTTPStatusError as e:
+        if retry is None or not retry(request, e.response.status_code, e.response.headers.get("Retry-After")):
+            logger.warning(e)
         return None, str(request.url)
+    except httpx.RequestError as e:
+        _record(throttle, circuit_breaker, request, started, None, e)
+        if retry is None or not _is_transient(e) or not retry(request, None, None):
+            logger.warning(e)
+        return None, str(request.url)
+
 
+def http_get(
+    client: httpx.Client,
+    request: Request,
+    throttle: Optional[AdaptiveConcurrency] = None,
+    retry: Optional[RetryCallback] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    cache: Optional[HTTPCache] = None,
+    response_filter: Optional[ResponseFilter] = None,
+    raw: bool = False,
+) -> Tuple[Optional[Content], str]:
+    """
+    Fetches a page.
 
-def http_get(client: httpx.Client, request: Request) -> Tuple[Optional[str], str]:
+    :param client: HTTPX client.
+    :param request: Request to send.
+    :param throttle: Adaptive concurrency controller to report the outcome of the request to.
+    :param retry: Function called when the request fails with a retryable error, see `_retry_later()`.
+    :param circuit_breaker: Circuit breaker to report the outcome of the request to.
+    :param cache: HTTP cache to revalidate the response with, or to replay it from in offline mode.
+    :param response_filter: Content types and maximum size of the responses to read.
+    :param raw: Flag to return the body and its declared encoding instead of the decoded body.
+    :return: Tuple of the content (None if the request failed) and the final URL.
+    """
+    cached = _lookup(cache, request)
+    if cache is not None and cache.offline:
+        return _replay(cached, request, raw)
+    started = time.monotonic()
     try:
-        response = client.send(request)
-        response.raise_for_status()
-        return response.text, str(response.url)
-    except (httpx.HTTPStatusError, httpx.RequestError) as e:
-        logger.warning(e)
+        response = client.send(request, stream=True)
+        try:
+            _record(throttle, circuit_breaker, request, started, response.status_code)
+            if cache is not None and cached is not None and response.status_code == 304:
+                cache.touch(str(request.url))
+                return _replay(cached, request, raw)
+            response.raise_for_status()
+            content = _read_body(response, response_filter)
+        finally:
+            response.close()
+        if content is None:
+            return None, str(response.url)
+        if cache is not None and request.method == "GET":
+            cache.store(str(request.url), str(response.url), response.headers.multi_items(), content)
+        return _content(content, response.charset_encoding, raw), str(response.url)
+    except httpx.HTTPStatusError as e:
+        if retry is None or not retry(request, e.response.status_code, e.response.headers.get("Retry-After")):
+            logger.warning(e)
+        return None, str(request.url)
+    except httpx.RequestError as e:
+        _record(throttle, circuit_breaker, request, started, None, e)
+        if retry is None or not _is_transient(e) or not retry(request, None, None):
+            logger.warning(e)
         return None, str(request.url)
 
 
+def _read_body(response: httpx.Response, response_filter: Optional[ResponseFilter]) -> Optional[bytes]:
+    """
+    Reads the body of a streamed response, or returns None if it is rejected by the filter.
+    """
+    if response_filter is None:
+        return response.read()
+    if not response_filter.accepts(response):
+        return None
+    chunks = []
+    size = 0
+    for chunk in response.iter_bytes():
+        size += len(chunk)
+        if response_filter.is_too_large(size, response):
+            return None
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _read_body_async(response: httpx.Response, response_filter: Optional[ResponseFilter]) -> Optional[bytes]:
+    if response_filter is None:
+        return await response.aread()
+    if not response_filter.accepts(response):
+        return None
+    chunks = []
+    size = 0
+    async for chunk in response.aiter_bytes():
+        size += len(chunk)
+        if response_filter.is_too_large(size, response):
+            return None
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _content(body: bytes, charset: Optional[str], raw: bool) -> Content:
+    """
+    Gets the content of a page from its body and declared charset,
+    decoded with UTF-8 like HTTPX if the charset is missing or unknown.
+    """
+    try:
+        encoding = codecs.lookup(charset).name if charset else None
+    except LookupError:
+        encoding = None
+    if raw:
+        return RawContent(body, encoding)
+    return body.decode(encoding or "utf-8", errors="replace")
+
+
+def _lookup(cache: Optional[HTTPCache], request: Request) -> Optional[CachedResponse]:
+    """
+    Gets the cached response of a GET request and adds its validators to the request to revalidate it.
+    """
+    if cache is None or request.method != "GET":
+        return None
+    cached = cache.get(str(request.url))
+    if cached is not None and not cache.offline:
+        for name, value in cache.validators(cached).items():
+            request.headers.setdefault(name, value)
+    return cached
+
+
+def _replay(cached: Optional[CachedResponse], request: Request, raw: bool) -> Tuple[Optional[Content], str]:
+    """
+    Gets the content and the final URL of a cached response, like the original response.
+    """
+    if cached is None:
+        logger.warning("URL %s is not in the HTTP cache.", request.url)
+        return None, str(request.url)
+    charset = httpx.Response(200, headers=cached.headers).charset_encoding
+    return _content(cached.content, charset, raw), cached.url
+
+
+def _is_transient(error: httpx.RequestError) -> bool:
+    """
+    Checks if a request error may not happen again, e.g. network errors and timeouts but not blocked URLs.
+    """
+    return isinstance(error, httpx.TransportError) and not isinstance(error, httpx.UnsupportedProtocol)
+
+
+def _record(
+    throttle: Optional[AdaptiveConcurrency],
+    circuit_breaker: Optional[CircuitBreaker],
+    request: Request,
+    started: float,
+    status_code: Optional[int],
+    error: Optional[httpx.RequestError] = None,
+) -> None:
+    """
+    Reports the outcome of a request to the adaptive concurrency controller and the circuit breaker.
+
+    For the adaptive concurrency, timeouts, 429 Too Many Requests and server errors are failures,
+    other errors (e.g. blocked requests) are ignored.
+    For the circuit breaker, network errors, timeouts and server errors are failures.
+    """
+    host = request.url.netloc.decode()
+    server_error = status_code is not None and status_code >= 500
+    if circuit_breaker is not None:
+        circuit_breaker.record(host, failed=server_error or (error is not None and _is_transient(error)))
+    timed_out = isinstance(error, httpx.TimeoutException)
+    if throttle is None or (status_code is None and not timed_out):
+        return
+    throttle.record(host, started, time.monotonic() - started, failed=timed_out or server_error or status_code == 429)
+
+
+def _init_parser_process(scraper: Any) -> None:
+    """
+    Initializes a forked parser process.
+
+    The scraper is inherited from the main process, including the registered handler functions.
+    The URLs it follows are collected in a new frontier and sent back to the main process.
+    """
+    global _process_scraper, _inherited_frontier
+    # keep a reference to the inherited frontier, an SQLite connection must not be closed by a forked process
+    _inherited_frontier = scraper.urls
+    scraper.urls = URLFrontier()
+    # followed URLs are sent back to the main process, which sends them to the process crawling their hosts
+    scraper.shard = None
+    # the lock may have been held by another thread when the process was forked
+    scraper._frontier_lock = threading.RLock()
+    _process_scraper = scraper
+
+
+def _scrape_page_in_process(
+    content: Content, url: str, page_number: int, follow_urls: bool
+) -> Tuple[List[str], List[ScrapedData]]:
+    """
+    Parses and extracts the data of a page in a parser process.
+
+    :return: Tuple of the followed URLs and the scraped data.
+    """
+    scraper = _process_scraper
+    scraper.current_url = url
+    scraped_data = scraper._scrape_page(content, url, page_number, follow_urls)
+    followed_urls = []
+    while scraper.urls:
+        followed_urls.append(scraper.urls.popleft())
+    scraper.urls = URLFrontier()
+    return followed_urls, scraped_data
+
+
 class HTTPXMixin:
+    _client: Optional[httpx.Client] = None
+    _async_client: Optional[httpx.AsyncClient] = None
+    _throttle: Optional[AdaptiveConcurrency] = None
+    _response_filter: Optional[ResponseFilter] = None
+    _parse_bytes: bool = False
+    stats_log_interval: float = 30  # seconds between two logs of the pipeline stats
+
     def _block_httpx_request_if_needed(self, request: Request) -> None:
         url = str(request.url)
         source_url = (
@@ -45,25 +380,661 @@ class HTTPXMixin:
     async def _async_block_httpx_request_if_needed(self, request: Request) -> None:
         self._block_httpx_request_if_needed(request)
 
-    def iter_requests(self) -> Iterable[Request]:
+    def _crawl(
+        self,
+        client: httpx.Client,
+        pages: int,
+        output: Optional[str],
+        format: str,
+        follow_urls: bool,
+        save_per_page: bool,
+        concurrency: int = 1,
+        parser_processes: int = 0,
+        workers: int = 1,
+        pipeline: bool = False,
+        pipeline_queue_size: int = 100,
+        adaptive_concurrency: bool = True,
+        max_host_connections: Optional[int] = None,
+        content_types: Optional[Collection[str]] = None,
+        max_body_size: Optional[int] = None,
+        parse_bytes: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Sequentially fetches and scrapes all the requests.
+        """
+        if concurrency > 1:
+            logger.warning("Concurrency is only supported in async mode. Use workers to send requests in parallel.")
+
+        self._client = client
+        self._response_filter = self._create_response_filter(content_types, max_body_size)
+        self._parse_bytes = parse_bytes
+
+        if parser_processes > 0 and "fork" not in multiprocessing.get_all_start_methods():
+            logger.warning("Parser processes require the fork start method. Pages will be parsed in this process.")
+            parser_processes = 0
+
+        if pipeline:
+            if workers > 1 or parser_processes > 0:
+                logger.warning("The pipeline is not used with workers or parser processes.")
+            else:
+                self._crawl_with_pipeline(client, output, format, follow_urls, save_per_page, pipeline_queue_size)
+                return
+
+        if workers > 1:
+            self._crawl_with_workers(
+                client,
+                pages,
+                output,
+                format,
+                follow_urls,
+                save_per_page,
+                workers,
+                parser_processes,
+                adaptive_concurrency,
+                max_host_connections,
+            )
+            return
+
+        if parser_processes > 0:
+            self._crawl_with_parser_processes(client, output, format, follow_urls, save_per_page, parser_processes)
+            return
+
+        for request in self.iter_requests():
+            logger.info("Requesting url %s - %s", request.method, request.url)
+            for i in range(1, pages + 1):
+                content, url = self._http_get(client, request)
+                if not content:
+                    break
+
+                self.collected_data.extend(self._scrape_page(content, url, i, follow_urls))  # type: ignore
+
+                if save_per_page:
+                    self._save(format, output, save_per_page)  # type: ignore
+
+                if i == pages or not self.navigate():  # type: ignore
+                    break
+
+    def _crawl_with_pipeline(
+        self,
+        client: httpx.Client,
+        output: Optional[str],
+        format: str,
+        follow_urls: bool,
+        save_per_page: bool,
+        queue_size: int = 100,
+    ) -> None:
+        """
+        Runs the crawl as stages connected by bounded queues:
+        fetch (this thread) -> parse and extract (scrape thread) -> collect and save (save thread).
+
+        A stage blocks when the queue of the next stage is full, so fetching slows down when the scraping or saving
+        cannot keep up. The queue sizes, high-water marks and the time each stage spent blocked are kept in `stats`.
+        Only the first page of each request is scraped since the HTTPX-based backends do not navigate.
+        """
+        scrape_queue: queue.Queue = queue.Queue(queue_size)
+        save_queue: queue.Queue = queue.Queue(queue_size)
+        committed = threading.Condition()
+        finished: Deque[int] = collections.deque()  # in-progress keys of the saved pages, guarded by `committed`
+        errors: List[BaseException] = []
+
+        def put(stage: str, q: queue.Queue, item: Any) -> None:
+            start = time.monotonic()
+            q.put(item)
+            self.stats.increment(f"pipeline.{stage}_blocked_seconds", time.monotonic() - start)  # type: ignore
+            self.stats.set_max(f"pipeline.{stage}_queue_max", q.qsize())  # type: ignore
+
+        def fail(error: BaseException) -> None:
+            with committed:
+                errors.append(error)
+                committed.notify()
+
+        def scrape_stage() -> None:
+            try:
+                for key, content, url in iter(scrape_queue.get, None):
+                    if errors:
+                        continue  # keep consuming so that the fetch stage is never blocked
+                    try:
+                        scraped_data = []
+                        if content:
+                            self.current_url = url
+                            scraped_data = self._scrape_page(content, url, 1, follow_urls)  # type: ignore
+                        self.stats.increment("pipeline.scraped")  # type: ignore
+                        put("save", save_queue, (key, scraped_data))
+                    except BaseException as e:
+                        fail(e)
+            finally:
+                save_queue.put(None)
+
+        def save_stage() -> None:
+            for key, scraped_data in iter(save_queue.get, None):
+                if errors:
+                    continue
+                try:
+                    # the data and the finished keys are committed together so that checkpoints are consistent
+                    with committed:
+                        self.collected_data.extend(scraped_data)  # type: ignore
+                        if save_per_page:
+                            self._save(format, output, save_per_page)  # type: ignore
+                        finished.append(key)
+                        committed.notify()
+                    self.stats.increment("pipeline.saved")  # type: ignore
+                except BaseException as e:
+                    fail(e)
+
+        def commit_finished() -> None:
+            with committed:
+                while finished:
+                    self._finish_item(finished.popleft())  # type: ignore
+
+        self.stats.register_gauge("pipeline.scrape_queue", scrape_queue.qsize)  # type: ignore
+        self.stats.register_gauge("pipeline.save_queue", save_queue.qsize)  # type: ignore
+        threads = [
+            threading.Thread(target=scrape_stage, name="dude-scrape", daemon=True),
+            threading.Thread(target=save_stage, name="dude-save", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        last_logged = time.monotonic()
         try:
+            while not errors:
+                commit_finished()
+                if time.monotonic() - last_logged >= self.stats_log_interval:
+                    self.stats.log()  # type: ignore
+                    last_logged = time.monotonic()
+
+                request, wait = self._next_request()
+                if request is None:
+                    if wait is None and not self._in_progress:  # type: ignore
+                        break
+                    # wait for the pages in the pipeline, they may follow new URLs
+                    with committed:
+                        if not finished and not errors:
+                            committed.wait(wait if wait is not None else self.stats_log_interval)
+                    continue
+
+                key = self._start_item(request)  # type: ignore
+                logger.info("Requesting url %s - %s", request.method, request.url)
+                content, url = self._http_get(client, request)
+                self.stats.increment("pipeline.fetched")  # type: ignore
+                put("scrape", scrape_queue, (key, content, url))
+        finally:
+            scrape_queue.put(None)
+            for thread in threads:
+                thread.join()
+            commit_finished()
+            self.stats.unregister_gauge("pipeline.scrape_queue")  # type: ignore
+            self.stats.unregister_gauge("pipeline.save_queue")  # type: ignore
+
+        if errors:
+            raise errors[0]
+
+    def _crawl_with_workers(
+        self,
+        client: httpx.Client,
+        pages: int,
+        output: Optional[str],
+        format: str,
+        follow_urls: bool,
+        save_per_page: bool,
+        workers: int,
+        parser_processes: int = 0,
+        adaptive_concurrency: bool = True,
+        max_host_connections: Optional[int] = None,
+    ) -> None:
+        """
+        Fetches and scrapes requests in a pool of threads sharing the same client.
+
+        The frontier, the scheduler and the collected data are only updated by this thread, except for the URLs
+        followed by the workers, and the scraped data is committed in the same order the requests were sent.
+        """
+        self._throttle = self._create_throttle(workers, adaptive_concurrency, max_host_connections)
+        parser_executor = None
+        if parser_processes > 0:
+            parser_executor = ProcessPoolExecutor(
+                parser_processes,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_parser_process,
+                initargs=(self,),
+            )
+        in_flight: Dict[Future, Tuple[int, str]] = {}  # future -> request index and host
+        finished: Dict[int, List[List[ScrapedData]]] = {}
+        keys: Dict[int, int] = {}  # request index -> in-progress key
+        sent = 0
+        committed = 0
+
+        with ThreadPoolExecutor(workers, thread_name_prefix="dude-worker") as executor:
+            try:
+                while True:
+                    wait = None
+                    while len(in_flight) < workers:
+                        request, wait = self._next_request()
+                        if request is None:
+                            break
+                        keys[sent] = self._start_item(request)  # type: ignore
+                        future = executor.submit(
+                            self._fetch_and_scrape, client, request, pages, follow_urls, parser_executor
+                        )
+                        in_flight[future] = sent, self._acquire_host(request)
+                        sent += 1
+
+                    if not in_flight:
+                        if wait is None:
+                            break
+                        time.sleep(wait)
+                        continue
+
+                    # wake up when a request finishes or when the next host becomes ready, whichever comes first
+                    done, _ = concurrent.futures.wait(
+                        in_flight, timeout=wait, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        index, host = in_flight.pop(future)
+                        self._release_host(host)
+                        finished[index] = future.result()
+
+                    while committed in finished:
+                        for scraped_data in finished.pop(committed):
+                            self.collected_data.extend(scraped_data)  # type: ignore
+                            if save_per_page:
+                                self._save(format, output, save_per_page)  # type: ignore
+                        self._finish_item(keys.pop(committed))  # type: ignore
+                        committed += 1
+            finally:
+                for future in in_flight:
+                    future.cancel()
+                if parser_executor is not None:
+                    parser_executor.shutdown()
+
+    def _fetch_and_scrape(
+        self,
+        client: httpx.Client,
+        request: Request,
+        pages: int,
+        follow_urls: bool,
+        parser_executor: Optional[ProcessPoolExecutor] = None,
+    ) -> List[List[ScrapedData]]:
+        """
+        Fetches and scrapes a request in a worker thread, parsing the pages in a parser process if available.
+        """
+        logger.info("Requesting url %s - %s", request.method, request.url)
+        self.current_url = str(request.url)
+        scraped_pages: List[List[ScrapedData]] = []
+        for i in range(1, pages + 1):
+            content, url = self._http_get(client, request, self._throttle)
+            if not content:
+                break
+
+            self.current_url = url
+            if parser_executor is None:
+                scraped_pages.append(self._scrape_page(content, url, i, follow_urls))  # type: ignore
+            else:
+                followed_urls, scraped_data = parser_executor.submit(
+                    _scrape_page_in_process, content, url, i, follow_urls
+                ).result()
+                self.follow_links(url, followed_urls)  # type: ignore
+                scraped_pages.append(scraped_data)
+
+            if i == pages or not self.navigate():  # type: ignore
+                break
+        return scraped_pages
+
+    def _crawl_with_parser_processes(
+        self,
+        client: httpx.Client,
+        output: Optional[str],
+        format: str,
+        follow_urls: bool,
+        save_per_page: bool,
+        parser_processes: int,
+    ) -> None:
+        """
+        Fetches the requests in this process while pages are parsed and scraped by a pool of processes.
+
+        The scraped data is committed in the same order the requests were sent.
+        Only the first page of each request is scraped since the HTTPX-based backends do not navigate.
+        """
+        context = multiprocessing.get_context("fork")
+        # (in-progress key, page URL, future of the followed URLs and scraped data) of the requests in order
+        in_flight: Deque[Tuple[int, str, Optional[Future]]] = collections.deque()
+        with ProcessPoolExecutor(
+            parser_processes, mp_context=context, initializer=_init_parser_process, initargs=(self,)
+        ) as executor:
             while True:
-                try:
-                    url = next(self.iter_urls())  # type: ignore
-                    yield Request(method="GET", url=url)
+                request, wait = self._next_request()
+                if request is None:
+                    if in_flight:
+                        # committing may follow new URLs
+                        self._commit_parsed_page(*in_flight.popleft(), output, format, save_per_page)
+                        continue
+                    if wait is None:
+                        break
+                    time.sleep(wait)
                     continue
-                except StopIteration:
-                    pass
-                request = self.requests.popleft()  # type: ignore
-                can_fetch, crawl_delay = self.can_fetch_and_crawl_delay(str(request.url))  # type: ignore
-                if not can_fetch:
-                    logger.info("Not allowed to crawl %s", str(request.url))
+
+                key = self._start_item(request)  # type: ignore
+                logger.info("Requesting url %s - %s", request.method, request.url)
+                content, url = self._http_get(client, request)
+                future = executor.submit(_scrape_page_in_process, content, url, 1, follow_urls) if content else None
+                in_flight.append((key, url, future))
+
+                # keep enough pages queued to keep the processes busy
+                while in_flight and (len(in_flight) > parser_processes * 2 or _is_done(in_flight[0][2])):
+                    self._commit_parsed_page(*in_flight.popleft(), output, format, save_per_page)
+
+    def _commit_parsed_page(
+        self, key: int, url: str, future: Optional[Future], output: Optional[str], format: str, save_per_page: bool
+    ) -> None:
+        if future is not None:
+            followed_urls, scraped_data = future.result()
+            self.follow_links(url, followed_urls)  # type: ignore
+            self.collected_data.extend(scraped_data)  # type: ignore
+            if save_per_page:
+                self._save(format, output, save_per_page)  # type: ignore
+        self._finish_item(key)  # type: ignore
+
+    async def _crawl_async(
+        self,
+        client: httpx.AsyncClient,
+        pages: int,
+        output: Optional[str],
+        format: str,
+        follow_urls: bool,
+        save_per_page: bool,
+        concurrency: int = 1,
+        parser_processes: int = 0,
+        adaptive_concurrency: bool = True,
+        max_host_connections: Optional[int] = None,
+        content_types: Optional[Collection[str]] = None,
+        max_body_size: Optional[int] = None,
+        parse_bytes: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Fetches and scrapes requests while keeping up to `concurrency` requests in flight.
+
+        Pages are scraped as soon as their responses arrive but the scraped data is committed to `collected_data`
+        (and saved, if `save_per_page` is set) in the same order the requests were sent.
+        """
+        if parser_processes > 0:
+            logger.warning("Parser processes are only supported in sync mode. Pages will be parsed in this process.")
+
+        self._async_client = client
+        self._response_filter = self._create_response_filter(content_types, max_body_size)
+        self._parse_bytes = parse_bytes
+        self._throttle = self._create_throttle(concurrency, adaptive_concurrency, max_host_connections)
+        in_flight: Set[asyncio.Future] = set()
+        hosts: Dict[asyncio.Future, str] = {}
+        finished: Dict[int, List[List[ScrapedData]]] = {}
+        keys: Dict[int, int] = {}  # request index -> in-progress key
+        sent = 0
+        committed = 0
+
+        try:
+            while True:
+                wait = None
+                while len(in_flight) < concurrency:
+                    request, wait = await self._next_request_async()
+                    if request is None:
+                        break
+                    keys[sent] = self._start_item(request)  # type: ignore
+                    task = asyncio.ensure_future(
+                        self._fetch_and_scrape_async(client, request, sent, pages, follow_urls, finished)
+                    )
+                    in_flight.add(task)
+                    hosts[task] = self._acquire_host(request)
+                    sent += 1
+
+                if not in_flight:
+                    if wait is None:
+                        break
+                    await asyncio.sleep(wait)
                     continue
-                time.sleep(crawl_delay)
-                self.current_url = str(request.url)  # type: ignore
+
+                # wake up when a request finishes or when the next host becomes ready, whichever comes first
+                done, in_flight = await asyncio.wait(in_flight, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    self._release_host(hosts.pop(future))
+                    future.result()
+
+                while committed in finished:
+                    for scraped_data in finished.pop(committed):
+                        self.collected_data.extend(scraped_data)  # type: ignore
+                        if save_per_page:
+                            await self._save_async(format, output, save_per_page)  # type: ignore
+                    self._finish_item(keys.pop(committed))  # type: ignore
+                    committed += 1
+        finally:
+            # cancel the requests in flight if a task failed
+            for pending in in_flight:
+                pending.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def _fetch_and_scrape_async(
+        self,
+        client: httpx.AsyncClient,
+        request: Request,
+        index: int,
+        pages: int,
+        follow_urls: bool,
+        finished: Dict[int, List[List[ScrapedData]]],
+    ) -> None:
+        logger.info("Requesting url %s - %s", request.method, request.url)
+        scraped_pages: List[List[ScrapedData]] = []
+        try:
+            for i in range(1, pages + 1):
+                content, url = await self._async_http_get(client, request, self._throttle)
+                if not content:
+                    break
+
+                self.current_url = url
+                scraped_pages.append(await self._scrape_page_async(content, url, i, follow_urls))  # type: ignore
+
+                if i == pages or not await self.navigate_async():  # type: ignore
+                    break
+        finally:
+            finished[index] = scraped_pages
+
+    def _http_get(
+        self, client: httpx.Client, request: Request, throttle: Optional[AdaptiveConcurrency] = None
+    ) -> Tuple[Optional[Content], str]:
+        circuit_breaker = self.circuit_breaker  # type: ignore
+        http_cache = self.http_cache  # type: ignore
+        retried = False
+
+        def retry(failed: Request, status_code: Optional[int], retry_after: Optional[str]) -> bool:
+            nonlocal retried
+            retried = self._retry_request(failed, status_code, retry_after)
+            return retried
+
+        result = http_get(
+            client,
+            request,
+            throttle,
+            retry,
+            circuit_breaker,
+            http_cache,
+            self._response_filter,
+            self._parse_bytes,
+        )
+        if not retried:
+            self._forget_retries(str(request.url))  # type: ignore
+        return result
+
+    async def _async_http_get(
+        self, client: httpx.AsyncClient, request: Request, throttle: Optional[AdaptiveConcurrency] = None
+    ) -> Tuple[Optional[Content], str]:
+        circuit_breaker = self.circuit_breaker  # type: ignore
+        http_cache = self.http_cache  # type: ignore
+        retried = False
+
+        def retry(failed: Request, status_code: Optional[int], retry_after: Optional[str]) -> bool:
+            nonlocal retried
+            retried = self._retry_request(failed, status_code, retry_after)
+            return retried
+
+        result = await async_http_get(
+            client,
+            request,
+            throttle,
+            retry,
+            circuit_breaker,
+            http_cache,
+            self._response_filter,
+            self._parse_bytes,
+        )
+        if not retried:
+            self._forget_retries(str(request.url))  # type: ignore
+        return result
+
+    def _retry_request(self, request: Request, status_code: Optional[int], retry_after: Optional[str]) -> bool:
+        return self._retry_later(request, str(request.url), status_code, retry_after)  # type: ignore
+
+    def _create_throttle(
+        self, concurrency: int, adaptive_concurrency: bool, max_host_connections: Optional[int] = None
+    ) -> Optional[AdaptiveConcurrency]:
+        """
+        Creates the controller of the number of requests in flight per host, if it can be more than one.
+
+        :param concurrency: Maximum number of requests in flight.
+        :param adaptive_concurrency: Flag to adapt the limit of each host to its latency and errors.
+        :param max_host_connections: Maximum number of requests in flight (and thus connections) per host.
+        """
+        max_limit = concurrency if max_host_connections is None else min(concurrency, max_host_connections)
+        if concurrency > 1 and adaptive_concurrency:
+            return AdaptiveConcurrency(max_limit=max_limit, stats=self.stats)  # type: ignore
+        if max_limit < concurrency:
+            # fixed limit per host
+            return AdaptiveConcurrency(
+                max_limit=max_limit, initial_limit=max_limit, min_limit=max_limit, stats=self.stats  # type: ignore
+            )
+        return None
+
+    def _create_response_filter(
+        self, content_types: Optional[Collection[str]], max_body_size: Optional[int]
+    ) -> Optional[ResponseFilter]:
+        if content_types is None and max_body_size is None:
+            return None
+        if content_types is not None:
+            content_types = {content_type.lower() for content_type in content_types}
+        return ResponseFilter(content_types=content_types, max_body_size=max_body_size)
+
+    def _httpx_options(self, proxy: Optional[ProxiesTypes], kwargs: Dict[str, Any], is_async: bool) -> Dict[str, Any]:
+        """
+        Pops the options of the HTTPX client from the arguments of `run()`.
+
+        HTTP/2 requires the h2 package, e.g. `pip install httpx[http2]`.
+        When recording or replaying the exchanges, the client gets a custom transport.
+        """
+        http2 = kwargs.pop("http2", False)
+        limits = httpx.Limits(
+            max_connections=kwargs.pop("max_connections", 100),
+            max_keepalive_connections=kwargs.pop("max_keepalive_connections", 20),
+            keepalive_expiry=kwargs.pop("keepalive_expiry", 5.0),
+        )
+        record = kwargs.pop("record", None)
+        replay = kwargs.pop("replay", None)
+        replay_latency = kwargs.pop("replay_latency", 0.0)
+        if replay:
+            logger.info("Replaying the HTTP exchanges recorded in %s...", replay)
+            return {"transport": ReplayTransport(replay, latency=replay_latency)}
+        if record:
+            if isinstance(proxy, dict):
+                raise ValueError("Recording only supports a single proxy URL.")
+            transport_class = httpx.AsyncHTTPTransport if is_async else httpx.HTTPTransport
+            transport = transport_class(
+                http2=http2, limits=limits, proxy=httpx.Proxy(proxy) if isinstance(proxy, (str, httpx.URL)) else proxy
+            )
+            logger.info("Recording the HTTP exchanges in %s...", record)
+            return {"transport": RecordingTransport(transport, record)}
+        return {"proxies": proxy, "http2": http2, "limits": limits}
+
+    def _acquire_host(self, request: Request) -> str:
+        """
+        Counts a request in flight for its host, pausing the host when it reaches its concurrency limit.
+
+        :return: Host of the request.
+        """
+        host = request.url.netloc.decode()
+        if self._throttle is not None and not self._throttle.acquire(host):
+            self.scheduler.pause(host)  # type: ignore
+        return host
+
+    def _release_host(self, host: str) -> None:
+        if self._throttle is not None and self._throttle.release(host):
+            self.scheduler.resume(host)  # type: ignore
+
+    def iter_requests(self) -> Iterator[Request]:
+        """
+        Iterates over the URLs and custom Request objects to crawl, waiting for the hosts' crawl delays when needed.
+        """
+        while True:
+            request, wait = self._next_request()
+            if request is not None:
+                key = self._start_item(request)  # type: ignore
                 yield request
-        except IndexError:
-            pass
+                self._finish_item(key)  # type: ignore
+            elif wait is not None:
+                time.sleep(wait)
+            else:
+                break
+
+    def _next_request(self) -> Tuple[Optional[Request], Optional[float]]:
+        """
+        Gets the next Request whose host can be fetched now.
+
+        :return: Tuple of the Request and None,
+            None and the number of seconds to wait until the earliest host is ready,
+            or None and None if there is nothing left to crawl.
+        """
+        item, wait = self._next_scheduled(include_requests=True)  # type: ignore
+        if isinstance(item, str):
+            return Request(method="GET", url=item), None
+        return item, wait
+
+    async def _next_request_async(self) -> Tuple[Optional[Request], Optional[float]]:
+        """
+        Gets the next Request whose host can be fetched now.
+
+        :return: Tuple of the Request and None,
+            None and the number of seconds to wait until the earliest host is ready,
+            or None and None if there is nothing left to crawl.
+        """
+        item, wait = await self._next_scheduled_async(include_requests=True)  # type: ignore
+        if isinstance(item, str):
+            return Request(method="GET", url=item), None
+        return item, wait
+
+    def _fetch_robots_txt(self, robots_url: str) -> Tuple[Optional[int], str]:
+        """
+        Fetches robots.txt using the scraper's HTTPX client, respecting its proxy and the adblocker.
+        """
+        if self._client is None:
+            return super()._fetch_robots_txt(robots_url)  # type: ignore
+        try:
+            response = self._client.get(robots_url, follow_redirects=True)
+            return response.status_code, response.text
+        except httpx.RequestError as e:
+            logger.warning(e)
+            return None, ""
+
+    async def _fetch_robots_txt_async(self, robots_url: str) -> Tuple[Optional[int], str]:
+        """
+        Fetches robots.txt using the scraper's HTTPX client, respecting its proxy and the adblocker.
+        """
+        if self._async_client is None:
+            return await super()._fetch_robots_txt_async(robots_url)  # type: ignore
+        try:
+            response = await self._async_client.get(robots_url, follow_redirects=True)
+            return response.status_code, response.text
+        except httpx.RequestError as e:
+            logger.warning(e)
+            return None, ""
+
+
+def _is_done(future: Optional[Future]) -> bool:
+    return future is None or future.done()
 
 
 def get_chromedriver_latest_release() -> str:
@@ -1,7 +1,6 @@
 import itertools
 import logging
-from typing import Any, AsyncIterable, Callable, Dict, Iterable, Optional, Sequence, Tuple, Union
-from urllib.parse import urljoin
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, Optional, Tuple, Union
 
 from playwright import async_api, sync_api
 from playwright.async_api import async_playwright
@@ -20,7 +19,7 @@ class PlaywrightScraper(ScraperAbstract):
 
     def run(
         self,
-        urls: Sequence[str],
+        urls: Iterable[str],
         pages: int = 1,
         proxy: Optional[sync_api.ProxySettings] = None,
         output: Optional[str] = None,
@@ -35,7 +34,7 @@ class PlaywrightScraper(ScraperAbstract):
         """
         Executes Playwright-based scraper.
 
-        :param urls: List of website URLs.
+        :param urls: Website URLs, e.g. a list or a `URLFile` that is read lazily.
         :param pages: Maximum number of pages to crawl before exiting (default=1). This is only used when a navigate handler is defined. # noqa
         :param proxy: Proxy settings. (see https://playwright.dev/python/docs/api/class-apirequest#api-request-new-context-option-proxy)  # noqa
         :param output: Output file. If not provided, prints in the terminal.
@@ -180,10 +179,7 @@ class PlaywrightScraper(ScraperAbstract):
                     continue
                 logger.info("Loaded page %s", page.url)
                 if follow_urls:
-                    for link in page.query_selector_all("a"):
-                        absolute = urljoin(page.url, link.get_attribute("href"))
-                        if absolute.rstrip("/") != page.url.rstrip("/"):
-                            self.urls.append(absolute)
+                    self.follow_links(page.url, (link.get_attribute("href") for link in page.query_selector_all("a")))
 
                 self.setup(page=page)
 
@@ -217,7 +213,7 @@ class PlaywrightScraper(ScraperAbstract):
         launch_kwargs = self._get_launch_kwargs(browser_type)
         async with async_playwright() as p:
             browser = await p[browser_type].launch(headless=headless, proxy=proxy, **launch_kwargs)
-            for url in self.iter_urls():
+            async for url in self.iter_urls_async():
                 page = await browser.new_page()
                 await page.route("**/*", self._block_url_if_needed)
                 logger.info("Requesting url %s", url)
@@ -229,10 +225,8 @@ class PlaywrightScraper(ScraperAbstract):
                     continue
                 logger.info("Loaded page %s", page.url)
                 if follow_urls:
-                    for link in await page.query_selector_all("a"):
-                        absolute = urljoin(page.url, await link.get_attribute("href"))
-                        if absolute.rstrip("/") != page.url.rstrip("/"):
-                            self.urls.append(absolute)
+                    links = [await link.get_attribute("href") for link in await page.query_selector_all("a")]
+                    self.follow_links(page.url, links)
 
                 await self.setup_async(page=page)
 
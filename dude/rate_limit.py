@@ -0,0 +1,40 @@
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Tokens are added at `rate` tokens per second up to `burst` tokens, each request takes one token.
+    The bucket starts full, so up to `burst` requests can be sent at once.
+    """
+
+    def __init__(self, rate: float, burst: float = 1) -> None:
+        """
+        :param rate: Number of tokens added per second, i.e. the sustained number of requests per second.
+        :param burst: Maximum number of tokens.
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated: Optional[float] = None
+
+    def ready_in(self, now: float) -> float:
+        """
+        Gets the number of seconds until a token is available, 0 if a token is available now.
+        """
+        self._refill(now)
+        return max((1 - self._tokens) / self.rate, 0.0)
+
+    def take(self, now: float) -> None:
+        """
+        Takes a token. The number of tokens can go below zero, delaying the next tokens.
+        """
+        self._refill(now)
+        self._tokens -= 1
+
+    def _refill(self, now: float) -> None:
+        if self._updated is not None and now > self._updated:
+            self._tokens = min(self._tokens + (now - self._updated) * self.rate, self.burst)
+        if self._updated is None or now > self._updated:
+            self._updated = now
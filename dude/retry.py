@@ -0,0 +1,80 @@
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Optional
+
+DEFAULT_RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Parses a Retry-After header.
+
+    :param value: Number of seconds or HTTP date.
+    :param now: Current time, used for HTTP dates. Defaults to the current UTC time.
+    :return: Number of seconds to wait or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - (now or datetime.now(timezone.utc))).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """
+    Decides if a failed request is retried and when.
+
+    The delay before the n-th retry is a random number of seconds between 0 and `backoff * 2 ** (n - 1)`,
+    capped to `backoff_max` (exponential backoff with full jitter).
+    If the server sent a Retry-After header, the request is not retried before that.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        backoff_max: float = 60.0,
+        retry_statuses: Iterable[int] = DEFAULT_RETRY_STATUSES,
+        respect_retry_after: bool = True,
+    ) -> None:
+        """
+        :param max_retries: Maximum number of retries per request.
+        :param backoff: Maximum delay in seconds before the first retry, doubled on each retry.
+        :param backoff_max: Maximum delay in seconds computed by the exponential backoff.
+        :param retry_statuses: HTTP status codes to retry. Network errors and timeouts are always retried.
+        :param respect_retry_after: Flag to wait at least the number of seconds in the Retry-After header.
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.respect_retry_after = respect_retry_after
+
+    def should_retry(self, retries: int, status_code: Optional[int]) -> bool:
+        """
+        :param retries: Number of times the request has already been retried.
+        :param status_code: HTTP status code or None for network errors and timeouts.
+        """
+        if retries >= self.max_retries:
+            return False
+        return status_code is None or status_code in self.retry_statuses
+
+    def delay(self, retries: int, retry_after: Optional[str] = None) -> float:
+        """
+        Gets the number of seconds to wait before retrying a request.
+
+        :param retries: Number of times the request has already been retried.
+        :param retry_after: Value of the Retry-After header, if any.
+        """
+        delay = random.uniform(0, min(self.backoff * 2**retries, self.backoff_max))
+        if self.respect_retry_after:
+            delay = max(delay, parse_retry_after(retry_after) or 0.0)
+        return delay
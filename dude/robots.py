@@ -0,0 +1,145 @@
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.robotparser import RobotFileParser
+
+logger = logging.getLogger(__name__)
+
+
+class RobotsTxtParser(RobotFileParser):
+    """
+    RobotFileParser that also accepts fractional Crawl-delay values (e.g. "Crawl-delay: 0.5").
+    """
+
+    def parse(self, lines: Iterable[str]) -> None:
+        lines = list(lines)
+        super().parse(lines)
+        self.crawl_delays: Dict[str, float] = {}
+        user_agents: List[str] = []
+        in_rules = False
+        for line in lines:
+            key, _, value = line.split("#", 1)[0].partition(":")
+            key, value = key.strip().lower(), value.strip()
+            if key == "user-agent":
+                if in_rules:
+                    user_agents, in_rules = [], False
+                user_agents.append(value.lower())
+            elif key:
+                in_rules = True
+                if key == "crawl-delay":
+                    try:
+                        delay = float(value)
+                    except ValueError:
+                        continue
+                    for user_agent in user_agents:
+                        self.crawl_delays.setdefault(user_agent, delay)
+
+    def crawl_delay(self, useragent: str) -> Optional[float]:  # type: ignore
+        """
+        Same matching as `RobotFileParser`, the first group with a matching user agent wins, "*" is the fallback.
+        """
+        useragent = useragent.split("/")[0].lower()
+        for user_agent, delay in self.crawl_delays.items():
+            if user_agent != "*" and user_agent in useragent:
+                return delay
+        return self.crawl_delays.get("*")
+
+
+class RobotsCache:
+    """
+    Caches the parsed robots.txt of each website.
+
+    Failed fetches (network errors and server errors) are cached for a shorter time so that they are retried later.
+    """
+
+    def __init__(self, ttl: float = 86400, error_ttl: float = 300, path: Optional[str] = None) -> None:
+        """
+        :param ttl: Number of seconds a fetched robots.txt stays valid.
+        :param error_ttl: Number of seconds a failed robots.txt fetch stays valid.
+        :param path: Optional JSON file to persist the cache between runs.
+        """
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.path = path
+        # robots.txt URL -> (expiry timestamp, HTTP status code or None for network errors, robots.txt content)
+        self._entries: Dict[str, Tuple[float, Optional[int], str]] = {}
+        self._parsers: Dict[str, RobotsTxtParser] = {}
+
+    def get(self, robots_url: str) -> Optional[RobotsTxtParser]:
+        """
+        Gets the parsed robots.txt if it is cached and has not expired yet.
+
+        :param robots_url: robots.txt URL.
+        """
+        entry = self._entries.get(robots_url)
+        if entry is None:
+            return None
+        expires, status_code, text = entry
+        if expires < time.time():
+            del self._entries[robots_url]
+            self._parsers.pop(robots_url, None)
+            return None
+        parser = self._parsers.get(robots_url)
+        if parser is None:
+            parser = self._parsers[robots_url] = self._parse(robots_url, status_code, text)
+        return parser
+
+    def set(self, robots_url: str, status_code: Optional[int], text: str) -> RobotsTxtParser:
+        """
+        Caches and parses a robots.txt response.
+
+        :param robots_url: robots.txt URL.
+        :param status_code: HTTP status code or None if robots.txt could not be fetched.
+        :param text: robots.txt content.
+        """
+        failed = status_code is None or status_code >= 500
+        self._entries[robots_url] = (time.time() + (self.error_ttl if failed else self.ttl), status_code, text)
+        parser = self._parsers[robots_url] = self._parse(robots_url, status_code, text)
+        return parser
+
+    @staticmethod
+    def _parse(robots_url: str, status_code: Optional[int], text: str) -> RobotsTxtParser:
+        """
+        Follows the same rules as `RobotFileParser.read()`, except for network errors where crawling is allowed.
+        """
+        parser = RobotsTxtParser(url=robots_url)
+        if status_code is None:
+            parser.parse([])
+        elif status_code in (401, 403) or status_code >= 500:
+            parser.parse(["User-agent: *", "Disallow: /"])
+        elif status_code >= 400:
+            parser.parse([])
+        else:
+            parser.parse(text.splitlines())
+        return parser
+
+    def load(self) -> None:
+        """
+        Loads the unexpired entries from the cache file.
+        """
+        if not self.path or not Path(self.path).exists():
+            return
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Failed to load robots.txt cache %s: %s", self.path, e)
+            return
+        now = time.time()
+        for robots_url, (expires, status_code, text) in entries.items():
+            if expires >= now:
+                self._entries[robots_url] = (expires, status_code, text)
+        logger.info("Loaded %d robots.txt from %s.", len(self._entries), self.path)
+
+    def save(self) -> None:
+        """
+        Saves the unexpired entries to the cache file.
+        """
+        if not self.path:
+            return
+        now = time.time()
+        with open(self.path, "w") as f:
+            json.dump({url: entry for url, entry in self._entries.items() if entry[0] >= now}, f)
+        logger.info("Saved %d robots.txt to %s.", len(self._entries), self.path)
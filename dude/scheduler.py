@@ -0,0 +1,157 @@
+import collections
+import heapq
+import itertools
+import time
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+from .rate_limit import TokenBucket
+
+
+class HostScheduler:
+    """
+    Queues items per host and hands out the item of whichever host is allowed to be fetched next.
+
+    Each host can have a minimum delay between two fetches (e.g. robots.txt Crawl-delay).
+    Hosts without a delay never wait behind hosts with one.
+
+    The number of fetches per second can also be limited with token buckets, for all the hosts together (`qps`)
+    and for each host (`host_qps`), allowing bursts of up to `burst` fetches.
+    """
+
+    def __init__(
+        self,
+        qps: Optional[float] = None,
+        host_qps: Optional[float] = None,
+        burst: int = 1,
+        host_qps_overrides: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """
+        :param qps: Maximum number of fetches per second of all the hosts.
+        :param host_qps: Maximum number of fetches per second of each host.
+        :param burst: Maximum number of fetches sent at once before the limits apply.
+        :param host_qps_overrides: Maximum number of fetches per second of specific hosts, overriding `host_qps`.
+        """
+        self.host_qps = host_qps
+        self.burst = burst
+        self.host_qps_overrides = host_qps_overrides or {}
+        self._bucket = TokenBucket(qps, burst) if qps else None
+        self._host_buckets: Dict[str, Optional[TokenBucket]] = {}
+        self._queues: Dict[str, Deque[Tuple[int, Any]]] = {}
+        self._delays: Dict[str, float] = {}
+        self._next_fetch: Dict[str, float] = {}
+        # heap of (next allowed fetch time, sequence number of the oldest item, host) of hosts with queued items
+        self._heap: List[Tuple[float, int, str]] = []
+        self._in_heap: Set[str] = set()
+        self._paused: Set[str] = set()
+        self._counter: Iterator[int] = itertools.count()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def count(self, host: str) -> int:
+        """
+        Gets the number of queued items of a host.
+        """
+        return len(self._queues.get(host, ()))
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Iterates over the queued items from the oldest to the newest.
+        """
+        for _, item in sorted(entry for queue in self._queues.values() for entry in queue):
+            yield item
+
+    def set_delay(self, host: str, delay: float) -> None:
+        """
+        Sets the minimum number of seconds between two fetches to a host.
+
+        :param host: Host name.
+        :param delay: Delay in seconds.
+        """
+        self._delays[host] = delay
+
+    def push(self, host: str, item: Any) -> None:
+        """
+        Queues an item for a host.
+
+        :param host: Host name.
+        :param item: Any item, e.g. URL or Request.
+        """
+        sequence = next(self._counter)
+        queue = self._queues.get(host)
+        if queue is None:
+            queue = self._queues[host] = collections.deque()
+        queue.append((sequence, item))
+        self._size += 1
+        self._push_host(host)
+
+    def pause(self, host: str) -> None:
+        """
+        Stops handing out the items of a host until it is resumed, e.g. when it has too many requests in flight.
+        """
+        self._paused.add(host)
+
+    def resume(self, host: str) -> None:
+        self._paused.discard(host)
+        self._push_host(host)
+
+    def pop(self, now: Optional[float] = None) -> Tuple[Optional[Any], Optional[float]]:
+        """
+        Pops the oldest item of the host that is ready to be fetched.
+
+        :param now: Current monotonic time. Defaults to `time.monotonic()`.
+        :return: Tuple of the item and None if a host is ready,
+            None and the number of seconds until the next host is ready if all hosts are waiting,
+            or None and None if there are no queued items of hosts that are not paused.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        while self._heap:
+            next_fetch, _, host = self._heap[0]
+            if host in self._paused:
+                # the host is pushed back when it is resumed
+                heapq.heappop(self._heap)
+                self._in_heap.discard(host)
+                continue
+            if next_fetch > now:
+                return None, next_fetch - now
+            if self._bucket is not None:
+                wait = self._bucket.ready_in(now)
+                if wait > 0:
+                    return None, wait
+                self._bucket.take(now)
+
+            heapq.heappop(self._heap)
+            self._in_heap.discard(host)
+            queue = self._queues[host]
+            _, item = queue.popleft()
+            self._size -= 1
+            next_fetch = now + self._delays.get(host, 0.0)
+            bucket = self._get_host_bucket(host)
+            if bucket is not None:
+                bucket.take(now)
+                next_fetch = max(next_fetch, now + bucket.ready_in(now))
+            self._next_fetch[host] = next_fetch
+            if queue:
+                self._push_host(host)
+            else:
+                del self._queues[host]
+            return item, None
+        return None, None
+
+    def _push_host(self, host: str) -> None:
+        """
+        Adds a host with queued items to the heap if it is not paused and not in the heap yet.
+        """
+        queue = self._queues.get(host)
+        if queue and host not in self._in_heap and host not in self._paused:
+            heapq.heappush(self._heap, (self._next_fetch.get(host, 0.0), queue[0][0], host))
+            self._in_heap.add(host)
+
+    def _get_host_bucket(self, host: str) -> Optional[TokenBucket]:
+        if host not in self._host_buckets:
+            qps = self.host_qps_overrides.get(host, self.host_qps)
+            self._host_buckets[host] = TokenBucket(qps, self.burst) if qps else None
+        return self._host_buckets[host]
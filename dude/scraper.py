@@ -1,8 +1,11 @@
 import logging
-from typing import Any, Optional, Sequence, Type
+import multiprocessing
+from typing import Any, Dict, Iterable, Optional, Sequence, Type
 
 from .base import ScraperBase
 from .playwright_scraper import PlaywrightScraper
+from .retry import DEFAULT_RETRY_STATUSES
+from .sharding import run_sharded
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +17,7 @@ class Scraper(ScraperBase):
 
     def run(
         self,
-        urls: Sequence[str],
+        urls: Iterable[str],
         pages: int = 1,
         proxy: Optional[Any] = None,
         output: Optional[str] = None,
@@ -22,16 +25,61 @@ class Scraper(ScraperBase):
         follow_urls: bool = False,
         save_per_page: bool = False,
         ignore_robots_txt: bool = False,
+        robots_cache: Optional[str] = None,
+        robots_cache_ttl: float = 86400,
+        frontier: str = "memory",
+        frontier_path: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        crawl_order: str = "bfs",
+        round_robin: bool = False,
+        host_weights: Optional[Dict[str, int]] = None,
+        state_dir: Optional[str] = None,
+        resume: bool = False,
+        checkpoint_interval: float = 60,
+        qps: Optional[float] = None,
+        host_qps: Optional[float] = None,
+        burst: int = 1,
+        host_qps_overrides: Optional[Dict[str, float]] = None,
+        max_retries: int = 0,
+        retry_backoff: float = 1.0,
+        retry_backoff_max: float = 60.0,
+        retry_statuses: Sequence[int] = DEFAULT_RETRY_STATUSES,
+        circuit_breaker_threshold: int = 0,
+        circuit_breaker_cool_down: float = 60.0,
+        circuit_breaker_max_probes: int = 3,
+        processes: int = 1,
+        max_pages: Optional[int] = None,
+        max_items: Optional[int] = None,
+        max_duration: Optional[float] = None,
+        http_cache: Optional[str] = None,
+        offline: bool = False,
         # extra args
         parser: str = "playwright",
         headless: bool = True,
         browser_type: str = "chromium",
+        concurrency: int = 1,
+        parser_processes: int = 0,
+        workers: int = 1,
+        pipeline: bool = False,
+        pipeline_queue_size: int = 100,
+        adaptive_concurrency: bool = True,
+        http2: bool = False,
+        max_connections: Optional[int] = 100,
+        max_keepalive_connections: Optional[int] = 20,
+        keepalive_expiry: Optional[float] = 5.0,
+        max_host_connections: Optional[int] = None,
+        content_types: Optional[Sequence[str]] = None,
+        max_body_size: Optional[int] = None,
+        parse_bytes: bool = False,
+        record: Optional[str] = None,
+        replay: Optional[str] = None,
+        replay_latency: float = 0.0,
         **kwargs: Any,
     ) -> None:
         """
         Convenience method to handle switching between different types of parser backends.
 
-        :param urls: List of website URLs.
+        :param urls: Website URLs, e.g. a list or a `URLFile` that is read lazily.
         :param pages: Maximum number of pages to crawl before exiting (default=1). This is only used when a navigate handler is defined. # noqa
         :param proxy: Proxy settings.
         :param output: Output file. If not provided, prints in the terminal.
@@ -39,10 +87,55 @@ class Scraper(ScraperBase):
         :param follow_urls: Automatically follow URLs.
         :param save_per_page: Flag to save data on every page extraction or not. If not, saves all the data at the end.
         :param ignore_robots_txt: Flag to ignore robots.txt.
+        :param robots_cache: Optional JSON file to persist the fetched robots.txt between runs.
+        :param robots_cache_ttl: Number of seconds a fetched robots.txt stays valid (default=86400).
+        :param frontier: Storage of the URLs to crawl ["memory" (default) or "sqlite"]. Use "sqlite" for crawls with millions of URLs. # noqa
+        :param frontier_path: SQLite database file of the "sqlite" frontier. If not provided, a temporary file is used.
+        :param max_depth: Maximum number of links to follow from the starting URLs. If not provided, there is no limit.
+        :param crawl_order: Order of the followed URLs with the same priority, "bfs" (breadth-first, default) or "dfs" (depth-first). # noqa
+        :param round_robin: Flag to give each host its own queue and take turns between the hosts, so that a host with many URLs does not delay the other hosts. # noqa
+        :param host_weights: Number of URLs crawled per turn of each host (default=1), e.g. {"dude.ron.sh": 3}. Implies `round_robin`. # noqa
+        :param state_dir: Directory where the crawl state is periodically saved so that an interrupted crawl can be resumed. # noqa
+        :param resume: Flag to resume the crawl from the last checkpoint saved in `state_dir`.
+        :param checkpoint_interval: Minimum number of seconds between two checkpoints (default=60).
+        :param qps: Maximum number of requests per second to all the hosts together. If not provided, there is no limit.
+        :param host_qps: Maximum number of requests per second to each host. If not provided, there is no limit.
+        :param burst: Number of requests that can be sent at once before the `qps` and `host_qps` limits apply (default=1).
+        :param host_qps_overrides: Maximum number of requests per second to specific hosts, e.g. {"dude.ron.sh": 0.5}, overriding `host_qps`. # noqa
+        :param max_retries: Maximum number of retries of a page after a network error, a timeout or a status code in `retry_statuses`. Only used by the BeautifulSoup4, lxml and Parsel backends. (default=0)  # noqa
+        :param retry_backoff: Maximum delay in seconds before the first retry, doubled on each retry, a random delay up to this value is used (default=1). # noqa
+        :param retry_backoff_max: Maximum delay in seconds between two retries, unless a longer Retry-After is received (default=60). # noqa
+        :param retry_statuses: HTTP status codes to retry (default=408, 429, 500, 502, 503 and 504).
+        :param circuit_breaker_threshold: Number of consecutive network errors, timeouts or server errors after which the URLs of a host are parked. Only used by the BeautifulSoup4, lxml and Parsel backends. (default=0, disabled)  # noqa
+        :param circuit_breaker_cool_down: Number of seconds before probing a host whose URLs are parked (default=60).
+        :param circuit_breaker_max_probes: Number of consecutive failed probes after which the URLs of a host are skipped (default=3). # noqa
+        :param processes: Number of processes crawling the hosts in parallel, each host is crawled by a single process (default=1). # noqa
+        :param max_pages: Maximum number of pages (URLs and Requests) to crawl. If not provided, there is no limit.
+        :param max_items: Maximum number of items to scrape, the pages in progress may scrape a few more. If not provided, there is no limit. # noqa
+        :param max_duration: Maximum number of seconds after which no new pages are crawled. If not provided, there is no limit. # noqa
+        :param http_cache: SQLite database file where the responses are cached and revalidated with their ETag and Last-Modified headers. Only used by the BeautifulSoup4, lxml and Parsel backends. # noqa
+        :param offline: Flag to replay the responses from `http_cache` without sending any request. Uncached pages are skipped. # noqa
 
         :param parser: Parser backend ["playwright" (default), "bs4", "parsel, "lxml" or "selenium"]
         :param headless: Enables headless browser. (default=True)
         :param browser_type: Playwright supported browser types ("chromium", "chrome", "webkit", or "firefox").
+        :param concurrency: Maximum number of requests in flight in async mode. Only used by the BeautifulSoup4, lxml and Parsel backends. (default=1)  # noqa
+        :param parser_processes: Number of processes that parse and scrape the pages in sync mode. Only used by the BeautifulSoup4, lxml and Parsel backends. (default=0, pages are parsed in the main process)  # noqa
+        :param workers: Number of threads that fetch and scrape the pages in sync mode. Only used by the BeautifulSoup4, lxml and Parsel backends. (default=1)  # noqa
+        :param pipeline: Flag to fetch, scrape and save the pages in separate stages connected by bounded queues in sync mode. Only used by the BeautifulSoup4, lxml and Parsel backends. # noqa
+        :param pipeline_queue_size: Maximum number of pages waiting in each queue of the pipeline (default=100).
+        :param adaptive_concurrency: Flag to adapt the number of requests in flight per host to its latency and errors when using `concurrency` or `workers` (default=True). # noqa
+        :param http2: Flag to enable HTTP/2, so that the requests to a host are multiplexed on a single connection. Requires `pip install httpx[http2]`. Only used by the BeautifulSoup4, lxml and Parsel backends. # noqa
+        :param max_connections: Maximum number of open connections, None for no limit (default=100).
+        :param max_keepalive_connections: Maximum number of idle connections kept alive, None for no limit (default=20).
+        :param keepalive_expiry: Number of seconds an idle connection is kept alive, None for no limit (default=5).
+        :param max_host_connections: Maximum number of requests in flight, and thus of connections, per host when using `concurrency` or `workers`. If not provided, there is no limit. # noqa
+        :param content_types: Content types of the pages to scrape, e.g. ["text/html", "application/xhtml+xml"]. Other responses are skipped before their body is downloaded. If not provided, all the pages are scraped. Only used by the BeautifulSoup4, lxml and Parsel backends. # noqa
+        :param max_body_size: Maximum size in bytes of the pages to scrape. Larger responses are skipped as soon as they exceed it. If not provided, there is no limit. Only used by the BeautifulSoup4, lxml and Parsel backends. # noqa
+        :param parse_bytes: Flag to parse the pages from their body and declared encoding instead of decoding them to strings first. Only used by the BeautifulSoup4, lxml and Parsel backends. # noqa
+        :param record: SQLite database file where every HTTP exchange (request and response) is recorded. Only used by the BeautifulSoup4, lxml and Parsel backends. # noqa
+        :param replay: SQLite database file recorded with `record`, from which the responses are served without sending any request. Only used by the BeautifulSoup4, lxml and Parsel backends. # noqa
+        :param replay_latency: Number of seconds to wait before each replayed response, to simulate the network (default=0). # noqa
         """
 
         logger.info("Scraper started...")
@@ -75,6 +168,8 @@ class Scraper(ScraperBase):
                 events=self.events,
                 has_async=self.has_async,
                 requests=self.requests,
+                url_priority_function=self.url_priority_function,
+                start_requests_functions=self.start_requests_functions,
             )
 
         if not ignore_robots_txt:
@@ -86,7 +181,7 @@ class Scraper(ScraperBase):
         {"=" * 80}""",
             )
 
-        self.scraper.run(
+        run_kwargs: Dict[str, Any] = dict(
             urls=urls,
             pages=pages,
             proxy=proxy,
@@ -95,5 +190,59 @@ class Scraper(ScraperBase):
             follow_urls=follow_urls,
             save_per_page=save_per_page or follow_urls,
             ignore_robots_txt=ignore_robots_txt,
-            **{"headless": headless, "browser_type": browser_type},
+            robots_cache=robots_cache,
+            robots_cache_ttl=robots_cache_ttl,
+            frontier=frontier,
+            frontier_path=frontier_path,
+            max_depth=max_depth,
+            crawl_order=crawl_order,
+            round_robin=round_robin,
+            host_weights=host_weights,
+            state_dir=state_dir,
+            resume=resume,
+            checkpoint_interval=checkpoint_interval,
+            qps=qps,
+            host_qps=host_qps,
+            burst=burst,
+            host_qps_overrides=host_qps_overrides,
+            max_retries=max_retries,
+            retry_backoff=retry_backoff,
+            retry_backoff_max=retry_backoff_max,
+            retry_statuses=retry_statuses,
+            circuit_breaker_threshold=circuit_breaker_threshold,
+            circuit_breaker_cool_down=circuit_breaker_cool_down,
+            circuit_breaker_max_probes=circuit_breaker_max_probes,
+            max_pages=max_pages,
+            max_items=max_items,
+            max_duration=max_duration,
+            http_cache=http_cache,
+            offline=offline,
+            **{
+                "headless": headless,
+                "browser_type": browser_type,
+                "concurrency": concurrency,
+                "parser_processes": parser_processes,
+                "workers": workers,
+                "pipeline": pipeline,
+                "pipeline_queue_size": pipeline_queue_size,
+                "adaptive_concurrency": adaptive_concurrency,
+                "http2": http2,
+                "max_connections": max_connections,
+                "max_keepalive_connections": max_keepalive_connections,
+                "keepalive_expiry": keepalive_expiry,
+                "max_host_connections": max_host_connections,
+                "content_types": content_types,
+                "max_body_size": max_body_size,
+                "parse_bytes": parse_bytes,
+                "record": record,
+                "replay": replay,
+                "replay_latency": replay_latency,
+            },
         )
+        if processes > 1 and "fork" not in multiprocessing.get_all_start_methods():
+            logger.warning("Multiple processes require the fork start method. Crawling in this process.")
+            processes = 1
+        if processes > 1:
+            run_sharded(self.scraper, processes, **run_kwargs)
+        else:
+            self.scraper.run(**run_kwargs)
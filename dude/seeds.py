@@ -0,0 +1,38 @@
+import gzip
+import io
+import sys
+from contextlib import ExitStack
+from typing import BinaryIO, Iterator
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class URLFile:
+    """
+    Iterable of the URLs in a text file with one URL per line.
+
+    The file is read line by line each time it is iterated, so that it is never fully loaded in memory.
+    Empty lines and lines starting with "#" are skipped. Gzip-compressed files are detected and decompressed.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: Path to the file, or "-" to read the standard input (which can only be read once).
+        """
+        self.path = path
+
+    def __iter__(self) -> Iterator[str]:
+        with ExitStack() as stack:
+            if self.path == "-":
+                stream: BinaryIO = stack.enter_context(open(sys.stdin.fileno(), "rb", closefd=False))
+            else:
+                stream = stack.enter_context(open(self.path, "rb"))
+            if stream.peek(len(GZIP_MAGIC)).startswith(GZIP_MAGIC):  # type: ignore
+                stream = stack.enter_context(gzip.GzipFile(fileobj=stream))  # type: ignore
+            for line in stack.enter_context(io.TextIOWrapper(stream, encoding="utf-8")):
+                url = line.strip()
+                if url and not url.startswith("#"):
+                    yield url
+
+    def __repr__(self) -> str:
+        return f"URLFile({self.path!r})"
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Set, Tuple
+from urllib.parse import urlparse
+
+from .seeds import URLFile
+
+logger = logging.getLogger(__name__)
+
+
+def shard_of(url: str, shards: int) -> int:
+    """
+    Gets the index of the shard crawling the host of a URL.
+
+    A CRC32 of the host is used instead of `hash()` so that the shards are the same across runs.
+    """
+    return zlib.crc32(urlparse(url).netloc.encode()) % shards
+
+
+class Shard:
+    """
+    Part of a multi-process crawl, owning the URLs of the hosts that hash to its index.
+
+    URLs of other hosts are sent to the inbox of the process owning them.
+    The crawl is finished when all the processes are idle and no URLs are in transit.
+    This is tracked by a shared counter of the busy processes plus the URLs in transit.
+    The pages and items of all the processes are counted in shared counters for the crawl budget.
+    """
+
+    poll_interval = 0.1  # seconds between two checks of the inbox of an idle process
+
+    def __init__(
+        self,
+        index: int,
+        inboxes: Sequence[Any],
+        active: Any,
+        pages: Any = None,
+        items: Any = None,
+        hosts: Iterable[str] = (),
+    ) -> None:
+        """
+        :param index: Index of this shard.
+        :param inboxes: Queues of (URL, depth) sent to each shard.
+        :param active: Shared counter of the busy processes and the URLs in transit, starts at the number of shards.
+        :param pages: Shared counter of the pages crawled by all the processes.
+        :param items: Shared counter of the items scraped by all the processes.
+        :param hosts: Hosts of the starting URLs of all the processes, i.e. the allowed domains.
+        """
+        self.index = index
+        self.inboxes = inboxes
+        self.active = active
+        self.pages = pages
+        self.items = items
+        self.hosts = set(hosts)
+        self.idle = False
+        self._sent: Set[str] = set()
+
+    def owns(self, url: str) -> bool:
+        return shard_of(url, len(self.inboxes)) == self.index
+
+    def send(self, url: str, depth: int) -> None:
+        """
+        Sends a URL to the process owning its host, once per URL.
+        """
+        if url in self._sent:
+            return
+        self._sent.add(url)
+        self._add_active(1)  # counted before it is put so that the crawl cannot finish while it is in transit
+        self.inboxes[shard_of(url, len(self.inboxes))].put((url, depth))
+
+    def receive(self) -> List[Tuple[str, int]]:
+        """
+        Gets the URLs sent by the other processes, marking this process as busy if there are any.
+        """
+        received = []
+        while True:
+            try:
+                received.append(self.inboxes[self.index].get_nowait())
+            except queue.Empty:
+                break
+        if received:
+            if self.idle:
+                self.idle = False
+                self._add_active(1)
+            self._add_active(-len(received))
+        return received
+
+    def is_finished(self) -> bool:
+        """
+        Marks this process as idle and checks if all the other processes are idle too.
+        """
+        if not self.idle:
+            self.idle = True
+            self._add_active(-1)
+        return self.active.value == 0
+
+    def _add_active(self, value: int) -> None:
+        with self.active.get_lock():
+            self.active.value += value
+
+
+def run_sharded(scraper: Any, processes: int, **kwargs: Any) -> None:
+    """
+    Runs a crawl in multiple processes, each one crawling the hosts of its shard with its own copy of the scraper.
+
+    The processes are forked so that they inherit the registered handler functions.
+    The scraped data is sent back to this process and saved at once, unless it is saved per page by the processes.
+    The startup and shutdown events are run once, by this process.
+    The starting URLs are read once, by this process, and written to a URL file per process,
+    so that sitemaps are only downloaded once and the standard input can be used.
+
+    :param scraper: Backend scraper, e.g. BeautifulSoupScraper.
+    :param processes: Number of processes.
+    :param kwargs: Arguments of the backend scraper's `run()`.
+    """
+    if kwargs.get("state_dir"):
+        raise ValueError("Checkpoints are not supported when crawling with multiple processes.")
+
+    with tempfile.TemporaryDirectory(prefix="dude-seeds-") as seeds_dir:
+        seed_files = [str(Path(seeds_dir, f"seeds.{index}.txt")) for index in range(processes)]
+        hosts = _split_seeds(kwargs.get("urls", ()), seed_files)
+        _run_shards(scraper, processes, seed_files, hosts, **kwargs)
+
+
+def _split_seeds(urls: Iterable[str], seed_files: Sequence[str]) -> Set[str]:
+    """
+    Writes each starting URL to the file of the process crawling its host and gets the hosts of all the URLs.
+    """
+    hosts: Set[str] = set()
+    streams = [open(path, "w", encoding="utf-8") for path in seed_files]
+    try:
+        for url in urls:
+            hosts.add(urlparse(url).netloc)
+            streams[shard_of(url, len(streams))].write(f"{url}\n")
+    finally:
+        for stream in streams:
+            stream.close()
+    return hosts
+
+
+def _run_shards(scraper: Any, processes: int, seed_files: Sequence[str], hosts: Set[str], **kwargs: Any) -> None:
+    """
+    Runs the processes of a crawl, each one reading the starting URLs of its hosts from its URL file.
+    """
+    context = multiprocessing.get_context("fork")
+    inboxes = [context.Queue() for _ in range(processes)]
+    results = context.Queue()
+    active = context.Value("i", processes)
+    pages = context.Value("q", 0)
+    items = context.Value("q", 0)
+    workers = []
+    scraper.event_startup()
+    logger.info("Crawling with %d processes...", processes)
+    for index in range(processes):
+        shard_kwargs = dict(kwargs, urls=URLFile(seed_files[index]))
+        # each process gets a share of the global rate limit, the crawl budget is counted by all the processes
+        if kwargs.get("qps"):
+            shard_kwargs["qps"] = kwargs["qps"] / processes
+        # each process uses its own files, e.g. frontier.0.sqlite3
+        for name in ("frontier_path", "robots_cache"):
+            if kwargs.get(name):
+                path = Path(kwargs[name])
+                shard_kwargs[name] = str(path.with_name(f"{path.stem}.{index}{path.suffix}"))
+        worker = context.Process(
+            target=_run_shard,
+            args=(scraper, Shard(index, inboxes, active, pages, items, hosts), results, shard_kwargs),
+            name=f"dude-shard-{index}",
+        )
+        worker.start()
+        workers.append(worker)
+
+    collected: Dict[int, List[Any]] = {}
+    try:
+        while len(collected) < processes:
+            try:
+                index, collected_data = results.get(timeout=1)
+            except queue.Empty:
+                for index, worker in enumerate(workers):
+                    if worker.exitcode and index not in collected:
+                        raise RuntimeError(f"Shard {index} failed with exit code {worker.exitcode}.")
+                continue
+            collected[index] = collected_data
+    finally:
+        for worker in workers:
+            if len(collected) < processes:
+                worker.terminate()
+            worker.join()
+
+    save_per_page = kwargs.get("save_per_page", False)
+    if not save_per_page:
+        scraper.collected_data = [scraped_data for index in sorted(collected) for scraped_data in collected[index]]
+        if scraper.has_async or not scraper.supports_sync:
+            loop = asyncio.get_event_loop()
+            loop.run_until_complete(scraper._save_async(kwargs["format"], kwargs.get("output"), save_per_page))
+        else:
+            scraper._save(kwargs["format"], kwargs.get("output"), save_per_page)
+    scraper.event_shutdown()
+
+
+def _run_shard(scraper: Any, shard: Shard, results: Any, kwargs: Dict[str, Any]) -> None:
+    """
+    Runs the crawl of a shard in a forked process and sends the scraped data to the main process.
+    """
+    # the event loop of the main process (e.g. used by async startup events) must not be shared with the fork
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    scraper.shard = shard
+    scraper.run(**kwargs)
+    results.put((shard.index, [] if kwargs.get("save_per_page") else scraper.collected_data))
@@ -0,0 +1,173 @@
+import collections
+import itertools
+import logging
+import urllib.request
+import zlib
+from datetime import datetime, timezone
+from typing import Deque, Iterable, Iterator, NamedTuple, Optional, Set, Tuple
+from urllib.error import URLError
+from urllib.parse import urlparse
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+from .robots import RobotsTxtParser
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class SitemapEntry(NamedTuple):
+    url: str
+    lastmod: Optional[datetime]
+
+
+class Sitemap:
+    """
+    Iterable of the URLs listed in sitemaps, including the sitemaps of sitemap indexes.
+
+    Sitemaps are downloaded and parsed incrementally, so that large sitemaps are never fully loaded in memory.
+    Gzip-compressed sitemaps (e.g. sitemap.xml.gz) are detected and decompressed.
+    If a URL of a robots.txt is given, the sitemaps listed in it are read instead.
+    """
+
+    chunk_size = 65536  # number of bytes read at once
+    timeout = 30.0  # seconds
+
+    def __init__(self, urls: Iterable[str], since: Optional[datetime] = None, max_sitemaps: int = 1000) -> None:
+        """
+        :param urls: URLs of the sitemaps, sitemap indexes or robots.txt files.
+        :param since: Only yield the URLs modified since this date, according to their lastmod.
+            URLs without lastmod are always yielded. Naive dates are in UTC.
+        :param max_sitemaps: Maximum number of sitemaps read, including the nested ones.
+        """
+        self.urls = [urls] if isinstance(urls, str) else list(urls)
+        self.since = _as_utc(since) if since is not None else None
+        self.max_sitemaps = max_sitemaps
+
+    def __iter__(self) -> Iterator[str]:
+        for entry in self.entries():
+            yield entry.url
+
+    def entries(self) -> Iterator[SitemapEntry]:
+        """
+        Iterates over the URLs in the sitemaps and their last modification dates.
+        """
+        pending: Deque[str] = collections.deque()
+        for url in self.urls:
+            pending.extend(self._robots_sitemaps(url) if urlparse(url).path == "/robots.txt" else [url])
+        seen: Set[str] = set()
+        while pending and len(seen) < self.max_sitemaps:
+            sitemap_url = pending.popleft()
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+            logger.info("Reading sitemap %s", sitemap_url)
+            try:
+                for is_sitemap, entry in parse_sitemap(self._read(sitemap_url)):
+                    if self._is_stale(entry):
+                        continue
+                    if is_sitemap:
+                        pending.append(entry.url)
+                    else:
+                        yield entry
+            except (URLError, OSError, ValueError, ParseError, zlib.error) as e:
+                logger.warning("Failed to read sitemap %s: %s", sitemap_url, e)
+        if pending:
+            logger.warning("Skipped %d sitemaps after reading %d sitemaps.", len(pending), len(seen))
+
+    def _is_stale(self, entry: SitemapEntry) -> bool:
+        return self.since is not None and entry.lastmod is not None and entry.lastmod < self.since
+
+    def _robots_sitemaps(self, robots_url: str) -> Iterable[str]:
+        """
+        Gets the sitemaps listed in a robots.txt.
+        """
+        try:
+            content = b"".join(self._read(robots_url)).decode("utf-8", errors="replace")
+        except (URLError, OSError, ValueError) as e:
+            logger.warning("Failed to fetch %s: %s", robots_url, e)
+            return []
+        parser = RobotsTxtParser()
+        parser.parse(content.splitlines())
+        return parser.site_maps() or []
+
+    def _read(self, url: str) -> Iterator[bytes]:
+        """
+        Downloads a file in chunks.
+        """
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            yield from iter(lambda: response.read(self.chunk_size), b"")
+
+
+def parse_sitemap(chunks: Iterable[bytes]) -> Iterator[Tuple[bool, SitemapEntry]]:
+    """
+    Parses a sitemap or a sitemap index incrementally.
+
+    :param chunks: Content of the sitemap, optionally gzip-compressed.
+    :return: Iterator of (True if it is a nested sitemap, URL and last modification date).
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    root = None
+    for data in _maybe_decompress(iter(chunks)):
+        parser.feed(data)
+        for event, element in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = element
+                continue
+            tag = _local_name(element.tag)
+            if tag not in ("url", "sitemap"):
+                continue
+            loc, lastmod = None, None
+            for child in element:
+                name = _local_name(child.tag)
+                if name == "loc":
+                    loc = (child.text or "").strip()
+                elif name == "lastmod":
+                    lastmod = _parse_lastmod(child.text)
+            if loc:
+                yield tag == "sitemap", SitemapEntry(loc, lastmod)
+            # drop the parsed entries so that the tree does not grow with the sitemap
+            assert root is not None
+            root.clear()
+    parser.close()
+
+
+def _maybe_decompress(chunks: Iterator[bytes], max_size: int = 65536) -> Iterator[bytes]:
+    """
+    Decompresses gzip-compressed chunks, in pieces of at most `max_size` bytes since gzip can compress XML a lot.
+    Chunks that are not gzip-compressed are returned as is.
+    """
+    first = next(chunks, b"")
+    if not first.startswith(GZIP_MAGIC):
+        yield first
+        yield from chunks
+        return
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for chunk in itertools.chain([first], chunks):
+        while chunk:
+            yield decompressor.decompress(chunk, max_size)
+            chunk = decompressor.unconsumed_tail
+
+
+def _local_name(tag: str) -> str:
+    """
+    Removes the namespace of a tag, e.g. "{http://www.sitemaps.org/schemas/sitemap/0.9}url" -> "url".
+    """
+    return tag.rpartition("}")[2]
+
+
+def _parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parses a W3C datetime, e.g. "2022-01-31" or "2022-01-31T12:00:00+00:00". Returns None if it is invalid.
+    """
+    if not value:
+        return None
+    try:
+        return _as_utc(datetime.fromisoformat(value.strip().replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
+def _as_utc(date: datetime) -> datetime:
+    return date.replace(tzinfo=timezone.utc) if date.tzinfo is None else date
@@ -0,0 +1,63 @@
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class Stats:
+    """
+    Thread-safe crawl statistics.
+
+    Values are counters or values set by the crawler, gauges are functions called when taking a snapshot.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: Dict[str, Any] = {}
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + value
+
+    def set(self, name: str, value: Any) -> None:
+        with self._lock:
+            self._values[name] = value
+
+    def set_max(self, name: str, value: float) -> None:
+        """
+        Keeps the highest value, e.g. the high-water mark of a queue.
+        """
+        with self._lock:
+            self._values[name] = max(self._values.get(name, value), value)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._values.get(name, default)
+
+    def register_gauge(self, name: str, func: Callable[[], Any]) -> None:
+        """
+        Registers a function that returns the current value of a statistic, e.g. a queue size.
+        """
+        with self._lock:
+            self._gauges[name] = func
+
+    def unregister_gauge(self, name: str) -> None:
+        with self._lock:
+            self._gauges.pop(name, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Gets the current values of all the statistics sorted by name.
+        """
+        with self._lock:
+            values = dict(self._values)
+            gauges = dict(self._gauges)
+        values.update((name, func()) for name, func in gauges.items())
+        return dict(sorted(values.items()))
+
+    def log(self) -> None:
+        snapshot = self.snapshot()
+        if snapshot:
+            logger.info("Stats: %s", ", ".join(f"{name}={value}" for name, value in snapshot.items()))
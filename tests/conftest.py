@@ -59,10 +59,17 @@ def blocked_url(base_url: str) -> str:
     return urljoin(base_url, "blockme.css")
 
 
+@pytest.fixture()
+def robots_txt() -> Optional[str]:
+    return None
+
+
 @pytest.fixture
-def mock_httpx(test_html_path: str, base_url: str) -> Generator[Router, None, None]:
+def mock_httpx(test_html_path: str, base_url: str, robots_txt: Optional[str]) -> Generator[Router, None, None]:
     with respx.mock(base_url=base_url, assert_all_called=False) as r, open(test_html_path) as f:
         content = f.read()
+        if robots_txt is not None:
+            r.get("/robots.txt", name="robots").mock(return_value=Response(200, text=robots_txt))
         r.get("/").mock(return_value=Response(200, content=content))
         r.post("/").mock(return_value=Response(200, content=content))
         r.put("/").mock(return_value=Response(200, content=content))
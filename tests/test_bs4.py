@@ -1,16 +1,20 @@
-import unittest.mock
-import urllib
-from typing import Any, Dict, Iterable, List, Optional
+import asyncio
+import re
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional
 from unittest import mock
 from urllib.parse import urljoin
 
+import httpx
 import pytest
+import respx
 from braveblock import Adblocker
 from bs4 import BeautifulSoup
-from httpx import Request
+from httpx import Request, Response
 from respx import Router
 
-from dude import Scraper
+from dude import Scraper, Sitemap, URLFile
 from dude.optional.beautifulsoup_scraper import BeautifulSoupScraper
 
 
@@ -221,6 +225,220 @@ def test_follow_url(
     mock_database.save.assert_not_called()
 
 
+def test_follow_url_sqlite_frontier(
+    scraper_application: Scraper,
+    bs4_follow_url: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    scraper_application.run(
+        urls=[base_url, base_url + "/"],
+        pages=2,
+        format="custom",
+        parser="bs4",
+        save_per_page=True,
+        frontier="sqlite",
+    )
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert called_urls.count(urljoin(base_url, "/")) == 1
+    assert urljoin(base_url, "url-1.html") in called_urls
+    assert urljoin(base_url, "url-2.html") in called_urls
+    assert urljoin(base_url, "url-3.html") in called_urls
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+
+
+@pytest.mark.parametrize("frontier", ("memory", "sqlite"))
+def test_follow_url_resume(
+    scraper_application: Scraper,
+    bs4_follow_url: None,
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+    tmp_path: Path,
+    frontier: str,
+) -> None:
+    from dude.optional import utils
+
+    http_get = utils.http_get
+
+    def interrupted_http_get(client: Any, request: Request, *args: Any, **kwargs: Any) -> Any:
+        if request.url.path == "/url-2.html":
+            raise KeyboardInterrupt
+        return http_get(client, request, *args, **kwargs)
+
+    kwargs: Dict[str, Any] = dict(
+        urls=[base_url],
+        pages=2,
+        format="custom",
+        parser="bs4",
+        follow_urls=True,
+        frontier=frontier,
+        state_dir=str(tmp_path),
+        checkpoint_interval=0,
+    )
+    with mock.patch.object(utils, "http_get", side_effect=interrupted_http_get), pytest.raises(KeyboardInterrupt):
+        scraper_application.run(**kwargs)
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert called_urls == [
+        urljoin(base_url, "/robots.txt"),
+        urljoin(base_url, "/"),
+        urljoin(base_url, "url-1.html"),
+    ]
+    assert mock_database_per_page.save.call_count == 1
+
+    mock_httpx.reset()
+    scraper_application.run(**kwargs, resume=True)
+
+    # robots.txt is cached in the state directory
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert called_urls == [
+        urljoin(base_url, "url-2.html"),
+        urljoin(base_url, "url-3.html"),
+        urljoin(base_url, "empty.html"),
+        urljoin(base_url, "empty.text"),
+    ]
+    assert mock_database_per_page.save.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "max_depth, expected_paths",
+    (
+        (0, ["/"]),
+        (1, ["/", "/empty.html", "/empty.text", "/url-1.html", "/url-2.html", "/url-3.html"]),
+    ),
+)
+def test_follow_url_max_depth_and_priority(
+    scraper_application: Scraper,
+    bs4_follow_url: None,
+    base_url: str,
+    scraper_save: None,
+    mock_httpx: Router,
+    max_depth: int,
+    expected_paths: List[str],
+) -> None:
+    @scraper_application.url_priority()
+    def priority(url: str, depth: int) -> int:
+        return 0 if "empty" in url else 1
+
+    scraper_application.run(
+        urls=[base_url],
+        parser="bs4",
+        follow_urls=True,
+        ignore_robots_txt=True,
+        format="custom",
+        max_depth=max_depth,
+    )
+
+    assert [request.url.path for request, _ in mock_httpx.calls] == expected_paths
+
+
+def test_full_flow_bs4_parser_processes(
+    scraper_application: Scraper,
+    bs4_select: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    assert scraper_application.has_async is False
+
+    scraper_application.run(
+        urls=[base_url],
+        format="custom",
+        parser="bs4",
+        follow_urls=True,
+        ignore_robots_txt=True,
+        parser_processes=2,
+    )
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert urljoin(base_url, "url-1.html") in called_urls
+    assert urljoin(base_url, "url-2.html") in called_urls
+    assert urljoin(base_url, "url-3.html") in called_urls
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+
+
+@pytest.mark.parametrize("parser_processes", (0, 2))
+def test_full_flow_bs4_workers(
+    scraper_application: Scraper,
+    bs4_select: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+    parser_processes: int,
+) -> None:
+    assert scraper_application.has_async is False
+
+    scraper_application.run(
+        urls=[base_url],
+        format="custom",
+        parser="bs4",
+        follow_urls=True,
+        ignore_robots_txt=True,
+        workers=4,
+        parser_processes=parser_processes,
+    )
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert urljoin(base_url, "url-1.html") in called_urls
+    assert urljoin(base_url, "url-2.html") in called_urls
+    assert urljoin(base_url, "url-3.html") in called_urls
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+
+
+def test_full_flow_bs4_pipeline(
+    scraper_application: Scraper,
+    bs4_select: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    assert scraper_application.has_async is False
+
+    scraper_application.run(
+        urls=[base_url],
+        format="custom",
+        parser="bs4",
+        follow_urls=True,
+        ignore_robots_txt=True,
+        pipeline=True,
+        pipeline_queue_size=1,
+    )
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert urljoin(base_url, "url-1.html") in called_urls
+    assert urljoin(base_url, "url-2.html") in called_urls
+    assert urljoin(base_url, "url-3.html") in called_urls
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+    assert scraper_application.scraper is not None
+    stats = scraper_application.scraper.stats.snapshot()
+    assert stats["pipeline.fetched"] == stats["pipeline.scraped"] == stats["pipeline.saved"] == len(called_urls)
+
+
+def test_bs4_pipeline_handler_exception(scraper_application: Scraper, base_url: str, mock_httpx: Router) -> None:
+    @scraper_application.select(css=".title")
+    def title(element: BeautifulSoup) -> Dict:
+        raise ValueError("Failed")
+
+    with pytest.raises(ValueError, match="Failed"):
+        scraper_application.run(urls=[base_url], parser="bs4", ignore_robots_txt=True, pipeline=True)
+
+
 def test_bs4_httpx_exception(
     scraper_application: Scraper,
     bs4_select: None,
@@ -272,6 +490,36 @@ def test_full_flow_bs4_httpx_async(
     mock_database_per_page.save.assert_called_with(expected_data)
 
 
+def test_full_flow_bs4_concurrent_async(
+    scraper_application: Scraper,
+    async_bs4_select: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    assert scraper_application.has_async is True
+    assert len(scraper_application.rules) == 4
+
+    scraper_application.run(
+        urls=[base_url],
+        pages=2,
+        format="custom",
+        parser="bs4",
+        follow_urls=True,
+        ignore_robots_txt=True,
+        concurrency=4,
+    )
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert urljoin(base_url, "url-1.html") in called_urls
+    assert urljoin(base_url, "url-2.html") in called_urls
+    assert urljoin(base_url, "url-3.html") in called_urls
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+
+
 def test_bs4_httpx_exception_async(
     scraper_application: Scraper,
     async_bs4_select: None,
@@ -398,6 +646,16 @@ def test_full_flow_post_bs4(
     mock_database.save.assert_not_called()
 
 
+@pytest.mark.parametrize(
+    "robots_txt",
+    (
+        """
+User-Agent: *
+Disallow: /unauthorized.html
+Crawl-Delay: 1
+""",
+    ),
+)
 def test_robots(
     scraper_application: Scraper,
     bs4_select: None,
@@ -407,7 +665,6 @@ def test_robots(
     mock_httpx: Router,
 ) -> None:
     unauthorized_url = urljoin(base_url, "/unauthorized.html")
-    robots_url = urljoin(base_url, "/robots.txt")
 
     @scraper_application.start_requests()
     def start_requests() -> Iterable[Request]:
@@ -417,19 +674,682 @@ def test_robots(
     assert scraper_application.scraper is None
     assert len(scraper_application.rules) == 4
 
-    class MockResponse:
-        def read(self) -> "MockResponse":
-            return self
+    scraper_application.run(urls=[unauthorized_url], pages=2, format="custom", parser="bs4")
 
-        def decode(self, encoding: str) -> str:
-            return """
-User-Agent: *
-Disallow: /unauthorized.html
-Crawl-Delay: 1
-"""
+    assert mock_httpx["robots"].call_count == 1
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert unauthorized_url not in called_urls
+
+    mock_database.save.assert_not_called()
+
+
+def test_bs4_delayed_host_does_not_stall_other_hosts(
+    scraper_application: Scraper,
+    scraper_save: None,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(BeautifulSoupScraper, "max_scheduled_per_host", 1)
+    slow_urls = [f"https://slow.example.com/{i}.html" for i in range(3)]
+    fast_url = "https://fast.example.com/"
+    visited = []
+
+    @scraper_application.select(css="title")
+    def title(element: BeautifulSoup) -> Dict:
+        visited.append(scraper_application.get_current_url())
+        return {}
+
+    with respx.mock() as router:
+        router.get("https://slow.example.com/robots.txt").mock(
+            return_value=Response(200, text="User-Agent: *\nCrawl-Delay: 2")
+        )
+        router.get("https://fast.example.com/robots.txt").mock(return_value=Response(404))
+        router.get(url__regex=r"\.html$|fast\.example\.com/$").mock(
+            return_value=Response(200, html="<html><head><title>Page</title></head></html>")
+        )
+        scraper_application.run(
+            urls=[*slow_urls, fast_url],
+            format="custom",
+            parser="bs4",
+            host_weights={"slow.example.com": len(slow_urls)},
+        )
+
+    # the slow host loses its turn while it waits, although its weight lets it queue all of its URLs first
+    assert visited.index(fast_url) == 1
+    assert sorted(visited) == sorted([*slow_urls, fast_url])
+
+
+def test_bs4_scheduler_bounded_under_host_qps(scraper_application: Scraper, scraper_save: None) -> None:
+    sizes = []
+
+    @scraper_application.select(css="title")
+    def title(element: BeautifulSoup) -> Dict:
+        assert scraper_application.scraper is not None
+        sizes.append(len(scraper_application.scraper.scheduler))
+        return {}
+
+    with respx.mock() as router:
+        router.get(url__startswith="https://a.com/").mock(
+            return_value=Response(200, html="<html><head><title>Page</title></head></html>")
+        )
+        scraper_application.run(
+            urls=(f"https://a.com/{i}.html" for i in range(2000)),
+            format="custom",
+            parser="bs4",
+            ignore_robots_txt=True,
+            frontier="sqlite",
+            host_qps=50,
+            max_pages=5,
+        )
+
+    # the URLs waiting for the rate limit stay in the frontier
+    assert len(sizes) == 5
+    assert max(sizes) <= BeautifulSoupScraper.max_scheduled_per_host
+    assert scraper_application.scraper is not None
+    assert len(scraper_application.scraper.urls) >= 2000 - 5 - BeautifulSoupScraper.max_scheduled_per_host
+
+
+def test_bs4_priority_under_host_qps(
+    scraper_application: Scraper, scraper_save: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(BeautifulSoupScraper, "max_scheduled_per_host", 1)
+    urls = [f"https://a.com/{i}.html" for i in range(5)]
+    urgent_url = "https://a.com/urgent.html"
+    visited = []
+
+    @scraper_application.url_priority()
+    def priority(url: str, depth: int) -> int:
+        return 0 if url == urgent_url else 1
+
+    @scraper_application.select(css="title")
+    def title(element: BeautifulSoup) -> Dict:
+        url = scraper_application.get_current_url()
+        visited.append(url)
+        if url == urls[1]:
+            scraper_application.follow_url(urgent_url)
+        return {}
+
+    with respx.mock() as router:
+        router.get(url__startswith="https://a.com/").mock(
+            return_value=Response(200, html="<html><head><title>Page</title></head></html>")
+        )
+        scraper_application.run(
+            urls=urls, format="custom", parser="bs4", ignore_robots_txt=True, round_robin=True, host_qps=20
+        )
+
+    # the URLs are only taken out of the frontier when they can be fetched soon,
+    # so the URL found on the second page is crawled before the URLs queued before it
+    assert visited == [urls[0], urls[1], urgent_url, *urls[2:]]
+
+
+def test_bs4_start_requests_bounded_under_host_qps(scraper_application: Scraper, scraper_save: None) -> None:
+    pulled = []
+
+    @scraper_application.start_requests()
+    def start_requests() -> Iterable[Request]:
+        for i in range(1000):
+            pulled.append(i)
+            yield Request("GET", f"https://a.com/{i}.html")
+
+    @scraper_application.select(css="title")
+    def title(element: BeautifulSoup) -> Dict:
+        return {}
 
-    with unittest.mock.patch.object(urllib.request, "urlopen", return_value=MockResponse()) as r:
-        scraper_application.run(urls=[unauthorized_url], pages=2, format="custom", parser="bs4")
-        r.assert_has_calls(calls=[unittest.mock.call(robots_url), unittest.mock.call(robots_url)])
+    with respx.mock() as router:
+        router.get(url__startswith="https://a.com/").mock(
+            return_value=Response(200, html="<html><head><title>Page</title></head></html>")
+        )
+        scraper_application.run(
+            urls=[], format="custom", parser="bs4", ignore_robots_txt=True, host_qps=50, max_pages=5
+        )
 
+    # only the Requests waiting for the rate limit are pulled ahead, plus one kept until there is room for it
+    assert len(pulled) <= 5 + BeautifulSoupScraper.max_scheduled_per_host + 1
+
+
+def test_bs4_retry(
+    scraper_application: Scraper,
+    bs4_select: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database: mock.MagicMock,
+    mock_httpx: Router,
+    test_html_path: str,
+) -> None:
+    with open(test_html_path) as f:
+        content = f.read()
+    route = mock_httpx.get("/")
+    route.side_effect = [
+        Response(503, headers={"Retry-After": "0"}),
+        httpx.ConnectError("Connection reset"),
+        Response(200, content=content),
+    ]
+
+    scraper_application.run(
+        urls=[base_url], format="custom", parser="bs4", ignore_robots_txt=True, max_retries=2, retry_backoff=0
+    )
+
+    assert route.call_count == 3
+    assert scraper_application.scraper is not None
+    assert scraper_application.scraper.stats.get("retries") == 2
+    assert scraper_application.scraper._retry_counts == {}
+    mock_database.save.assert_called_with(expected_data)
+
+
+def test_bs4_retry_exhausted_async(
+    scraper_application: Scraper,
+    async_bs4_select: None,
+    base_url: str,
+    scraper_save: None,
+    mock_database: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    route = mock_httpx.get("/")
+    route.mock(return_value=Response(500))
+
+    scraper_application.run(
+        urls=[base_url], format="custom", parser="bs4", ignore_robots_txt=True, max_retries=2, retry_backoff=0
+    )
+
+    assert route.call_count == 3
+    assert scraper_application.scraper is not None
+    assert scraper_application.scraper.stats.get("retries_exhausted") == 1
+    assert scraper_application.scraper._retry_counts == {}
     mock_database.save.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "failures, expected_calls, expected_trips, expected_skipped",
+    (
+        (2, 4, 1, None),  # the probe succeeds and the parked URLs are crawled
+        (10, 3, 2, 1),  # the probe fails and the remaining URLs are skipped
+    ),
+)
+def test_bs4_circuit_breaker(
+    scraper_application: Scraper,
+    bs4_select: None,
+    base_url: str,
+    test_html_path: str,
+    failures: int,
+    expected_calls: int,
+    expected_trips: int,
+    expected_skipped: Optional[int],
+) -> None:
+    with open(test_html_path) as f:
+        content = f.read()
+    calls = []
+
+    def side_effect(request: Request) -> Response:
+        calls.append(str(request.url))
+        return Response(503) if len(calls) <= failures else Response(200, content=content)
+
+    with respx.mock(base_url=base_url) as router:
+        router.get(re.compile("page-")).mock(side_effect=side_effect)
+        scraper_application.run(
+            urls=[urljoin(base_url, f"page-{i}.html") for i in range(1, 5)],
+            parser="bs4",
+            ignore_robots_txt=True,
+            circuit_breaker_threshold=2,
+            circuit_breaker_cool_down=0,
+            circuit_breaker_max_probes=1,
+        )
+
+    assert len(calls) == expected_calls
+    assert scraper_application.scraper is not None
+    assert scraper_application.scraper.stats.get("circuit_breaker.trips") == expected_trips
+    assert scraper_application.scraper.stats.get("circuit_breaker.skipped") == expected_skipped
+
+
+def test_bs4_circuit_breaker_probe_respects_crawl_delay(
+    scraper_application: Scraper,
+    bs4_select: None,
+    base_url: str,
+    test_html_path: str,
+) -> None:
+    with open(test_html_path) as f:
+        content = f.read()
+    times = []
+
+    def side_effect(request: Request) -> Response:
+        times.append(time.monotonic())
+        return Response(503) if len(times) == 1 else Response(200, content=content)
+
+    with respx.mock(base_url=base_url) as router:
+        router.get("/robots.txt").mock(return_value=Response(200, text="User-Agent: *\nCrawl-Delay: 0.5"))
+        router.get(re.compile("page-")).mock(side_effect=side_effect)
+        scraper_application.run(
+            urls=[urljoin(base_url, f"page-{i}.html") for i in range(1, 3)],
+            parser="bs4",
+            circuit_breaker_threshold=1,
+            circuit_breaker_cool_down=0,
+        )
+
+    # the probe sent after the failure waits for the crawl delay like the other requests
+    assert len(times) == 2
+    assert times[1] - times[0] >= 0.5
+
+
+def test_start_requests_lazy(
+    scraper_application: Scraper,
+    bs4_select: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    calls_when_pulled = []
+
+    @scraper_application.start_requests()
+    def start_requests() -> Iterable[Request]:
+        for url in (base_url, urljoin(base_url, "/empty.html")):
+            calls_when_pulled.append(mock_httpx.calls.call_count)
+            yield Request(method="GET", url=url)
+
+    assert calls_when_pulled == []
+
+    scraper_application.run(urls=[], format="custom", parser="bs4", ignore_robots_txt=True)
+
+    # each request is only created when the previous one has been sent
+    assert calls_when_pulled == [0, 1]
+    mock_database.save.assert_called_with(expected_data)
+
+
+def test_start_requests_async_generator(
+    scraper_application: Scraper,
+    async_bs4_select: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    @scraper_application.start_requests()
+    async def start_requests() -> AsyncIterator[Request]:
+        for url in (base_url, urljoin(base_url, "/empty.html")):
+            yield Request(method="GET", url=url)
+
+    assert scraper_application.has_async is True
+
+    scraper_application.run(urls=[], format="custom", parser="bs4", ignore_robots_txt=True, concurrency=2)
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert called_urls == [urljoin(base_url, "/"), urljoin(base_url, "/empty.html")]
+    mock_database.save.assert_called_with(expected_data)
+
+
+def test_bs4_processes(
+    scraper_application: Scraper, scraper_save: None, mock_database: mock.MagicMock, tmp_path: Path
+) -> None:
+    # the two hosts are crawled by different processes (see test_sharding.py),
+    # the pages of each host link to the other host
+    links = {
+        "https://dwmc.ron.sh/": "https://example.com/page.html",
+        "https://dwmc.ron.sh/page.html": "https://example.com/",
+        "https://example.com/": "https://dwmc.ron.sh/page.html",
+        "https://example.com/page.html": "https://dwmc.ron.sh/",
+    }
+
+    @scraper_application.select(css="a")
+    def link(element: BeautifulSoup) -> Dict:
+        url = str(element["href"])
+        scraper_application.follow_url(url)
+        return {"url": url}
+
+    events = tmp_path / "events.txt"
+
+    @scraper_application.startup()
+    def startup() -> None:
+        with events.open("a") as f:
+            f.write("startup\n")
+
+    @scraper_application.shutdown()
+    def shutdown() -> None:
+        with events.open("a") as f:
+            f.write("shutdown\n")
+
+    with respx.mock(assert_all_called=False) as router:  # the routes are called by the forked processes
+        for url, link_url in links.items():
+            router.get(url).mock(
+                return_value=Response(200, text=f'<html><body><a href="{link_url}">link</a></body></html>')
+            )
+        scraper_application.run(
+            urls=["https://dwmc.ron.sh/", "https://example.com/"],
+            parser="bs4",
+            format="custom",
+            ignore_robots_txt=True,
+            processes=2,
+            robots_cache=str(tmp_path / "robots.json"),
+        )
+
+    # the data of each process is merged in the order of the processes
+    mock_database.save.assert_called_once()
+    (data,), _ = mock_database.save.call_args
+    assert [(item["_page_url"], item["url"]) for item in data] == list(links.items())
+    # the events are run once by the main process and each process has its own robots.txt cache
+    assert events.read_text() == "startup\nshutdown\n"
+    assert sorted(path.name for path in tmp_path.glob("robots*.json")) == ["robots.0.json", "robots.1.json"]
+
+
+def test_bs4_processes_read_seeds_once(
+    scraper_application: Scraper, scraper_save: None, mock_database: mock.MagicMock, tmp_path: Path
+) -> None:
+    reads = tmp_path / "reads.txt"
+
+    class Seeds:
+        def __iter__(self) -> Iterator[str]:
+            with reads.open("a") as f:
+                f.write("read\n")
+            yield from ["https://dwmc.ron.sh/", "https://example.com/"]
+
+    @scraper_application.select(css="title")
+    def title(element: BeautifulSoup) -> Dict:
+        return {"title": element.text}
+
+    with respx.mock(assert_all_called=False) as router:  # the routes are called by the forked processes
+        router.get(url__regex=r"https://(dwmc\.ron\.sh|example\.com)/$").mock(
+            return_value=Response(200, html="<html><head><title>Page</title></head></html>")
+        )
+        scraper_application.run(urls=Seeds(), parser="bs4", format="custom", ignore_robots_txt=True, processes=2)
+
+    # the starting URLs are read by the main process and each process crawls its own
+    assert reads.read_text() == "read\n"
+    (data,), _ = mock_database.save.call_args
+    assert sorted(item["_page_url"] for item in data) == ["https://dwmc.ron.sh/", "https://example.com/"]
+
+
+def test_bs4_processes_max_pages(
+    scraper_application: Scraper, scraper_save: None, mock_database: mock.MagicMock
+) -> None:
+    urls = [f"https://dwmc.ron.sh/{i}.html" for i in range(5)]
+
+    @scraper_application.select(css="title")
+    def title(element: BeautifulSoup) -> Dict:
+        return {"title": element.text}
+
+    with respx.mock(assert_all_called=False) as router:  # the routes are called by the forked processes
+        router.get(url__startswith="https://dwmc.ron.sh/").mock(
+            return_value=Response(200, html="<html><head><title>Page</title></head></html>")
+        )
+        scraper_application.run(
+            urls=urls, parser="bs4", format="custom", ignore_robots_txt=True, processes=2, max_pages=3
+        )
+
+    # the budget applies to all the processes together, although a single process crawls the only host
+    (data,), _ = mock_database.save.call_args
+    assert len(data) == 3
+
+
+def test_bs4_url_file(
+    scraper_application: Scraper,
+    bs4_select: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database: mock.MagicMock,
+    mock_httpx: Router,
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "urls.txt"
+    path.write_text(f"{base_url}\n")
+
+    scraper_application.run(urls=URLFile(str(path)), format="custom", parser="bs4", ignore_robots_txt=True)
+
+    assert scraper_application.scraper is not None
+    assert scraper_application.scraper.allowed_domains == {"dwmc.ron.sh"}
+    mock_database.save.assert_called_with(expected_data)
+
+
+def test_bs4_sitemap(
+    scraper_application: Scraper,
+    bs4_select: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database: mock.MagicMock,
+    mock_httpx: Router,
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "sitemap.xml"
+    path.write_text(
+        f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"><url><loc>{base_url}</loc></url></urlset>'
+    )
+
+    scraper_application.run(urls=Sitemap([path.as_uri()]), format="custom", parser="bs4", ignore_robots_txt=True)
+
+    mock_database.save.assert_called_with(expected_data)
+
+
+@pytest.mark.parametrize(
+    "budget, expected_calls, expected_exhausted",
+    (
+        ({"max_pages": 1}, 1, "max_pages"),
+        ({"max_items": 3}, 1, "max_items"),  # the first page has 3 items
+        ({"max_items": 4}, 3, None),  # the other pages have no items
+        ({"max_duration": 0}, 0, "max_duration"),
+    ),
+)
+def test_bs4_budget(
+    scraper_application: Scraper,
+    bs4_select: None,
+    base_url: str,
+    scraper_save: None,
+    mock_database: mock.MagicMock,
+    mock_httpx: Router,
+    budget: Dict[str, Any],
+    expected_calls: int,
+    expected_exhausted: Optional[str],
+) -> None:
+    urls = [base_url, urljoin(base_url, "/page-2.html"), urljoin(base_url, "/page-3.html")]
+
+    scraper_application.run(urls=urls, format="custom", parser="bs4", ignore_robots_txt=True, **budget)
+
+    assert mock_httpx.calls.call_count == expected_calls
+    assert scraper_application.scraper is not None
+    assert scraper_application.scraper.budget.exhausted == expected_exhausted
+    # the data scraped before the budget was exhausted is saved
+    assert mock_database.save.called == (expected_calls > 0)
+
+
+def test_bs4_http_cache(
+    scraper_application: Scraper,
+    base_url: str,
+    scraper_save: None,
+    mock_database: mock.MagicMock,
+    tmp_path: Path,
+) -> None:
+    @scraper_application.select(css="title")
+    def title(element: BeautifulSoup) -> Dict:
+        return {"title": element.get_text()}
+
+    def respond(request: Request) -> Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            return Response(304)
+        return Response(200, text="<html><head><title>Dude</title></head></html>", headers={"ETag": '"v1"'})
+
+    http_cache = str(tmp_path / "cache.sqlite3")
+    with respx.mock(assert_all_called=False) as router:
+        route = router.get(base_url).mock(side_effect=respond)
+        for offline in (False, False, True):
+            scraper_application.run(
+                urls=[base_url],
+                parser="bs4",
+                format="custom",
+                ignore_robots_txt=True,
+                http_cache=http_cache,
+                offline=offline,
+            )
+            (data,), _ = mock_database.save.call_args
+            assert [item["title"] for item in data] == ["Dude"]
+
+    # the page is downloaded, then revalidated, then replayed without any request
+    assert route.call_count == 2
+    assert "If-None-Match" not in route.calls[0].request.headers
+    assert route.calls[1].request.headers["If-None-Match"] == '"v1"'
+    assert route.calls[1].response.status_code == 304
+
+
+@pytest.mark.parametrize("has_async", (False, True))
+def test_bs4_connection_limits(
+    scraper_application: Scraper,
+    base_url: str,
+    scraper_save: None,
+    mock_httpx: Router,
+    has_async: bool,
+) -> None:
+    scraper_application.has_async = has_async
+    client_class = "httpx.AsyncClient" if has_async else "httpx.Client"
+    with mock.patch(client_class, wraps=getattr(httpx, client_class.split(".")[1])) as client:
+        scraper_application.run(
+            urls=[base_url],
+            format="custom",
+            parser="bs4",
+            ignore_robots_txt=True,
+            max_connections=10,
+            max_keepalive_connections=5,
+            keepalive_expiry=30,
+        )
+
+    _, kwargs = client.call_args
+    assert kwargs["http2"] is False
+    assert kwargs["limits"] == httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=30)
+
+
+def test_bs4_response_filter(
+    scraper_application: Scraper,
+    base_url: str,
+    scraper_save: None,
+) -> None:
+    titles = []
+
+    @scraper_application.select(css="title")
+    def title(element: BeautifulSoup) -> Dict:
+        titles.append(element.get_text())
+        return {"title": element.get_text()}
+
+    html = "<html><head><title>{}</title></head></html>"
+    streamed = []
+
+    def stream() -> Iterable[bytes]:
+        for i in range(10):
+            streamed.append(i)
+            yield html.format("Streamed").encode()
+
+    pages = {
+        "/": Response(200, html=html.format("Page")),
+        "/file.pdf": Response(200, content=b"%PDF", headers={"Content-Type": "application/pdf"}),
+        "/large.html": Response(200, html=html.format("Large" * 100)),
+        "/streamed.html": Response(200, content=stream(), headers={"Content-Type": "text/html"}),
+        "/plain.txt": Response(200, text=html.format("Plain")),
+    }
+    with respx.mock(base_url=base_url) as router:
+        for path, response in pages.items():
+            router.get(path).mock(return_value=response)
+        scraper_application.run(
+            urls=[urljoin(base_url, path) for path in pages],
+            format="custom",
+            parser="bs4",
+            ignore_robots_txt=True,
+            content_types=["text/html", "TEXT/PLAIN"],
+            max_body_size=100,
+        )
+
+    assert titles == ["Page", "Plain"]
+    # the streamed body is not read after it exceeds the maximum size
+    assert len(streamed) < 10
+
+
+@pytest.mark.parametrize("parser_processes", (0, 2))
+def test_full_flow_bs4_parse_bytes(
+    scraper_application: Scraper,
+    bs4_select: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+    parser_processes: int,
+) -> None:
+    scraper_application.run(
+        urls=[base_url],
+        format="custom",
+        parser="bs4",
+        follow_urls=True,
+        ignore_robots_txt=True,
+        parser_processes=parser_processes,
+        parse_bytes=True,
+    )
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+
+
+def test_bs4_record_and_replay(
+    scraper_application: Scraper,
+    bs4_select: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database: mock.MagicMock,
+    mock_httpx: Router,
+    tmp_path: Path,
+) -> None:
+    path = str(tmp_path / "recording.sqlite3")
+    scraper_application.run(urls=[base_url], format="custom", parser="bs4", ignore_robots_txt=True, record=path)
+    mock_database.save.assert_called_with(expected_data)
+    calls = mock_httpx.calls.call_count
+
+    mock_database.reset_mock()
+    scraper_application.run(urls=[base_url], format="custom", parser="bs4", ignore_robots_txt=True, replay=path)
+    mock_database.save.assert_called_with(expected_data)
+    assert mock_httpx.calls.call_count == calls  # no request was sent
+
+
+def test_bs4_current_url_concurrent_async(scraper_application: Scraper, base_url: str, scraper_save: None) -> None:
+    urls = [urljoin(base_url, f"/page-{i}.html") for i in range(10)]
+    current_urls = []
+
+    @scraper_application.select(css="title")
+    async def title(element: BeautifulSoup) -> Dict:
+        await asyncio.sleep(0.01)  # let the other pages be scraped meanwhile
+        current_urls.append((element.get_text(), scraper_application.get_current_url()))
+        return {}
+
+    with respx.mock(base_url=base_url) as router:
+        for url in urls:
+            router.get(url).mock(return_value=Response(200, html=f"<html><head><title>{url}</title></head></html>"))
+        scraper_application.run(urls=urls, format="custom", parser="bs4", ignore_robots_txt=True, concurrency=10)
+
+    assert len(current_urls) == len(urls)
+    assert all(title == current_url for title, current_url in current_urls)
+
+
+def test_bs4_failed_task_cancels_siblings_async(
+    scraper_application: Scraper, base_url: str, scraper_save: None
+) -> None:
+    urls = [urljoin(base_url, f"/page-{i}.html") for i in range(4)]
+    finished = []
+
+    @scraper_application.select(css="title")
+    async def title(element: BeautifulSoup) -> Dict:
+        if element.get_text() == urls[0]:
+            raise ValueError("Handler failed")
+        await asyncio.sleep(1)
+        finished.append(element.get_text())
+        return {}
+
+    with respx.mock(base_url=base_url) as router:
+        for url in urls:
+            router.get(url).mock(return_value=Response(200, html=f"<html><head><title>{url}</title></head></html>"))
+        with pytest.raises(ValueError):
+            scraper_application.run(
+                urls=urls,
+                format="custom",
+                parser="bs4",
+                ignore_robots_txt=True,
+                concurrency=4,
+                adaptive_concurrency=False,
+            )
+
+    # the other pages were cancelled instead of being left running
+    assert finished == []
+    assert all(task.done() for task in asyncio.all_tasks(asyncio.get_event_loop()))
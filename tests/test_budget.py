@@ -0,0 +1,74 @@
+import multiprocessing
+import time
+from typing import List
+
+from dude.budget import CrawlBudget
+
+
+def test_budget_without_limits() -> None:
+    budget = CrawlBudget()
+    for _ in range(100):
+        budget.add_page()
+
+    assert not budget.is_exhausted()
+    assert budget.time_left() is None
+
+
+def test_budget_max_pages() -> None:
+    budget = CrawlBudget(max_pages=2)
+    budget.add_page()
+    assert not budget.is_exhausted()
+
+    budget.add_page()
+    assert budget.is_exhausted()
+    assert budget.exhausted == "max_pages"
+
+
+def test_budget_max_items() -> None:
+    items = [1, 2]
+    budget = CrawlBudget(max_items=3, count_items=lambda: len(items))
+    assert not budget.is_exhausted()
+
+    items.append(3)
+    assert budget.is_exhausted()
+    assert budget.exhausted == "max_items"
+
+
+def test_budget_max_duration() -> None:
+    budget = CrawlBudget(max_duration=10)
+    now = time.monotonic()
+
+    assert 9 < (budget.time_left(now) or 0) <= 10
+    assert not budget.is_exhausted(now)
+    assert budget.time_left(now + 11) == 0
+    assert budget.is_exhausted(now + 11)
+    assert budget.exhausted == "max_duration"
+
+
+def test_budget_shared_pages() -> None:
+    pages = multiprocessing.Value("q", 0)
+    first, second = CrawlBudget(max_pages=3, shared_pages=pages), CrawlBudget(max_pages=3, shared_pages=pages)
+    first.add_page()
+    second.add_page()
+    assert not first.is_exhausted()
+
+    second.add_page()
+    assert first.is_exhausted()
+    assert second.is_exhausted()
+    assert first.pages == 1
+
+
+def test_budget_shared_items() -> None:
+    items = multiprocessing.Value("q", 0)
+    first_items: List[int] = []
+    first = CrawlBudget(max_items=3, count_items=lambda: len(first_items), shared_items=items)
+    second = CrawlBudget(max_items=3, count_items=lambda: 1, shared_items=items)
+    first_items.append(1)
+    assert not first.is_exhausted()
+    assert not first.is_exhausted()  # the items are only added once
+    assert not second.is_exhausted()
+    assert items.value == 2
+
+    first_items.append(2)
+    assert first.is_exhausted()
+    assert first.exhausted == "max_items"
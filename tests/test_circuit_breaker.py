@@ -0,0 +1,42 @@
+import time
+
+from dude.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from dude.stats import Stats
+
+
+def test_circuit_breaker() -> None:
+    stats = Stats()
+    breaker = CircuitBreaker(failure_threshold=2, cool_down=10, stats=stats)
+    breaker.record("a.com", failed=True)
+    breaker.record("a.com", failed=False)
+    breaker.record("a.com", failed=True)
+    assert breaker.is_closed("a.com")
+
+    breaker.record("a.com", failed=True)
+    assert breaker.state("a.com") == OPEN
+    assert stats.get("circuit_breaker.trips") == 1
+    assert breaker.is_closed("b.com")
+
+    # requests that were in flight do not change the state
+    breaker.record("a.com", failed=False)
+    assert breaker.state("a.com") == OPEN
+
+    assert breaker.try_probe("a.com") is False
+    assert 0 < (breaker.retry_in("a.com") or 0) <= 10
+    assert breaker.try_probe("a.com", now=time.monotonic() + 10) is True
+    assert breaker.state("a.com") == HALF_OPEN
+    assert breaker.retry_in("a.com") is None
+    assert breaker.try_probe("a.com", now=time.monotonic() + 10) is False  # a single probe at a time
+
+    breaker.record("a.com", failed=False)
+    assert breaker.state("a.com") == CLOSED
+
+
+def test_circuit_breaker_gives_up() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, cool_down=0, max_probes=1)
+    breaker.record("a.com", failed=True)
+    assert breaker.try_probe("a.com") is True
+    breaker.record("a.com", failed=True)
+    assert breaker.state("a.com") == OPEN
+    assert breaker.is_given_up("a.com") is True
+    assert breaker.try_probe("a.com") is False
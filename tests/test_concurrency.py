@@ -0,0 +1,88 @@
+import time
+
+import httpx
+
+from dude.concurrency import AdaptiveConcurrency
+from dude.optional.beautifulsoup_scraper import BeautifulSoupScraper
+from dude.optional.utils import http_get
+from dude.stats import Stats
+
+
+def test_adaptive_concurrency_slow_start() -> None:
+    stats = Stats()
+    throttle = AdaptiveConcurrency(max_limit=4, stats=stats)
+    assert throttle.limit("a.com") == 1
+    assert throttle.acquire("a.com") is False
+    assert throttle.has_capacity("a.com") is False
+
+    for _ in range(5):
+        throttle.record("a.com", started=time.monotonic(), latency=0.1, failed=False)
+    assert throttle.limit("a.com") == 4
+    assert stats.get("concurrency.a.com") == 4
+    assert throttle.release("a.com") is True
+    assert throttle.limit("b.com") == 1
+
+
+def test_adaptive_concurrency_decrease() -> None:
+    throttle = AdaptiveConcurrency(max_limit=8, initial_limit=8)
+    started = time.monotonic()
+    throttle.record("a.com", started=started, latency=0.1, failed=True)
+    assert throttle.limit("a.com") == 4
+    # requests sent before the decrease do not decrease the limit again
+    throttle.record("a.com", started=started, latency=0.1, failed=True)
+    assert throttle.limit("a.com") == 4
+
+    throttle.record("a.com", started=time.monotonic(), latency=0.1, failed=True)
+    assert throttle.limit("a.com") == 2
+
+    # congestion avoidance, one more request per round of successful responses
+    for _ in range(3):
+        throttle.record("a.com", started=time.monotonic(), latency=0.1, failed=False)
+    assert throttle.limit("a.com") == 3
+    # slow responses do not increase the limit
+    for _ in range(10):
+        throttle.record("a.com", started=time.monotonic(), latency=1.0, failed=False)
+    assert throttle.limit("a.com") == 3
+
+
+def test_adaptive_concurrency_min_limit() -> None:
+    throttle = AdaptiveConcurrency(max_limit=8, initial_limit=2)
+    for _ in range(3):
+        throttle.record("a.com", started=time.monotonic(), latency=0.1, failed=True)
+    assert throttle.limit("a.com") == 1
+    assert throttle.acquire("a.com") is False
+    assert throttle.release("a.com") is True
+
+
+def test_http_get_records_failures() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503 if request.url.path == "/busy" else 200, text="ok")
+
+    throttle = AdaptiveConcurrency(max_limit=8, initial_limit=4)
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        assert http_get(client, client.build_request("GET", "https://a.com/"), throttle) == ("ok", "https://a.com/")
+        assert throttle.limit("a.com") == 5
+        assert http_get(client, client.build_request("GET", "https://a.com/busy"), throttle) == (
+            None,
+            "https://a.com/busy",
+        )
+        assert throttle.limit("a.com") == 2
+
+
+def test_create_throttle_max_host_connections() -> None:
+    scraper = BeautifulSoupScraper()
+    assert scraper._create_throttle(1, True) is None
+    assert scraper._create_throttle(8, False) is None
+
+    adaptive = scraper._create_throttle(8, True, max_host_connections=2)
+    assert adaptive is not None
+    for _ in range(5):
+        adaptive.record("a.com", started=time.monotonic(), latency=0.1, failed=False)
+    assert adaptive.limit("a.com") == 2
+
+    # without adaptive concurrency, the limit of each host is fixed
+    fixed = scraper._create_throttle(8, False, max_host_connections=2)
+    assert fixed is not None
+    assert fixed.limit("a.com") == 2
+    fixed.record("a.com", started=time.monotonic(), latency=0.1, failed=True)
+    assert fixed.limit("a.com") == 2
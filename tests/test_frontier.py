@@ -0,0 +1,192 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Type
+
+import pytest
+
+from dude.frontier import SQLiteURLFrontier, URLFrontier, canonicalize_url
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    (
+        ("https://dude.ron.sh", "https://dude.ron.sh/"),
+        ("HTTPS://Dude.Ron.SH:443/Path#section", "https://dude.ron.sh/Path"),
+        ("http://dude.ron.sh:80/?b=2&a=1&a=0", "http://dude.ron.sh/?a=0&a=1&b=2"),
+        ("http://dude.ron.sh:8080/?empty=", "http://dude.ron.sh:8080/?empty="),
+        ("http://user:pass@[::1]:443/", "http://user:pass@[::1]:443/"),
+    ),
+)
+def test_canonicalize_url(url: str, expected: str) -> None:
+    assert canonicalize_url(url) == expected
+
+
+@pytest.mark.parametrize("frontier_class", (URLFrontier, SQLiteURLFrontier))
+def test_frontier_deduplication(frontier_class: Type[URLFrontier]) -> None:
+    frontier = frontier_class(["https://dude.ron.sh", "https://dude.ron.sh/#top"])
+    assert len(frontier) == 1
+    assert frontier.append("https://DUDE.ron.sh:443/") is False
+    assert frontier.append("https://dude.ron.sh/?b=1&a=2") is True
+    assert frontier.append("https://dude.ron.sh/?a=2&b=1") is False
+
+    frontier.mark_seen("https://dude.ron.sh/redirected")
+    assert frontier.append("https://dude.ron.sh/redirected") is False
+    assert "https://dude.ron.sh/redirected" in frontier
+
+    assert frontier.popleft() == "https://dude.ron.sh"
+    assert frontier.popleft() == "https://dude.ron.sh/?b=1&a=2"
+    assert not frontier
+    with pytest.raises(IndexError):
+        frontier.popleft()
+    assert frontier.append("https://dude.ron.sh") is False
+    frontier.close()
+
+
+def test_sqlite_frontier_batches(tmp_path: Path) -> None:
+    path = str(tmp_path / "frontier.sqlite3")
+    frontier = SQLiteURLFrontier((f"https://dude.ron.sh/{i}" for i in range(5)), path=path, batch_size=2)
+    assert len(frontier) == 5
+    assert frontier.popleft() == "https://dude.ron.sh/0"
+    frontier.extend(f"https://dude.ron.sh/{i}" for i in range(10))
+    assert len(frontier) == 9
+    assert [frontier.popleft() for _ in range(9)] == [f"https://dude.ron.sh/{i}" for i in range(1, 10)]
+    assert not frontier
+    frontier.close()
+    assert Path(path).exists()
+
+
+@pytest.mark.parametrize("frontier_class", (URLFrontier, SQLiteURLFrontier))
+def test_frontier_state(frontier_class: Type[URLFrontier], tmp_path: Path) -> None:
+    path = str(tmp_path / "frontier.sqlite3")
+    kwargs: Dict[str, Any] = {"path": path} if frontier_class is SQLiteURLFrontier else {}
+    frontier = frontier_class((f"https://dude.ron.sh/{i}" for i in range(3)), **kwargs)
+    assert frontier.popleft() == "https://dude.ron.sh/0"
+    state = frontier.get_state()
+    assert frontier.popleft() == "https://dude.ron.sh/1"  # popped after the checkpoint
+
+    resume_kwargs: Dict[str, Any] = {"path": path, "resume": True} if frontier_class is SQLiteURLFrontier else {}
+    frontier = frontier_class(["https://dude.ron.sh/0"], **resume_kwargs)
+    frontier.set_state(state)
+    frontier.requeue("https://dude.ron.sh/0")
+    assert "https://dude.ron.sh/0" in frontier
+    assert [frontier.popleft() for _ in range(len(frontier))] == [
+        "https://dude.ron.sh/1",
+        "https://dude.ron.sh/2",
+        "https://dude.ron.sh/0",
+    ]
+    frontier.close()
+
+
+@pytest.mark.parametrize("frontier_class", (URLFrontier, SQLiteURLFrontier))
+def test_frontier_max_depth(frontier_class: Type[URLFrontier]) -> None:
+    frontier = frontier_class(["https://dude.ron.sh"], max_depth=1)
+    assert frontier.append("https://dude.ron.sh/1", depth=1) is True
+    assert frontier.append("https://dude.ron.sh/2", depth=2) is False
+    assert "https://dude.ron.sh/2" not in frontier
+    assert frontier.depth("https://dude.ron.sh/1") == 1
+    assert frontier.depth("https://dude.ron.sh/2") is None
+    frontier.close()
+
+
+@pytest.mark.parametrize("frontier_class", (URLFrontier, SQLiteURLFrontier))
+@pytest.mark.parametrize(
+    "order, priority, expected",
+    (
+        ("bfs", None, "abcd"),
+        ("dfs", None, "bdca"),
+        ("bfs", lambda url, depth: url.endswith(("a", "c")), "bdac"),
+        ("dfs", lambda url, depth: url.endswith(("a", "c")), "bdca"),
+    ),
+)
+def test_frontier_order(
+    frontier_class: Type[URLFrontier], order: str, priority: Optional[Callable], expected: str
+) -> None:
+    kwargs: Dict[str, Any] = {"batch_size": 1} if frontier_class is SQLiteURLFrontier else {}
+    frontier = frontier_class(order=order, priority=priority, **kwargs)
+    frontier.extend(["https://dude.ron.sh/a", "https://dude.ron.sh/b"])
+    popped = [frontier.popleft()]
+    # URLs queued after the first URLs were loaded from the database are still sorted
+    frontier.extend(["https://dude.ron.sh/c", "https://dude.ron.sh/d"])
+    popped.extend(frontier.popleft() for _ in range(len(frontier)))
+    assert "".join(url[-1] for url in popped) == expected
+    frontier.close()
+
+
+@pytest.mark.parametrize("frontier_class", (URLFrontier, SQLiteURLFrontier))
+@pytest.mark.parametrize(
+    "host_weights, expected",
+    (
+        (None, ["a.com/1", "b.com/1", "c.com/1", "a.com/2", "b.com/2", "a.com/3"]),
+        ({"a.com": 2}, ["a.com/1", "a.com/2", "b.com/1", "c.com/1", "a.com/3", "b.com/2"]),
+    ),
+)
+def test_frontier_round_robin(
+    frontier_class: Type[URLFrontier], host_weights: Optional[Dict[str, int]], expected: List[str]
+) -> None:
+    kwargs: Dict[str, Any] = {"batch_size": 1} if frontier_class is SQLiteURLFrontier else {}
+    frontier = frontier_class(round_robin=True, host_weights=host_weights, **kwargs)
+    frontier.extend(f"https://a.com/{i}" for i in range(1, 4))
+    frontier.extend(["https://b.com/1", "https://b.com/2", "https://c.com/1"])
+    assert len(frontier) == 6
+    assert [frontier.popleft()[len("https://") :] for _ in range(6)] == expected
+    assert not frontier
+    frontier.close()
+
+
+def test_sqlite_frontier_round_robin_batches() -> None:
+    frontier = SQLiteURLFrontier(round_robin=True, batch_size=100, host_batch_size=2, host_weights={"b.com": 3})
+    for host in ("a.com", "b.com", "c.com"):
+        frontier.extend(f"https://{host}/{i}" for i in range(1, 6))
+    assert [frontier.popleft()[len("https://") :] for _ in range(5)] == [
+        "a.com/1",
+        "b.com/1",
+        "b.com/2",
+        "b.com/3",
+        "c.com/1",
+    ]
+    # each host only has a few URLs in memory, at least as many as its weight
+    assert {host: len(queue) for host, queue in frontier._queues.items()} == {"a.com": 1, "b.com": 0, "c.com": 1}
+    assert len(frontier) == 10
+    assert sorted(frontier.popleft() for _ in range(10)) == sorted(
+        f"https://{host}/{i}" for host, start in (("a.com", 2), ("b.com", 4), ("c.com", 2)) for i in range(start, 6)
+    )
+    frontier.close()
+
+
+@pytest.mark.parametrize("frontier_class", (URLFrontier, SQLiteURLFrontier))
+@pytest.mark.parametrize("round_robin", (False, True))
+def test_frontier_popleft_if(frontier_class: Type[URLFrontier], round_robin: bool) -> None:
+    frontier = frontier_class(["https://a.com/1", "https://a.com/2", "https://b.com/1"], round_robin=round_robin)
+
+    def accept_b(url: str) -> bool:
+        return url.startswith("https://b.com/")
+
+    if round_robin:
+        # a.com loses its turn
+        assert frontier.popleft_if(accept_b) == "https://b.com/1"
+        assert frontier.popleft() == "https://a.com/1"
+    else:
+        # the next URL blocks the other ones
+        assert frontier.popleft_if(accept_b) is None
+        assert frontier.popleft() == "https://a.com/1"
+    assert frontier.popleft_if(lambda url: False) is None
+    assert len(frontier) == (1 if round_robin else 2)
+    frontier.close()
+
+
+@pytest.mark.parametrize("frontier_class", (URLFrontier, SQLiteURLFrontier))
+def test_frontier_round_robin_state(frontier_class: Type[URLFrontier], tmp_path: Path) -> None:
+    path = str(tmp_path / "frontier.sqlite3")
+    kwargs: Dict[str, Any] = {"path": path} if frontier_class is SQLiteURLFrontier else {}
+    urls = ["https://a.com/1", "https://a.com/2", "https://b.com/1"]
+    frontier = frontier_class(urls, round_robin=True, **kwargs)
+    state = frontier.get_state()
+
+    resume_kwargs: Dict[str, Any] = {"path": path, "resume": True} if frontier_class is SQLiteURLFrontier else {}
+    frontier = frontier_class(round_robin=True, **resume_kwargs)
+    frontier.set_state(state)
+    assert [frontier.popleft() for _ in range(len(frontier))] == [
+        "https://a.com/1",
+        "https://b.com/1",
+        "https://a.com/2",
+    ]
+    frontier.close()
@@ -0,0 +1,57 @@
+from pathlib import Path
+
+from dude.http_cache import HTTPCache
+from dude.stats import Stats
+
+
+def test_http_cache(tmp_path: Path) -> None:
+    stats = Stats()
+    cache = HTTPCache(str(tmp_path / "cache.sqlite3"), stats=stats)
+    assert cache.get("https://dude.ron.sh/") is None
+
+    headers = [
+        ("Content-Type", "text/html; charset=utf-8"),
+        ("Content-Encoding", "gzip"),
+        ("ETag", '"v1"'),
+        ("Last-Modified", "Mon, 31 Jan 2022 12:00:00 GMT"),
+    ]
+    cache.store("https://DUDE.ron.sh", "https://dude.ron.sh/index.html", headers, b"<html></html>")
+    cached = cache.get("https://dude.ron.sh/")  # URLs are compared by their canonical form
+    assert cached is not None
+    assert cached.url == "https://dude.ron.sh/index.html"
+    assert cached.content == b"<html></html>"
+    # the content is stored decoded
+    assert cached.headers == [
+        ("content-type", "text/html; charset=utf-8"),
+        ("etag", '"v1"'),
+        ("last-modified", "Mon, 31 Jan 2022 12:00:00 GMT"),
+    ]
+    assert cache.validators(cached) == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 31 Jan 2022 12:00:00 GMT",
+    }
+
+    cache.touch("https://dude.ron.sh/")
+    assert stats.get("http_cache.misses") == 1
+    assert stats.get("http_cache.hits") == 1
+    assert stats.get("http_cache.stored") == 1
+    assert stats.get("http_cache.revalidated") == 1
+    cache.close()
+
+    # the responses are kept between runs
+    cache = HTTPCache(str(tmp_path / "cache.sqlite3"))
+    assert len(cache) == 1
+    cache.close()
+
+
+def test_http_cache_no_store(tmp_path: Path) -> None:
+    cache = HTTPCache(str(tmp_path / "cache.sqlite3"))
+    cache.store("https://dude.ron.sh/", "https://dude.ron.sh/", [("Cache-Control", "private, no-store")], b"")
+    cached = cache.get("https://dude.ron.sh/")
+    assert cached is None
+
+    cache.store("https://dude.ron.sh/", "https://dude.ron.sh/", [], b"")
+    cached = cache.get("https://dude.ron.sh/")
+    assert cached is not None
+    assert cache.validators(cached) == {}
+    cache.close()
@@ -3,6 +3,8 @@ from unittest import mock
 from urllib.parse import urljoin
 
 import pytest
+import respx
+from httpx import Response
 from lxml.etree import _Element
 from respx import Router
 
@@ -107,6 +109,94 @@ def test_full_flow_lxml(
     mock_database.save.assert_not_called()
 
 
+def test_full_flow_lxml_parser_processes(
+    scraper_application: Scraper,
+    lxml_css: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    assert scraper_application.has_async is False
+
+    scraper_application.run(
+        urls=[base_url],
+        format="custom",
+        parser="lxml",
+        follow_urls=True,
+        ignore_robots_txt=True,
+        parser_processes=2,
+    )
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert urljoin(base_url, "url-1.html") in called_urls
+    assert urljoin(base_url, "url-2.html") in called_urls
+    assert urljoin(base_url, "url-3.html") in called_urls
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+
+
+def test_full_flow_lxml_workers(
+    scraper_application: Scraper,
+    lxml_css: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    assert scraper_application.has_async is False
+
+    scraper_application.run(
+        urls=[base_url],
+        format="custom",
+        parser="lxml",
+        follow_urls=True,
+        ignore_robots_txt=True,
+        workers=4,
+    )
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert urljoin(base_url, "url-1.html") in called_urls
+    assert urljoin(base_url, "url-2.html") in called_urls
+    assert urljoin(base_url, "url-3.html") in called_urls
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+
+
+def test_full_flow_lxml_pipeline(
+    scraper_application: Scraper,
+    lxml_css: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    assert scraper_application.has_async is False
+
+    scraper_application.run(
+        urls=[base_url],
+        format="custom",
+        parser="lxml",
+        follow_urls=True,
+        ignore_robots_txt=True,
+        pipeline=True,
+        pipeline_queue_size=1,
+    )
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert urljoin(base_url, "url-1.html") in called_urls
+    assert urljoin(base_url, "url-2.html") in called_urls
+    assert urljoin(base_url, "url-3.html") in called_urls
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+    assert scraper_application.scraper is not None
+    stats = scraper_application.scraper.stats.snapshot()
+    assert stats["pipeline.fetched"] == stats["pipeline.scraped"] == stats["pipeline.saved"] == len(called_urls)
+
+
 def test_lxml_httpx_exception(
     scraper_application: Scraper,
     lxml_css: None,
@@ -158,6 +248,36 @@ def test_full_flow_lxml_httpx_async(
     mock_database_per_page.save.assert_called_with(expected_data)
 
 
+def test_full_flow_lxml_concurrent_async(
+    scraper_application: Scraper,
+    async_lxml_css: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    assert scraper_application.has_async is True
+    assert len(scraper_application.rules) == 4
+
+    scraper_application.run(
+        urls=[base_url],
+        pages=2,
+        format="custom",
+        parser="lxml",
+        follow_urls=True,
+        ignore_robots_txt=True,
+        concurrency=4,
+    )
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert urljoin(base_url, "url-1.html") in called_urls
+    assert urljoin(base_url, "url-2.html") in called_urls
+    assert urljoin(base_url, "url-3.html") in called_urls
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+
+
 def test_lxml_httpx_exception_async(
     scraper_application: Scraper,
     async_lxml_css: None,
@@ -224,3 +344,57 @@ def test_full_flow_lxml_regex(
     scraper_application.run(urls=[base_url], pages=2, format="custom", parser="lxml")
 
     mock_database.save.assert_called_with(expected_data)
+
+
+def test_full_flow_lxml_parse_bytes(
+    scraper_application: Scraper,
+    lxml_css: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    scraper_application.run(
+        urls=[base_url], pages=2, format="custom", parser="lxml", follow_urls=True, parse_bytes=True
+    )
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+
+
+@pytest.mark.parametrize(
+    "content_type, meta, encoding, parse_bytes",
+    (
+        ("text/html; charset=ISO-8859-1", '<meta charset="ISO-8859-1">', "latin-1", False),
+        ("text/html; charset=ISO-8859-1", '<meta charset="ISO-8859-1">', "latin-1", True),
+        ("text/html", '<meta charset="ISO-8859-1">', "latin-1", True),  # detected from the <meta charset> tag
+        ("text/html", "", "utf-8", False),
+        ("text/html", "", "utf-8", True),  # UTF-8 by default
+    ),
+)
+def test_lxml_encoding(
+    scraper_application: Scraper,
+    base_url: str,
+    scraper_save: None,
+    content_type: str,
+    meta: str,
+    encoding: str,
+    parse_bytes: bool,
+) -> None:
+    titles = []
+
+    @scraper_application.select(css=".title")
+    def title(element: _Element) -> Dict:
+        titles.append(element.text)
+        return {}
+
+    content = f'<html><head>{meta}</head><body><p class="title">Café</p></body></html>'
+    with respx.mock(base_url=base_url) as router:
+        router.get("/").mock(
+            return_value=Response(200, content=content.encode(encoding), headers={"Content-Type": content_type})
+        )
+        scraper_application.run(
+            urls=[base_url], format="custom", parser="lxml", ignore_robots_txt=True, parse_bytes=parse_bytes
+        )
+
+    assert titles == ["Café"]
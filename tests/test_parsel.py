@@ -4,6 +4,8 @@ from urllib.parse import urljoin
 
 import parsel
 import pytest
+import respx
+from httpx import Response
 from respx import Router
 
 from dude import Scraper
@@ -131,6 +133,94 @@ def test_full_flow_parsel(
     mock_database.save.assert_not_called()
 
 
+def test_full_flow_parsel_parser_processes(
+    scraper_application: Scraper,
+    parsel_css: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    assert scraper_application.has_async is False
+
+    scraper_application.run(
+        urls=[base_url],
+        format="custom",
+        parser="parsel",
+        follow_urls=True,
+        ignore_robots_txt=True,
+        parser_processes=2,
+    )
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert urljoin(base_url, "url-1.html") in called_urls
+    assert urljoin(base_url, "url-2.html") in called_urls
+    assert urljoin(base_url, "url-3.html") in called_urls
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+
+
+def test_full_flow_parsel_workers(
+    scraper_application: Scraper,
+    parsel_css: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    assert scraper_application.has_async is False
+
+    scraper_application.run(
+        urls=[base_url],
+        format="custom",
+        parser="parsel",
+        follow_urls=True,
+        ignore_robots_txt=True,
+        workers=4,
+    )
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert urljoin(base_url, "url-1.html") in called_urls
+    assert urljoin(base_url, "url-2.html") in called_urls
+    assert urljoin(base_url, "url-3.html") in called_urls
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+
+
+def test_full_flow_parsel_pipeline(
+    scraper_application: Scraper,
+    parsel_css: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    assert scraper_application.has_async is False
+
+    scraper_application.run(
+        urls=[base_url],
+        format="custom",
+        parser="parsel",
+        follow_urls=True,
+        ignore_robots_txt=True,
+        pipeline=True,
+        pipeline_queue_size=1,
+    )
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert urljoin(base_url, "url-1.html") in called_urls
+    assert urljoin(base_url, "url-2.html") in called_urls
+    assert urljoin(base_url, "url-3.html") in called_urls
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+    assert scraper_application.scraper is not None
+    stats = scraper_application.scraper.stats.snapshot()
+    assert stats["pipeline.fetched"] == stats["pipeline.scraped"] == stats["pipeline.saved"] == len(called_urls)
+
+
 def test_parsel_httpx_exception(
     scraper_application: Scraper,
     parsel_css: None,
@@ -182,6 +272,36 @@ def test_full_flow_parsel_httpx_async(
     mock_database_per_page.save.assert_called_with(expected_data)
 
 
+def test_full_flow_parsel_concurrent_async(
+    scraper_application: Scraper,
+    async_parsel_css: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    assert scraper_application.has_async is True
+    assert len(scraper_application.rules) == 4
+
+    scraper_application.run(
+        urls=[base_url],
+        pages=2,
+        format="custom",
+        parser="parsel",
+        follow_urls=True,
+        ignore_robots_txt=True,
+        concurrency=4,
+    )
+
+    called_urls = [str(request.url) for request, _ in mock_httpx.calls]
+    assert urljoin(base_url, "url-1.html") in called_urls
+    assert urljoin(base_url, "url-2.html") in called_urls
+    assert urljoin(base_url, "url-3.html") in called_urls
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+
+
 def test_parsel_httpx_exception_async(
     scraper_application: Scraper,
     async_parsel_css: None,
@@ -282,3 +402,53 @@ def test_full_flow_parsel_async_generator(
     scraper_application.run(urls=[base_url], pages=2, format="custom", parser="parsel")
 
     mock_database.save.assert_called_with(expected_generator_data)
+
+
+def test_full_flow_parsel_parse_bytes(
+    scraper_application: Scraper,
+    parsel_css: None,
+    expected_data: List[Dict],
+    base_url: str,
+    scraper_save: None,
+    mock_database_per_page: mock.MagicMock,
+    mock_httpx: Router,
+) -> None:
+    scraper_application.run(
+        urls=[base_url], pages=2, format="custom", parser="parsel", follow_urls=True, parse_bytes=True
+    )
+
+    mock_database_per_page.save.assert_called_with(expected_data)
+
+
+@pytest.mark.parametrize(
+    "content_type, encoding, parse_bytes",
+    (
+        ("text/html; charset=ISO-8859-1", "latin-1", False),
+        ("text/html; charset=ISO-8859-1", "latin-1", True),
+        ("text/html", "utf-8", False),
+        ("text/html", "utf-8", True),  # UTF-8 by default
+    ),
+)
+def test_parsel_encoding(
+    scraper_application: Scraper,
+    base_url: str,
+    scraper_save: None,
+    content_type: str,
+    encoding: str,
+    parse_bytes: bool,
+) -> None:
+    titles = []
+
+    @scraper_application.select(css=".title::text")
+    def title(selector: parsel.Selector) -> Dict:
+        titles.append(selector.get())
+        return {}
+
+    content = '<html><body><p class="title">Café</p></body></html>'.encode(encoding)
+    with respx.mock(base_url=base_url) as router:
+        router.get("/").mock(return_value=Response(200, content=content, headers={"Content-Type": content_type}))
+        scraper_application.run(
+            urls=[base_url], format="custom", parser="parsel", ignore_robots_txt=True, parse_bytes=parse_bytes
+        )
+
+    assert titles == ["Café"]
@@ -0,0 +1,63 @@
+import asyncio
+import gzip
+from pathlib import Path
+
+import httpx
+import pytest
+
+from dude.optional.recording import ExchangeArchive, RecordingTransport, ReplayTransport
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/gzip":
+        return httpx.Response(200, content=gzip.compress(b"compressed"), headers={"Content-Encoding": "gzip"})
+    return httpx.Response(200, text=f"{request.method} {request.content.decode()}")
+
+
+def test_record_and_replay(tmp_path: Path) -> None:
+    path = str(tmp_path / "recording.sqlite3")
+    with httpx.Client(transport=RecordingTransport(httpx.MockTransport(handler), path)) as client:
+        assert client.get("https://a.com/").text == "GET "
+        assert client.post("https://a.com/", content=b"body").text == "POST body"
+        assert client.get("https://a.com/gzip").text == "compressed"
+
+    archive = ExchangeArchive(path)
+    assert len(archive) == 3
+    archive.close()
+
+    with httpx.Client(transport=ReplayTransport(path)) as client:
+        assert client.get("https://a.com/").text == "GET "
+        assert client.post("https://a.com/", content=b"body").text == "POST body"
+        assert client.get("https://a.com/gzip").text == "compressed"
+        with pytest.raises(httpx.ConnectError):
+            client.post("https://a.com/", content=b"other body")
+        with pytest.raises(httpx.ConnectError):
+            client.get("https://b.com/")
+
+
+def test_replay_in_order(tmp_path: Path) -> None:
+    path = str(tmp_path / "recording.sqlite3")
+    statuses = iter((503, 200))
+
+    def flaky(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(next(statuses))
+
+    with httpx.Client(transport=RecordingTransport(httpx.MockTransport(flaky), path)) as client:
+        assert client.get("https://a.com/").status_code == 503
+        assert client.get("https://a.com/").status_code == 200
+
+    with httpx.Client(transport=ReplayTransport(path)) as client:
+        assert [client.get("https://a.com/").status_code for _ in range(3)] == [503, 200, 200]
+
+
+def test_record_and_replay_async(tmp_path: Path) -> None:
+    path = str(tmp_path / "recording.sqlite3")
+
+    async def crawl(transport: httpx.AsyncBaseTransport) -> str:
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.get("https://a.com/gzip")
+            return response.text
+
+    loop = asyncio.get_event_loop()
+    assert loop.run_until_complete(crawl(RecordingTransport(httpx.MockTransport(handler), path))) == "compressed"
+    assert loop.run_until_complete(crawl(ReplayTransport(path, latency=0.01))) == "compressed"
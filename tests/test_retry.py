@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+from unittest import mock
+
+from dude.retry import RetryPolicy, parse_retry_after
+
+
+def test_parse_retry_after() -> None:
+    now = datetime(2022, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Sat, 01 Jan 2022 12:00:30 GMT", now=now) == 30
+    assert parse_retry_after("Sat, 01 Jan 2022 11:00:00 GMT", now=now) == 0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_retry_policy_should_retry() -> None:
+    policy = RetryPolicy(max_retries=2, retry_statuses=(503,))
+    assert policy.should_retry(0, 503) is True
+    assert policy.should_retry(0, None) is True
+    assert policy.should_retry(0, 404) is False
+    assert policy.should_retry(2, 503) is False
+
+
+def test_retry_policy_delay() -> None:
+    policy = RetryPolicy(backoff=1, backoff_max=5)
+    with mock.patch("random.uniform", side_effect=lambda a, b: b):
+        assert policy.delay(0) == 1
+        assert policy.delay(2) == 4
+        assert policy.delay(10) == 5
+        assert policy.delay(0, retry_after="30") == 30
+
+    policy = RetryPolicy(backoff=1, respect_retry_after=False)
+    with mock.patch("random.uniform", side_effect=lambda a, b: b):
+        assert policy.delay(0, retry_after="30") == 1
@@ -0,0 +1,54 @@
+from pathlib import Path
+from unittest import mock
+
+from dude.robots import RobotsCache
+
+ROBOTS_URL = "https://dude.ron.sh/robots.txt"
+
+
+def test_robots_cache() -> None:
+    cache = RobotsCache(ttl=60)
+    assert cache.get(ROBOTS_URL) is None
+
+    parser = cache.set(ROBOTS_URL, 200, "User-agent: *\nDisallow: /private\nCrawl-delay: 0.5")
+    assert cache.get(ROBOTS_URL) is parser
+    assert parser.can_fetch("dude", "https://dude.ron.sh/")
+    assert not parser.can_fetch("dude", "https://dude.ron.sh/private")
+    assert parser.crawl_delay("dude") == 0.5
+
+    with mock.patch("time.time", return_value=1e12):
+        assert cache.get(ROBOTS_URL) is None
+
+
+def test_robots_fractional_crawl_delay() -> None:
+    parser = RobotsCache().set(
+        ROBOTS_URL,
+        200,
+        "User-agent: other\nCrawl-delay: 10\n\nUser-agent: Dude\nCrawl-delay: 1.5\n\nUser-agent: *\nCrawl-delay: 3",
+    )
+    assert parser.crawl_delay("dude") == 1.5
+    assert parser.crawl_delay("somebot") == 3
+
+
+def test_robots_cache_errors() -> None:
+    cache = RobotsCache(ttl=60, error_ttl=0)
+    assert cache.set(ROBOTS_URL, 404, "").can_fetch("dude", "https://dude.ron.sh/")
+    assert not cache.set(ROBOTS_URL, 403, "").can_fetch("dude", "https://dude.ron.sh/")
+    assert not cache.set(ROBOTS_URL, 503, "").can_fetch("dude", "https://dude.ron.sh/")
+    assert cache.set(ROBOTS_URL, None, "").can_fetch("dude", "https://dude.ron.sh/")
+
+    with mock.patch("time.time", return_value=1e12):
+        assert cache.get(ROBOTS_URL) is None
+
+
+def test_robots_cache_persistence(tmp_path: Path) -> None:
+    path = str(tmp_path / "robots.json")
+    cache = RobotsCache(path=path)
+    cache.set(ROBOTS_URL, 200, "User-agent: *\nDisallow: /private")
+    cache.save()
+
+    cache = RobotsCache(path=path)
+    cache.load()
+    parser = cache.get(ROBOTS_URL)
+    assert parser is not None
+    assert not parser.can_fetch("dude", "https://dude.ron.sh/private")
@@ -0,0 +1,72 @@
+from dude.scheduler import HostScheduler
+
+
+def test_scheduler_fifo_without_delay() -> None:
+    scheduler = HostScheduler()
+    for url in ("https://a.com/1", "https://b.com/1", "https://a.com/2"):
+        scheduler.push(url[8:13], url)
+
+    assert len(scheduler) == 3
+    assert [scheduler.pop(now=0)[0] for _ in range(3)] == ["https://a.com/1", "https://b.com/1", "https://a.com/2"]
+    assert scheduler.pop(now=0) == (None, None)
+    assert len(scheduler) == 0
+
+
+def test_scheduler_host_without_delay_does_not_wait() -> None:
+    scheduler = HostScheduler()
+    scheduler.set_delay("slow.com", 2.5)
+    scheduler.push("slow.com", "https://slow.com/1")
+    scheduler.push("slow.com", "https://slow.com/2")
+    scheduler.push("fast.com", "https://fast.com/1")
+    scheduler.push("fast.com", "https://fast.com/2")
+
+    assert scheduler.pop(now=10) == ("https://slow.com/1", None)
+    assert scheduler.pop(now=10) == ("https://fast.com/1", None)
+    assert scheduler.pop(now=10) == ("https://fast.com/2", None)
+    assert scheduler.pop(now=11) == (None, 1.5)
+    assert scheduler.pop(now=12.5) == ("https://slow.com/2", None)
+
+
+def test_scheduler_pause() -> None:
+    scheduler = HostScheduler()
+    scheduler.push("a.com", "https://a.com/1")
+    scheduler.push("a.com", "https://a.com/2")
+    scheduler.push("b.com", "https://b.com/1")
+
+    scheduler.pause("a.com")
+    assert scheduler.pop(now=0) == ("https://b.com/1", None)
+    assert scheduler.pop(now=0) == (None, None)
+    assert len(scheduler) == 2
+
+    scheduler.resume("a.com")
+    scheduler.resume("a.com")
+    assert scheduler.pop(now=0) == ("https://a.com/1", None)
+    assert scheduler.pop(now=0) == ("https://a.com/2", None)
+    assert scheduler.pop(now=0) == (None, None)
+
+
+def test_scheduler_host_qps() -> None:
+    scheduler = HostScheduler(host_qps=2, burst=2, host_qps_overrides={"slow.com": 0.5})
+    for i in range(4):
+        scheduler.push("fast.com", f"https://fast.com/{i}")
+    scheduler.push("slow.com", "https://slow.com/0")
+    scheduler.push("slow.com", "https://slow.com/1")
+
+    assert scheduler.pop(now=0) == ("https://fast.com/0", None)
+    assert scheduler.pop(now=0) == ("https://fast.com/1", None)  # burst
+    assert scheduler.pop(now=0) == ("https://slow.com/0", None)
+    assert scheduler.pop(now=0) == ("https://slow.com/1", None)  # burst
+    assert scheduler.pop(now=0) == (None, 0.5)
+    assert scheduler.pop(now=0.5) == ("https://fast.com/2", None)
+    assert scheduler.pop(now=0.5) == (None, 0.5)
+    assert scheduler.pop(now=1) == ("https://fast.com/3", None)
+
+
+def test_scheduler_qps() -> None:
+    scheduler = HostScheduler(qps=4)
+    for host in ("a.com", "b.com"):
+        scheduler.push(host, f"https://{host}/")
+
+    assert scheduler.pop(now=0) == ("https://a.com/", None)
+    assert scheduler.pop(now=0) == (None, 0.25)
+    assert scheduler.pop(now=0.25) == ("https://b.com/", None)
@@ -0,0 +1,22 @@
+import gzip
+from pathlib import Path
+
+from dude.seeds import URLFile
+
+
+def test_url_file(tmp_path: Path) -> None:
+    path = tmp_path / "urls.txt"
+    path.write_text("https://dude.ron.sh\n\n# comment\n  https://roniemartinez.space/  \n")
+
+    urls = URLFile(str(path))
+
+    assert list(urls) == ["https://dude.ron.sh", "https://roniemartinez.space/"]
+    assert list(urls) == ["https://dude.ron.sh", "https://roniemartinez.space/"]  # read again
+
+
+def test_url_file_gzip(tmp_path: Path) -> None:
+    path = tmp_path / "urls.txt.gz"
+    with gzip.open(path, "wt") as f:
+        f.write("https://dude.ron.sh\nhttps://roniemartinez.space\n")
+
+    assert list(URLFile(str(path))) == ["https://dude.ron.sh", "https://roniemartinez.space"]
@@ -0,0 +1,44 @@
+import multiprocessing
+import queue
+from pathlib import Path
+
+from dude.seeds import URLFile
+from dude.sharding import Shard, _split_seeds, shard_of
+
+
+def test_shard_of_is_stable() -> None:
+    assert shard_of("https://dwmc.ron.sh/", 2) == 0
+    assert shard_of("https://example.com/", 2) == 1
+    assert shard_of("https://example.com/page.html", 2) == 1
+
+
+def test_shard_finishes_when_all_idle() -> None:
+    inboxes: list = [queue.Queue(), queue.Queue()]
+    active = multiprocessing.Value("i", 2)
+    first, second = Shard(0, inboxes, active), Shard(1, inboxes, active)
+
+    assert first.owns("https://dwmc.ron.sh/")
+    assert not first.owns("https://example.com/")
+
+    first.send("https://example.com/", 1)
+    first.send("https://example.com/", 1)  # already sent
+    assert inboxes[1].qsize() == 1
+
+    # the second shard is idle but a URL is in transit
+    assert not second.is_finished()
+    assert not first.is_finished()
+
+    assert second.receive() == [("https://example.com/", 1)]
+    assert not second.idle
+    assert second.receive() == []
+    assert second.is_finished()
+    assert first.is_finished()
+
+
+def test_split_seeds(tmp_path: Path) -> None:
+    seed_files = [str(tmp_path / "seeds.0.txt"), str(tmp_path / "seeds.1.txt")]
+    urls = ["https://dwmc.ron.sh/", "https://example.com/", "https://dwmc.ron.sh/page.html"]
+
+    assert _split_seeds(iter(urls), seed_files) == {"dwmc.ron.sh", "example.com"}
+    assert list(URLFile(seed_files[0])) == ["https://dwmc.ron.sh/", "https://dwmc.ron.sh/page.html"]
+    assert list(URLFile(seed_files[1])) == ["https://example.com/"]
@@ -0,0 +1,72 @@
+import gzip
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List
+from unittest import mock
+
+import pytest
+
+from dude.sitemap import Sitemap, SitemapEntry, parse_sitemap
+
+URLSET = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://dude.ron.sh/</loc><lastmod>2022-01-31</lastmod></url>
+  <url><loc> https://dude.ron.sh/old.html </loc><lastmod>2020-01-01T10:00:00Z</lastmod></url>
+  <url><loc>https://dude.ron.sh/no-lastmod.html</loc></url>
+</urlset>
+"""
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://dude.ron.sh/sitemap-pages.xml.gz</loc><lastmod>2022-02-01</lastmod></sitemap>
+  <sitemap><loc>https://dude.ron.sh/sitemap-archive.xml</loc><lastmod>2019-01-01</lastmod></sitemap>
+</sitemapindex>
+"""
+
+
+def chunked(content: bytes, size: int = 7) -> List[bytes]:
+    return [content[i : i + size] for i in range(0, len(content), size)]
+
+
+@pytest.mark.parametrize("compress", (False, True))
+def test_parse_sitemap(compress: bool) -> None:
+    content = gzip.compress(URLSET) if compress else URLSET
+
+    assert list(parse_sitemap(chunked(content))) == [
+        (False, SitemapEntry("https://dude.ron.sh/", datetime(2022, 1, 31, tzinfo=timezone.utc))),
+        (False, SitemapEntry("https://dude.ron.sh/old.html", datetime(2020, 1, 1, 10, tzinfo=timezone.utc))),
+        (False, SitemapEntry("https://dude.ron.sh/no-lastmod.html", None)),
+    ]
+
+
+def test_parse_sitemap_index() -> None:
+    assert [entry.url for is_sitemap, entry in parse_sitemap(chunked(SITEMAP_INDEX)) if is_sitemap] == [
+        "https://dude.ron.sh/sitemap-pages.xml.gz",
+        "https://dude.ron.sh/sitemap-archive.xml",
+    ]
+
+
+def test_sitemap_from_robots_txt() -> None:
+    files: Dict[str, bytes] = {
+        "https://dude.ron.sh/robots.txt": b"User-agent: *\nSitemap: https://dude.ron.sh/sitemap.xml\n",
+        "https://dude.ron.sh/sitemap.xml": SITEMAP_INDEX,
+        "https://dude.ron.sh/sitemap-pages.xml.gz": gzip.compress(URLSET),
+    }
+
+    def read(url: str) -> Iterator[bytes]:
+        if url not in files:
+            raise OSError("Not found")
+        yield from chunked(files[url])
+
+    sitemap = Sitemap("https://dude.ron.sh/robots.txt", since=datetime(2021, 1, 1))
+    with mock.patch.object(sitemap, "_read", side_effect=read) as mock_read:
+        urls = list(sitemap)
+
+    # the archive is older than `since` so it is not read, the old URL is skipped
+    assert urls == ["https://dude.ron.sh/", "https://dude.ron.sh/no-lastmod.html"]
+    assert [call.args[0] for call in mock_read.call_args_list] == list(files)
+
+
+def test_sitemap_read_error() -> None:
+    sitemap = Sitemap(["https://dude.ron.sh/missing.xml", "https://dude.ron.sh/sitemap.xml"])
+    with mock.patch.object(sitemap, "_read", side_effect=[OSError("Not found"), iter(chunked(URLSET))]):
+        assert len(list(sitemap.entries())) == 3
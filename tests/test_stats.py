@@ -0,0 +1,20 @@
+from dude.stats import Stats
+
+
+def test_stats() -> None:
+    stats = Stats()
+    stats.increment("fetched")
+    stats.increment("fetched", 2)
+    stats.set("host.limit", 4)
+    stats.set_max("queue_max", 3)
+    stats.set_max("queue_max", 1)
+    items = [1, 2]
+    stats.register_gauge("queue", lambda: len(items))
+
+    assert stats.snapshot() == {"fetched": 3, "host.limit": 4, "queue": 2, "queue_max": 3}
+    items.append(3)
+    assert stats.snapshot()["queue"] == 3
+    assert stats.get("fetched") == 3
+
+    stats.unregister_gauge("queue")
+    assert "queue" not in stats.snapshot()